@@ -1,15 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List, Dict, Any
-from datetime import datetime, date, timedelta
+from typing import Dict, Any
+from datetime import date, timedelta
 
+from ...core.cache import dashboard_cache
 from ...core.database import get_db
+from ...core.days import day_bounds, summary_today
 from ...models.user import User
-from ...models.food import FoodLog, MealType
-from ...models.nutrition import DailyNutritionSummary, NutritionGoal
+from ...models.nutrition import DailyNutritionSummary
 from ...schemas.food import DailyNutritionSummary as DailyNutritionSummarySchema
-from ...schemas.food import FoodLogResponse
+from ...services.summary_service import summary_service, RANGE_GRANULARITIES
+from ...services.analytics_service import analytics_service
 from ..v1.auth import get_current_user
 
 router = APIRouter()
@@ -17,14 +18,132 @@ router = APIRouter()
 
 @router.get("/summary/{target_date}", response_model=DailyNutritionSummarySchema)
 async def get_daily_nutrition_summary(
+    request: Request,
     target_date: date,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get daily nutrition summary for a specific date"""
     
+    # Cached per user until their next food log or goal change
+    return await dashboard_cache.respond(
+        request, current_user.id,
+        lambda: _build_daily_summary(current_user.id, target_date, db)
+    )
+
+
+@router.get("/summary", response_model=DailyNutritionSummarySchema)
+async def get_today_summary(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get today's nutrition summary"""
+    today = summary_today()
+    return await get_daily_nutrition_summary(request, today, current_user, db)
+
+
+@router.get("/weekly-summary")
+async def get_weekly_summary(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get weekly nutrition summary"""
+    
+    return await dashboard_cache.respond(
+        request, current_user.id,
+        lambda: _build_weekly_summary(current_user.id, db)
+    )
+
+
+@router.get("/monthly-summary")
+async def get_monthly_summary(
+    request: Request,
+    year: int,
+    month: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get monthly nutrition summary"""
+    
+    return await dashboard_cache.respond(
+        request, current_user.id,
+        lambda: _build_monthly_summary(current_user.id, year, month, db)
+    )
+
+
+@router.get("/progress")
+async def get_progress_data(
+    request: Request,
+    days: int = Query(30, ge=1, le=366),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get progress data for charts"""
+    
+    return await dashboard_cache.respond(
+        request, current_user.id,
+        lambda: _build_progress_data(current_user.id, days, db)
+    )
+
+
+@router.get("/range")
+async def get_range_summary(
+    request: Request,
+    start: date,
+    end: date,
+    granularity: str = "day",
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get nutrition totals over a date range, bucketed by day, week, month or year"""
+    
+    if granularity not in RANGE_GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Granularity must be one of: {', '.join(RANGE_GRANULARITIES)}"
+        )
+    
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start date must not be after end date"
+        )
+    
+    return await dashboard_cache.respond(
+        request, current_user.id,
+        lambda: _build_range_summary(current_user.id, start, end, granularity, db)
+    )
+
+
+@router.get("/insights")
+async def get_nutrition_insights(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get AI-powered nutrition insights"""
+    
+    return await dashboard_cache.respond(
+        request, current_user.id,
+        lambda: _build_nutrition_insights(current_user.id, db)
+    )
+
+
+async def _get_or_create_daily_summary(user_id: int, target_date: date, db: AsyncSession) -> DailyNutritionSummary:
+    """Get or create daily nutrition summary for a user and date"""
+    
+    # Summaries are kept current by food log writes, so this is a key lookup
+    # except for the first read of a day nobody has logged against yet
+    return await summary_service.get_daily_summary(user_id, target_date, db)
+
+
+async def _build_daily_summary(user_id: int, target_date: date, db: AsyncSession) -> DailyNutritionSummarySchema:
+    """Build the daily nutrition summary response"""
+    
     # Get or create daily summary
-    summary = await _get_or_create_daily_summary(current_user.id, target_date, db)
+    summary = await _get_or_create_daily_summary(user_id, target_date, db)
     
     return DailyNutritionSummarySchema(
         date=summary.date,
@@ -48,31 +167,14 @@ async def get_daily_nutrition_summary(
     )
 
 
-@router.get("/summary", response_model=DailyNutritionSummarySchema)
-async def get_today_summary(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get today's nutrition summary"""
-    today = date.today()
-    return await get_daily_nutrition_summary(today, current_user, db)
-
-
-@router.get("/weekly-summary")
-async def get_weekly_summary(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get weekly nutrition summary"""
+async def _build_weekly_summary(user_id: int, db: AsyncSession) -> Dict[str, Any]:
+    """Build the weekly summary response"""
     
-    end_date = date.today()
+    end_date = summary_today()
     start_date = end_date - timedelta(days=6)
     
     summaries = []
-    for i in range(7):
-        current_date = start_date + timedelta(days=i)
-        summary = await _get_or_create_daily_summary(current_user.id, current_date, db)
-        
+    for summary in await summary_service.get_summaries(user_id, start_date, end_date, db):
         summaries.append({
             "date": summary.date.isoformat(),
             "calories": summary.total_calories,
@@ -92,14 +194,8 @@ async def get_weekly_summary(
     }
 
 
-@router.get("/monthly-summary")
-async def get_monthly_summary(
-    year: int,
-    month: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get monthly nutrition summary"""
+async def _build_monthly_summary(user_id: int, year: int, month: int, db: AsyncSession) -> Dict[str, Any]:
+    """Build the monthly summary response"""
     
     start_date = date(year, month, 1)
     if month == 12:
@@ -107,26 +203,12 @@ async def get_monthly_summary(
     else:
         end_date = date(year, month + 1, 1) - timedelta(days=1)
     
-    # Get all food logs for the month
-    result = await db.execute(
-        select(FoodLog).where(
-            FoodLog.user_id == current_user.id,
-            FoodLog.meal_time >= start_date,
-            FoodLog.meal_time <= end_date + timedelta(days=1)
-        )
+    # Aggregate the month's food logs in the database, over the same days
+    # the daily summaries and rollups cover
+    aggregates = await summary_service.aggregate_food_logs(
+        user_id, day_bounds(start_date)[0], day_bounds(end_date)[1], db
     )
-    food_logs = result.scalars().all()
-    
-    # Calculate monthly totals
-    monthly_totals = {
-        "calories": sum(log.calories or 0 for log in food_logs),
-        "protein": sum(log.protein or 0 for log in food_logs),
-        "carbs": sum(log.carbs or 0 for log in food_logs),
-        "fat": sum(log.fat or 0 for log in food_logs),
-        "fiber": sum(log.fiber or 0 for log in food_logs),
-        "sugar": sum(log.sugar or 0 for log in food_logs),
-        "sodium": sum(log.sodium or 0 for log in food_logs)
-    }
+    monthly_totals = aggregates["totals"]
     
     # Calculate daily averages
     days_in_month = (end_date - start_date).days + 1
@@ -134,12 +216,6 @@ async def get_monthly_summary(
         key: value / days_in_month for key, value in monthly_totals.items()
     }
     
-    # Get meal type distribution
-    meal_counts = {}
-    for log in food_logs:
-        meal_type = log.meal_type.value
-        meal_counts[meal_type] = meal_counts.get(meal_type, 0) + 1
-    
     return {
         "year": year,
         "month": month,
@@ -148,31 +224,19 @@ async def get_monthly_summary(
         "days_in_month": days_in_month,
         "monthly_totals": monthly_totals,
         "daily_averages": daily_averages,
-        "meal_distribution": meal_counts,
-        "total_entries": len(food_logs)
+        "meal_distribution": aggregates["meal_distribution"],
+        "total_entries": aggregates["total_entries"]
     }
 
 
-@router.get("/progress")
-async def get_progress_data(
-    days: int = 30,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get progress data for charts"""
+async def _build_progress_data(user_id: int, days: int, db: AsyncSession) -> Dict[str, Any]:
+    """Build the progress chart response"""
     
-    end_date = date.today()
+    end_date = summary_today()
     start_date = end_date - timedelta(days=days-1)
     
-    # Get daily summaries for the period
-    result = await db.execute(
-        select(DailyNutritionSummary).where(
-            DailyNutritionSummary.user_id == current_user.id,
-            DailyNutritionSummary.date >= start_date,
-            DailyNutritionSummary.date <= end_date
-        ).order_by(DailyNutritionSummary.date)
-    )
-    summaries = result.scalars().all()
+    # Get daily summaries for the period, one per day
+    summaries = await summary_service.get_summaries(user_id, start_date, end_date, db)
     
     # Prepare chart data
     chart_data = {
@@ -187,110 +251,82 @@ async def get_progress_data(
         "fat_goal": []
     }
     
-    # Fill in missing dates with zero values
-    current_date = start_date
-    summary_dict = {summary.date: summary for summary in summaries}
-    
-    while current_date <= end_date:
-        chart_data["labels"].append(current_date.strftime("%m/%d"))
-        
-        if current_date in summary_dict:
-            summary = summary_dict[current_date]
-            chart_data["calories"].append(summary.total_calories)
-            chart_data["protein"].append(summary.total_protein_g)
-            chart_data["carbs"].append(summary.total_carbs_g)
-            chart_data["fat"].append(summary.total_fat_g)
-            chart_data["calories_goal"].append(summary.calories_goal)
-            chart_data["protein_goal"].append(summary.protein_goal_g)
-            chart_data["carbs_goal"].append(summary.carbs_goal_g)
-            chart_data["fat_goal"].append(summary.fat_goal_g)
-        else:
-            # Fill with zeros for missing dates
-            chart_data["calories"].append(0)
-            chart_data["protein"].append(0)
-            chart_data["carbs"].append(0)
-            chart_data["fat"].append(0)
-            chart_data["calories_goal"].append(0)
-            chart_data["protein_goal"].append(0)
-            chart_data["carbs_goal"].append(0)
-            chart_data["fat_goal"].append(0)
-        
-        current_date += timedelta(days=1)
+    for summary in summaries:
+        chart_data["labels"].append(summary.date.strftime("%m/%d"))
+        chart_data["calories"].append(summary.total_calories)
+        chart_data["protein"].append(summary.total_protein_g)
+        chart_data["carbs"].append(summary.total_carbs_g)
+        chart_data["fat"].append(summary.total_fat_g)
+        chart_data["calories_goal"].append(summary.calories_goal or 0)
+        chart_data["protein_goal"].append(summary.protein_goal_g or 0)
+        chart_data["carbs_goal"].append(summary.carbs_goal_g or 0)
+        chart_data["fat_goal"].append(summary.fat_goal_g or 0)
     
     return chart_data
 
 
-@router.get("/insights")
-async def get_nutrition_insights(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get AI-powered nutrition insights"""
+async def _build_range_summary(user_id: int, start: date, end: date, granularity: str, db: AsyncSession) -> Dict[str, Any]:
+    """Build the range summary response"""
     
-    # Get recent food logs (last 7 days)
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=7)
+    # Whole weeks, months and years come from pre-aggregated rollups
+    buckets = await summary_service.get_range(user_id, start, end, granularity, db)
     
-    result = await db.execute(
-        select(FoodLog).where(
-            FoodLog.user_id == current_user.id,
-            FoodLog.meal_time >= start_date,
-            FoodLog.meal_time <= end_date
-        ).order_by(FoodLog.meal_time.desc())
-    )
-    recent_logs = result.scalars().all()
+    return {
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "granularity": granularity,
+        "buckets": buckets
+    }
+
+
+async def _build_nutrition_insights(user_id: int, db: AsyncSession) -> Dict[str, Any]:
+    """Build the nutrition insights response"""
     
     # Get current nutrition goals
-    result = await db.execute(
-        select(NutritionGoal).where(
-            NutritionGoal.user_id == current_user.id,
-            NutritionGoal.is_active == True
+    current_goal = await summary_service.get_active_goal(user_id, db)
+    
+    # The nightly rollup job stores features for the window ending yesterday;
+    # aggregate the same 7 days live only if its row is missing or older.
+    # Today is left out either way, since its intake is still incomplete
+    yesterday = summary_today() - timedelta(days=1)
+    stored = await summary_service.get_insight_features(user_id, db)
+    precomputed = stored is not None and stored.as_of_date >= yesterday
+    if precomputed:
+        end_day = stored.as_of_date
+        window_days = stored.window_days
+        total_entries = stored.total_entries
+        eating_window_hours = stored.eating_window_hours
+    else:
+        end_day = yesterday
+        window_days = 7
+        start, _ = day_bounds(end_day - timedelta(days=window_days - 1))
+        _, end = day_bounds(end_day)
+        aggregates = await summary_service.aggregate_food_logs(user_id, start, end, db)
+        
+        total_entries = aggregates["total_entries"]
+        eating_window_hours = (
+            (aggregates["last_meal_time"] - aggregates["first_meal_time"]).total_seconds() / 3600
+            if total_entries else None
         )
-    )
-    current_goal = result.scalar_one_or_none()
     
     insights = []
     
-    if recent_logs:
-        # Calculate averages
-        total_calories = sum(log.calories or 0 for log in recent_logs)
-        total_protein = sum(log.protein or 0 for log in recent_logs)
-        total_carbs = sum(log.carbs or 0 for log in recent_logs)
-        total_fat = sum(log.fat or 0 for log in recent_logs)
-        
-        avg_calories = total_calories / 7
-        avg_protein = total_protein / 7
-        avg_carbs = total_carbs / 7
-        avg_fat = total_fat / 7
-        
-        # Generate insights
-        if current_goal:
-            if avg_calories < current_goal.daily_calories * 0.8:
-                insights.append({
-                    "type": "warning",
-                    "title": "Low Calorie Intake",
-                    "message": f"Your average daily calories ({avg_calories:.0f}) are below your goal ({current_goal.daily_calories}). Consider adding healthy snacks or increasing portion sizes."
-                })
-            
-            if avg_protein < current_goal.daily_protein_g * 0.8:
-                insights.append({
-                    "type": "warning",
-                    "title": "Low Protein Intake",
-                    "message": f"Your average daily protein ({avg_protein:.1f}g) is below your goal ({current_goal.daily_protein_g}g). Consider adding more protein-rich foods like eggs, chicken, or legumes."
-                })
+    if total_entries:
+        # Score the daily series in one vectorized pass. Days in the job's
+        # window already have summary rows, so nothing is written on read
+        series = await analytics_service.load_user_series(
+            user_id, end_day, window_days, db, materialize=not precomputed
+        )
+        features = analytics_service.compute_features(series, analytics_service.goal_vector(current_goal))
+        insights.extend(analytics_service.build_insights(features, current_goal))
         
         # Meal timing insights
-        meal_times = [log.meal_time for log in recent_logs]
-        if meal_times:
-            earliest_meal = min(meal_times)
-            latest_meal = max(meal_times)
-            
-            if (latest_meal - earliest_meal).total_seconds() > 16 * 3600:  # 16 hours
-                insights.append({
-                    "type": "info",
-                    "title": "Extended Eating Window",
-                    "message": "Your eating window spans more than 16 hours. Consider reducing this to 12-14 hours for better metabolic health."
-                })
+        if eating_window_hours and eating_window_hours > 16:
+            insights.append({
+                "type": "info",
+                "title": "Extended Eating Window",
+                "message": "Your eating window spans more than 16 hours. Consider reducing this to 12-14 hours for better metabolic health."
+            })
     
     # Add general insights
     insights.extend([
@@ -308,78 +344,6 @@ async def get_nutrition_insights(
     
     return {
         "insights": insights,
-        "period": "7 days",
-        "total_entries": len(recent_logs)
+        "period": f"{window_days} days",
+        "total_entries": total_entries
     }
-
-
-async def _get_or_create_daily_summary(user_id: int, target_date: date, db: AsyncSession) -> DailyNutritionSummary:
-    """Get or create daily nutrition summary for a user and date"""
-    
-    # Try to find existing summary
-    result = await db.execute(
-        select(DailyNutritionSummary).where(
-            DailyNutritionSummary.user_id == user_id,
-            DailyNutritionSummary.date == target_date
-        )
-    )
-    summary = result.scalar_one_or_none()
-    
-    if summary:
-        return summary
-    
-    # Create new summary
-    summary = DailyNutritionSummary(
-        user_id=user_id,
-        date=target_date
-    )
-    
-    # Get food logs for the date
-    start_datetime = datetime.combine(target_date, datetime.min.time())
-    end_datetime = datetime.combine(target_date, datetime.max.time())
-    
-    result = await db.execute(
-        select(FoodLog).where(
-            FoodLog.user_id == user_id,
-            FoodLog.meal_time >= start_datetime,
-            FoodLog.meal_time <= end_datetime
-        )
-    )
-    food_logs = result.scalars().all()
-    
-    # Calculate totals
-    summary.total_calories = sum(log.calories or 0 for log in food_logs)
-    summary.total_protein_g = sum(log.protein or 0 for log in food_logs)
-    summary.total_carbs_g = sum(log.carbs or 0 for log in food_logs)
-    summary.total_fat_g = sum(log.fat or 0 for log in food_logs)
-    summary.total_fiber_g = sum(log.fiber or 0 for log in food_logs)
-    summary.total_sugar_g = sum(log.sugar or 0 for log in food_logs)
-    summary.total_sodium_mg = sum(log.sodium or 0 for log in food_logs)
-    
-    # Count meals and snacks
-    summary.total_meals = sum(1 for log in food_logs if log.meal_type in [MealType.BREAKFAST, MealType.LUNCH, MealType.DINNER])
-    summary.total_snacks = sum(1 for log in food_logs if log.meal_type == MealType.SNACK)
-    
-    # Get current nutrition goals
-    result = await db.execute(
-        select(NutritionGoal).where(
-            NutritionGoal.user_id == user_id,
-            NutritionGoal.is_active == True
-        )
-    )
-    current_goal = result.scalar_one_or_none()
-    
-    if current_goal:
-        summary.calories_goal = current_goal.daily_calories
-        summary.protein_goal_g = current_goal.daily_protein_g
-        summary.carbs_goal_g = current_goal.daily_carbs_g
-        summary.fat_goal_g = current_goal.daily_fat_g
-        
-        # Calculate progress
-        summary.calculate_progress()
-    
-    db.add(summary)
-    await db.commit()
-    await db.refresh(summary)
-    
-    return summary
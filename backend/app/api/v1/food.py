@@ -4,19 +4,30 @@ from sqlalchemy import select
 from typing import List
 from datetime import datetime, date, timedelta
 
-from ...core.database import get_db
+from ...core.cache import dashboard_cache
+from ...core.database import get_db, AsyncSessionLocal
+from ...core.singleflight import SingleFlight
+from ...core.workers import PoolSaturatedError
 from ...models.user import User
 from ...models.food import Food, FoodLog
 from ...schemas.food import (
     FoodLogCreate, FoodLogResponse, FoodResponse, NaturalLanguageFoodEntry,
-    ParsedFoodEntry, FoodSearchQuery
+    NaturalLanguageFoodBatch, ParsedFoodEntry, FoodSearchQuery
 )
 from ...services.nlp_service import nlp_service
 from ...services.fatsecret_service import fatsecret_service
+from ...services.summary_service import summary_service
+from ...services.search_service import food_search_service, normalize_query
+from ...services.catalog import upsert_catalog_statement
+from ...services.unit_weights import unit_weight_index
 from ..v1.auth import get_current_user
 
 router = APIRouter()
 
+# Concurrent logs of the same food share one lookup, so they don't race
+# to insert duplicate Food rows
+food_resolution = SingleFlight("food_resolution")
+
 
 @router.post("/log", response_model=FoodLogResponse, status_code=status.HTTP_201_CREATED)
 async def log_food(
@@ -40,6 +51,7 @@ async def log_food(
     food_log_entry = FoodLog(
         user_id=current_user.id,
         food_id=food_log.food_id,
+        food=food,
         quantity=food_log.quantity,
         unit=food_log.unit,
         weight_grams=food_log.weight_grams,
@@ -52,17 +64,22 @@ async def log_food(
     if food_log.weight_grams:
         food_log_entry.weight_grams = food_log.weight_grams
     else:
-        # Convert quantity and unit to grams
-        food_log_entry.weight_grams = nlp_service.convert_to_grams(
-            food_log.quantity, food_log.unit
+        # Convert quantity and unit to grams using this food's own unit weights
+        food_log_entry.weight_grams = unit_weight_index.grams(
+            food, food_log.quantity, food_log.unit
         )
     
     # Calculate nutrition
     food_log_entry.calculate_nutrition()
     
     db.add(food_log_entry)
+    await db.flush()
+    
+    # Update the day's summary in the same transaction
+    await summary_service.apply_food_log(food_log_entry, db)
     await db.commit()
     await db.refresh(food_log_entry)
+    await dashboard_cache.invalidate_user(current_user.id)
     
     # Return response with food name
     return FoodLogResponse(
@@ -104,6 +121,12 @@ async def parse_natural_language(
         
         return parsed_entry
     
+    except PoolSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Food parser is busy, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -111,6 +134,38 @@ async def parse_natural_language(
         )
 
 
+@router.post("/parse-batch", response_model=List[ParsedFoodEntry])
+async def parse_natural_language_batch(
+    batch: NaturalLanguageFoodBatch,
+    current_user: User = Depends(get_current_user)
+):
+    """Parse many natural language food entries in one request"""
+    
+    try:
+        parsed_entries = await nlp_service.parse_food_entries(
+            [(entry.text, entry.meal_type) for entry in batch.entries]
+        )
+        
+        # Set meal times if not provided
+        for entry, parsed_entry in zip(batch.entries, parsed_entries):
+            if not parsed_entry.meal_time:
+                parsed_entry.meal_time = entry.meal_time or datetime.utcnow()
+        
+        return parsed_entries
+    
+    except PoolSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Food parser is busy, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to parse food entries: {str(e)}"
+        )
+
+
 @router.post("/log-natural", response_model=List[FoodLogResponse], status_code=status.HTTP_201_CREATED)
 async def log_natural_language(
     food_entry: NaturalLanguageFoodEntry,
@@ -128,18 +183,23 @@ async def log_natural_language(
         logged_foods = []
         
         for food_item in parsed_entry.foods:
+            # "0 rotis" says what wasn't eaten; there is nothing to log
+            if food_item.quantity <= 0:
+                continue
+            
             # Search for the food in our database or FatSecret
             food = await _find_or_create_food(food_item.item, db)
             
             if food:
                 # Create food log entry
-                weight_grams = nlp_service.convert_to_grams(
-                    food_item.quantity, food_item.unit
+                weight_grams = unit_weight_index.grams(
+                    food, food_item.quantity, food_item.unit
                 )
                 
                 food_log = FoodLog(
                     user_id=current_user.id,
                     food_id=food.id,
+                    food=food,
                     quantity=food_item.quantity,
                     unit=food_item.unit,
                     weight_grams=weight_grams,
@@ -152,8 +212,11 @@ async def log_natural_language(
                 food_log.calculate_nutrition()
                 
                 db.add(food_log)
+                await db.flush()
+                await summary_service.apply_food_log(food_log, db)
                 await db.commit()
                 await db.refresh(food_log)
+                await dashboard_cache.invalidate_user(current_user.id)
                 
                 # Add to response
                 logged_foods.append(FoodLogResponse(
@@ -178,6 +241,12 @@ async def log_natural_language(
         
         return logged_foods
     
+    except PoolSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Food parser is busy, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -195,28 +264,9 @@ async def search_foods(
 ):
     """Search for foods in database and FatSecret API"""
     
-    foods = []
-    
-    # Search in local database first
-    result = await db.execute(
-        select(Food).where(
-            Food.name.ilike(f"%{query}%")
-        ).limit(limit)
-    )
-    local_foods = result.scalars().all()
-    foods.extend(local_foods)
-    
-    # If we need more results, search FatSecret API
-    if len(foods) < limit and fatsecret_service.access_token:
-        try:
-            fatsecret_foods = await fatsecret_service.search_foods(
-                query, limit - len(foods)
-            )
-            foods.extend(fatsecret_foods)
-        except Exception as e:
-            print(f"FatSecret API search failed: {e}")
-    
-    return foods[:limit]
+    # Local catalog and FatSecret are searched concurrently; FatSecret
+    # results that miss the deadline are imported for next time
+    return await food_search_service.search_with_upstream(query, limit, db)
 
 
 @router.get("/log/{log_id}", response_model=FoodLogResponse)
@@ -321,49 +371,62 @@ async def get_user_food_logs(
 async def _find_or_create_food(food_name: str, db: AsyncSession) -> Food:
     """Find food in database or create new entry from FatSecret"""
     
-    # First, try to find in local database
-    result = await db.execute(
-        select(Food).where(Food.name.ilike(f"%{food_name}%"))
+    food_id = await food_resolution.do(
+        normalize_query(food_name),
+        lambda: _resolve_food_id(food_name)
     )
-    existing_food = result.scalar_one_or_none()
+    return await db.get(Food, food_id)
+
+
+async def _resolve_food_id(food_name: str) -> int:
+    # The lookup is shared by every coalesced caller, so it runs on its own
+    # session rather than one that belongs to (and may be closed with) a request
+    async with AsyncSessionLocal() as session:
+        food = await _resolve_food(food_name, session)
+        return food.id
+
+
+async def _resolve_food(food_name: str, db: AsyncSession) -> Food:
+    """Find the best local match, else import from FatSecret, else create a basic entry"""
+    
+    # First, try to find the closest match in local database
+    existing_food = await food_search_service.find_best_match(food_name, db)
     
     if existing_food:
         return existing_food
     
     # If not found locally, try FatSecret API
-    if fatsecret_service.access_token:
+    if fatsecret_service.is_available:
         try:
             fatsecret_foods = await fatsecret_service.search_foods(food_name, 1)
             if fatsecret_foods:
                 fatsecret_food = fatsecret_foods[0]
                 
-                # Create new food entry in local database
-                new_food = Food(
-                    name=fatsecret_food.name,
-                    brand=fatsecret_food.brand,
-                    calories_per_100g=fatsecret_food.calories_per_100g,
-                    protein_per_100g=fatsecret_food.protein_per_100g,
-                    carbs_per_100g=fatsecret_food.carbs_per_100g,
-                    fat_per_100g=fatsecret_food.fat_per_100g,
-                    fiber_per_100g=fatsecret_food.fiber_per_100g,
-                    sugar_per_100g=fatsecret_food.sugar_per_100g,
-                    sodium_per_100g=fatsecret_food.sodium_per_100g,
-                    serving_size=fatsecret_food.serving_size,
-                    serving_weight_grams=fatsecret_food.serving_weight_grams,
-                    category=fatsecret_food.category,
-                    subcategory=fatsecret_food.subcategory,
-                    is_indian_food=fatsecret_food.is_indian_food,
-                    source="fatsecret",
-                    external_id=str(fatsecret_food.id)
+                # Reuse the row if this FatSecret food was imported before
+                result = await db.execute(
+                    select(Food).where(
+                        Food.source == "fatsecret",
+                        Food.external_id == str(fatsecret_food.id)
+                    ).limit(1)
                 )
+                imported_food = result.scalar_one_or_none()
+                if imported_food:
+                    return imported_food
                 
-                db.add(new_food)
+                # Upsert on (source, external_id) so a concurrent import of the
+                # same food from another worker returns its row instead of failing
+                result = await db.execute(upsert_catalog_statement([fatsecret_food], update=True))
+                food_id = result.first().id
+                weights = await unit_weight_index.store(db, {str(fatsecret_food.id): food_id}, [fatsecret_food])
                 await db.commit()
-                await db.refresh(new_food)
+                unit_weight_index.apply(weights)
+                new_food = await db.get(Food, food_id)
+                food_search_service.index_food(new_food)
                 
                 return new_food
         
         except Exception as e:
+            await db.rollback()
             print(f"Failed to create food from FatSecret: {e}")
     
     # If all else fails, create a basic food entry
@@ -376,5 +439,6 @@ async def _find_or_create_food(food_name: str, db: AsyncSession) -> Food:
     db.add(basic_food)
     await db.commit()
     await db.refresh(basic_food)
+    food_search_service.index_food(basic_food)
     
     return basic_food
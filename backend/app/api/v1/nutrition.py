@@ -3,10 +3,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List
 
+from ...core.cache import dashboard_cache
 from ...core.database import get_db
 from ...models.user import User
 from ...models.nutrition import NutritionGoal
 from ...schemas.food import NutritionGoalCreate, NutritionGoalResponse
+from ...services.summary_service import summary_service
 from ..v1.auth import get_current_user
 
 router = APIRouter()
@@ -52,8 +54,11 @@ async def create_nutrition_goal(
     )
     
     db.add(nutrition_goal)
+    # Today's summary shows progress against the goal now in effect
+    await summary_service.apply_active_goal(current_user.id, db)
     await db.commit()
     await db.refresh(nutrition_goal)
+    await dashboard_cache.invalidate_user(current_user.id)
     
     return nutrition_goal
 
@@ -128,8 +133,10 @@ async def update_nutrition_goal(
     for field, value in goal_update.dict().items():
         setattr(goal, field, value)
     
+    await summary_service.apply_active_goal(current_user.id, db)
     await db.commit()
     await db.refresh(goal)
+    await dashboard_cache.invalidate_user(current_user.id)
     
     return goal
 
@@ -160,7 +167,9 @@ async def delete_nutrition_goal(
     
     # Soft delete by setting as inactive
     goal.is_active = False
+    await summary_service.apply_active_goal(current_user.id, db)
     await db.commit()
+    await dashboard_cache.invalidate_user(current_user.id)
     
     return {"message": "Nutrition goal deleted successfully"}
 
@@ -203,6 +212,8 @@ async def activate_nutrition_goal(
     
     # Activate the selected goal
     goal.is_active = True
+    await summary_service.apply_active_goal(current_user.id, db)
     await db.commit()
+    await dashboard_cache.invalidate_user(current_user.id)
     
     return {"message": "Nutrition goal activated successfully"}
@@ -0,0 +1,217 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+import hashlib
+import json
+import time
+
+from .config import settings
+from .days import summary_today
+
+
+class CacheBackend:
+    """Minimal async key-value interface shared by the cache backends"""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        raise NotImplementedError
+
+    async def get_counter(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryCache(CacheBackend):
+    """In-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[Optional[float], bytes]]" = OrderedDict()
+        # Counters are tiny and must survive eviction, so they live apart from the LRU
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._counters.clear()
+
+
+class RedisCache(CacheBackend):
+    """Shared cache backed by Redis, so every worker sees the same entries"""
+
+    def __init__(self, url: str):
+        # Optional dependency, only needed when REDIS_URL is configured
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        await self._client.set(key, value, ex=ttl)
+
+    async def get_counter(self, key: str) -> int:
+        value = await self._client.get(key)
+        return int(value) if value else 0
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+class ResponseCache:
+    """
+    Per-user cache of JSON responses with strong ETags.
+
+    Entries live in an in-process LRU, optionally backed by a shared store.
+    Every key embeds the user's cache version, so a write invalidates all of
+    a user's entries by bumping one counter.
+    """
+
+    def __init__(self, prefix: str, ttl: int, local: CacheBackend, shared: Optional[CacheBackend] = None):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.local = local
+        self.shared = shared
+
+    def configure(self, local: Optional[CacheBackend] = None, shared: Optional[CacheBackend] = None) -> None:
+        """Swap backends, e.g. for an InMemoryCache stand-in in tests"""
+        if local is not None:
+            self.local = local
+        self.shared = shared
+
+    async def get_version(self, user_id: int) -> int:
+        key = f"{self.prefix}:version:{user_id}"
+        if self.shared:
+            try:
+                return await self.shared.get_counter(key)
+            except Exception as e:
+                print(f"Shared cache unavailable: {e}")
+        return await self.local.get_counter(key)
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached response for a user"""
+        key = f"{self.prefix}:version:{user_id}"
+        await self.local.incr(key)
+        if self.shared:
+            try:
+                await self.shared.incr(key)
+            except Exception as e:
+                print(f"Shared cache unavailable: {e}")
+
+    async def respond(
+        self,
+        request: Request,
+        user_id: int,
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Response:
+        """
+        Serve a cached response for the request, computing it on a miss.
+
+        The key covers the user, path, query string and today's date (most
+        dashboard views are relative to today). Returns 304 Not Modified when
+        If-None-Match carries the current ETag.
+        """
+        version = await self.get_version(user_id)
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        key = f"{self.prefix}:{user_id}:{version}:{summary_today().isoformat()}:{request.url.path}?{query}"
+
+        body = await self._get(key)
+        if body is None:
+            body = json.dumps(jsonable_encoder(await compute()), separators=(",", ":")).encode("utf-8")
+            await self._set(key, body)
+
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def _get(self, key: str) -> Optional[bytes]:
+        body = await self.local.get(key)
+        if body is not None or not self.shared:
+            return body
+
+        try:
+            body = await self.shared.get(key)
+        except Exception as e:
+            print(f"Shared cache unavailable: {e}")
+            return None
+
+        if body is not None:
+            await self.local.set(key, body, self.ttl)
+        return body
+
+    async def _set(self, key: str, body: bytes) -> None:
+        await self.local.set(key, body, self.ttl)
+        if self.shared:
+            try:
+                await self.shared.set(key, body, self.ttl)
+            except Exception as e:
+                print(f"Shared cache unavailable: {e}")
+
+    async def close(self) -> None:
+        await self.local.close()
+        if self.shared:
+            await self.shared.close()
+
+
+def _create_shared_backend() -> Optional[CacheBackend]:
+    if not settings.REDIS_URL:
+        return None
+
+    try:
+        return RedisCache(settings.REDIS_URL)
+    except ImportError:
+        print("redis package not installed; dashboard cache is per-process only")
+        return None
+
+
+# Create dashboard response cache
+dashboard_cache = ResponseCache(
+    prefix="dashboard",
+    ttl=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    local=InMemoryCache(settings.DASHBOARD_CACHE_MAX_ENTRIES),
+    shared=_create_shared_backend(),
+)
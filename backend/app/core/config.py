@@ -21,6 +21,32 @@ class Settings(BaseSettings):
     FATSECRET_CLIENT_ID: Optional[str] = None
     FATSECRET_CLIENT_SECRET: Optional[str] = None
     FATSECRET_REDIRECT_URI: str = "http://localhost:3000/auth/callback"
+    FATSECRET_TOKEN_SCOPE: str = "basic"
+    FATSECRET_TOKEN_REFRESH_MARGIN_SECONDS: int = 300
+    FATSECRET_HTTP2: bool = True
+    FATSECRET_MAX_CONNECTIONS: int = 20
+    FATSECRET_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    FATSECRET_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    FATSECRET_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    FATSECRET_READ_TIMEOUT_SECONDS: float = 10.0
+    FATSECRET_CACHE_PERSISTENT: bool = True
+    FATSECRET_CACHE_MAX_ENTRIES: int = 4096
+    FATSECRET_SEARCH_TTL_SECONDS: int = 24 * 3600
+    FATSECRET_FOOD_TTL_SECONDS: int = 7 * 24 * 3600
+    FATSECRET_BARCODE_TTL_SECONDS: int = 30 * 24 * 3600
+    FATSECRET_MISS_TTL_SECONDS: int = 3600  # foods and barcodes FatSecret doesn't know
+    FATSECRET_CACHE_STALE_SECONDS: int = 7 * 24 * 3600
+    FATSECRET_RATE_LIMIT_PER_SECOND: float = 10.0
+    FATSECRET_RATE_LIMIT_BURST: int = 20
+    FATSECRET_RATE_LIMIT_MAX_WAIT_SECONDS: float = 1.0
+    FATSECRET_MAX_RETRIES: int = 2
+    FATSECRET_RETRY_BASE_DELAY_SECONDS: float = 0.2
+    FATSECRET_BREAKER_FAILURE_THRESHOLD: int = 5
+    FATSECRET_BREAKER_RESET_SECONDS: float = 30.0
+    
+    # Food search
+    FOOD_SEARCH_DEADLINE_SECONDS: float = 0.8
+    UNIT_WEIGHTS_REFRESH_SECONDS: int = 300
     
     # OpenAI API
     OPENAI_API_KEY: Optional[str] = None
@@ -30,6 +56,27 @@ class Settings(BaseSettings):
     
     # NLP Models
     SPACY_MODEL: str = "en_core_web_sm"
+    SPACY_PRELOAD: bool = True
+    NLP_PARSE_EXECUTOR: str = "thread"  # "thread" or "process"
+    NLP_PARSE_WORKERS: int = 2
+    NLP_PARSE_MAX_PENDING: int = 32
+    SPACY_PIPE_BATCH_SIZE: int = 64
+    SPACY_DISABLED_COMPONENTS: list = ["parser", "ner", "lemmatizer"]
+    NLP_LLM_BATCH_SIZE: int = 10
+    NLP_LLM_BUDGET_SECONDS: float = 1.5
+    NLP_LLM_TIMEOUT_SECONDS: float = 20.0
+    NLP_LLM_BACKGROUND_UPGRADE: bool = True
+    NLP_PARSER_VERSION: int = 3  # bump to invalidate cached parses
+    NLP_GAZETTEER_MAX_FOODS: int = 20000
+    NLP_SKIP_LLM_FOR_KNOWN_FOODS: bool = True
+    NLP_PARSE_CACHE_PERSISTENT: bool = True
+    NLP_PARSE_CACHE_MAX_ENTRIES: int = 4096
+    NLP_PARSE_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    
+    # Caching
+    REDIS_URL: Optional[str] = None
+    DASHBOARD_CACHE_TTL_SECONDS: int = 300
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 1024
     
     class Config:
         env_file = ".env"
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
@@ -63,8 +63,72 @@ def get_sync_db():
 # Initialize database
 async def init_db():
     async with async_engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Trigram indexes on foods need pg_trgm
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
+    
+    if async_engine.dialect.name == "postgresql":
+        # Databases from before uq_foods_source_external_id may hold duplicate
+        # FatSecret rows that would stop the index from being built
+        async with async_engine.begin() as conn:
+            if not await relation_exists(conn, "uq_foods_source_external_id"):
+                merged = await _merge_duplicate_foods(conn)
+                if merged:
+                    print(f"Merged {merged} duplicate catalog foods")
+        
+        # Summaries from before uq_daily_nutrition_summaries_user_date need
+        # a one-off migration, which clears them; startup only reports it
+        async with async_engine.connect() as conn:
+            if not await relation_exists(conn, "uq_daily_nutrition_summaries_user_date"):
+                print("daily_nutrition_summaries has no (user_id, date) key; food log writes will fail "
+                      "until `python -m app.jobs.migrate_daily_summaries --confirm` is run")
+    
+    # create_all skips existing tables, so add indexes introduced since.
+    # One transaction each, so an index that can't be built leaves the rest
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                async with async_engine.begin() as conn:
+                    await conn.run_sync(index.create, checkfirst=True)
+            except Exception as e:
+                print(f"Creating index {index.name} failed: {e}")
+
+
+async def relation_exists(conn, name: str) -> bool:
+    """Whether an index (including one backing a unique constraint) exists"""
+    return await conn.scalar(text("SELECT to_regclass(:name)"), {"name": name}) is not None
+
+
+# Catalog rows sharing (source, external_id) and the lowest id among them
+_DUPLICATE_FOODS = """
+    WITH ranked AS (
+        SELECT id, min(id) OVER (PARTITION BY source, external_id) AS keep_id
+        FROM foods
+        WHERE source IS NOT NULL AND external_id IS NOT NULL
+    ), duplicates AS (
+        SELECT id, keep_id FROM ranked WHERE id <> keep_id
+    )
+"""
+
+
+async def _merge_duplicate_foods(conn) -> int:
+    """Point logs and barcodes of duplicate foods at the oldest row, then drop the rest"""
+    for table in ("food_logs", "food_barcodes"):
+        await conn.execute(text(
+            _DUPLICATE_FOODS + f"""
+            UPDATE {table} SET food_id = duplicates.keep_id
+            FROM duplicates WHERE {table}.food_id = duplicates.id
+            """
+        ))
+    
+    # Unit weights of the dropped rows go with them (ON DELETE CASCADE)
+    result = await conn.execute(text(
+        _DUPLICATE_FOODS + "DELETE FROM foods USING duplicates WHERE foods.id = duplicates.id"
+    ))
+    return result.rowcount
 
 
 # Close database connections
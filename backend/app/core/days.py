@@ -0,0 +1,26 @@
+from datetime import datetime, date, time, timedelta, timezone
+from typing import Tuple
+
+
+# Summaries bucket food logs by UTC calendar day, whatever offset the client
+# sent meal_time with and whatever timezone the database session uses
+SUMMARY_TIMEZONE = timezone.utc
+SUMMARY_TIMEZONE_NAME = "UTC"
+
+
+def day_bounds(target_date: date) -> Tuple[datetime, datetime]:
+    """Return the [start, end) instants covering a calendar day in SUMMARY_TIMEZONE"""
+    start = datetime.combine(target_date, time.min, tzinfo=SUMMARY_TIMEZONE)
+    return start, start + timedelta(days=1)
+
+
+def summary_date(moment: datetime) -> date:
+    """Calendar day a timestamp is summarized under; naive values are UTC, as they are stored"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(SUMMARY_TIMEZONE).date()
+
+
+def summary_today() -> date:
+    """The current calendar day in SUMMARY_TIMEZONE"""
+    return datetime.now(SUMMARY_TIMEZONE).date()
@@ -0,0 +1,134 @@
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import random
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open"""
+
+
+class RateLimitedError(Exception):
+    """Raised when a call would wait too long for a rate limit token"""
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter refilling `rate` tokens per second up to `capacity`.
+
+    A caller that finds the bucket empty reserves the next token by taking
+    the count below zero, then sleeps for its place in line; the deficit
+    is everyone queued ahead, so each caller knows its wait up front.
+    """
+
+    def __init__(self, rate: float, capacity: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        """Take a token, sleeping until one is available or raising past max_wait"""
+        # No await between the refill and the reservation, so concurrent
+        # callers each see the reservations made before them
+        self._refill()
+        wait = max(0.0, (1 - self._tokens) / self.rate)
+        if max_wait is not None and wait > max_wait:
+            raise RateLimitedError(f"Rate limit token not available within {max_wait}s")
+        self._tokens -= 1
+        if wait <= 0:
+            return
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            # Hand the reservation back for the next caller
+            self._tokens += 1
+            raise
+
+    def get_state(self) -> Dict[str, Any]:
+        self._refill()
+        return {"tokens": round(max(self._tokens, 0), 2), "rate": self.rate, "capacity": self.capacity}
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+
+class CircuitBreaker:
+    """
+    Fail fast after repeated upstream failures.
+
+    Closed: calls pass through and consecutive failures are counted.
+    Open: calls are rejected until reset_timeout has passed.
+    Half-open: a single trial call decides between closing and re-opening.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+        self._trial_in_flight = False
+
+    def before_call(self) -> bool:
+        """
+        Raise CircuitOpenError if the call must not go upstream.
+
+        Returns whether the call is the half-open trial, which only its
+        caller may release().
+        """
+        if self.state == self.OPEN:
+            if self._clock() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError("Upstream circuit is open")
+            self.state = self.HALF_OPEN
+
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError("Upstream circuit is half-open")
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = self._clock()
+
+    def release(self) -> None:
+        """End a trial call that neither succeeded nor failed upstream (e.g. cancelled)"""
+        self._trial_in_flight = False
+
+    def get_state(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == self.OPEN:
+            retry_in = max(0.0, round(self.reset_timeout - (self._clock() - self.opened_at), 1))
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+            "retry_in_seconds": retry_in,
+        }
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 10.0) -> float:
+    """Exponential backoff with full jitter for the given 0-based retry attempt"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
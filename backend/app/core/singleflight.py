@@ -0,0 +1,43 @@
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key starts the work; callers arriving while it is
+    in flight await the same result (or exception) instead of repeating it.
+    The work runs as its own task, so a cancelled caller doesn't cancel it
+    for everyone else.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stats = {"calls": 0, "executions": 0, "coalesced": 0}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.stats["calls"] += 1
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["executions"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+        # Mark the exception retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
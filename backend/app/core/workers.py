@@ -0,0 +1,94 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import multiprocessing
+
+
+class PoolSaturatedError(Exception):
+    """Raised instead of queueing work on a pool that already has too much pending"""
+
+
+class WorkerPool:
+    """
+    Run blocking or CPU-bound functions off the event loop.
+
+    Work goes to a thread or process pool of `workers`; at most
+    `max_pending` calls may be queued or running at once, and further calls
+    fail fast with PoolSaturatedError so callers can shed load instead of
+    piling up behind a slow pool. Process pools are spawned (not forked) and
+    run `initializer` once per process, e.g. to load a model.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str = "thread",
+        workers: int = 2,
+        max_pending: int = 32,
+        initializer: Optional[Callable[[], None]] = None,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown worker pool kind: {kind}")
+
+        self.name = name
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.initializer = initializer
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self._pending = 0
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self.initializer,
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix=self.name,
+                    initializer=self.initializer,
+                )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) on the pool; fn and args must be picklable for process pools"""
+        if self._pending >= self.max_pending:
+            self.stats["rejected"] += 1
+            raise PoolSaturatedError(f"{self.name} pool has {self._pending} calls pending")
+
+        self._pending += 1
+        self.stats["submitted"] += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        finally:
+            self._pending -= 1
+
+        self.stats["completed"] += 1
+        return result
+
+    def pending(self) -> int:
+        return self._pending
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            **self.stats,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping queued calls"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,188 @@
+"""
+Bulk import of FatSecret foods into the local catalog.
+
+Resolves search terms to FatSecret food ids, fetches each food's details
+with bounded concurrency (still subject to the service's rate limiter and
+circuit breaker) and upserts them into `foods` in batches keyed on
+(source, external_id). Foods imported before are fetched again, so a re-run
+refreshes their nutrition data. Use it to pre-warm the catalog with popular
+foods so user searches are served locally.
+
+Usage:
+    python -m app.jobs.catalog_import --terms-file top_foods.txt
+    python -m app.jobs.catalog_import --ids 33691 4881 --concurrency 8
+"""
+from typing import Iterable, List, Optional, Set
+import argparse
+import asyncio
+import time
+
+from ..core.database import AsyncSessionLocal
+from ..schemas.food import FoodRecord
+from ..services.fatsecret_service import fatsecret_service
+from ..services.catalog import MAX_UPSERT_ROWS, upsert_catalog_statement
+from ..services.unit_weights import unit_weight_index
+
+
+class ImportProgress:
+    """Counters for one import run, reported as it goes"""
+
+    def __init__(self, total: int, report_every: int):
+        self.total = total
+        self.report_every = report_every
+        self.fetched = 0
+        self.failed = 0
+        self.upserted = 0
+        self.started = time.monotonic()
+
+    def record(self, ok: bool) -> None:
+        if ok:
+            self.fetched += 1
+        else:
+            self.failed += 1
+
+        done = self.fetched + self.failed
+        if done % self.report_every == 0 or done == self.total:
+            self.report()
+
+    def report(self) -> None:
+        elapsed = time.monotonic() - self.started
+        done = self.fetched + self.failed
+        rate = done / elapsed if elapsed else 0
+        print(f"   {done}/{self.total} fetched ({self.failed} failed), "
+              f"{self.upserted} upserted ({rate:.1f} foods/sec)")
+
+
+async def resolve_terms(terms: Iterable[str], results_per_term: int, concurrency: int) -> List[str]:
+    """Search each term and return the distinct FatSecret food ids found"""
+    semaphore = asyncio.Semaphore(concurrency)
+    food_ids: List[str] = []
+    seen: Set[str] = set()
+
+    async def search(term: str) -> List[FoodRecord]:
+        async with semaphore:
+            try:
+                return await fatsecret_service.search_foods(term, results_per_term)
+            except Exception as e:
+                print(f"Search for '{term}' failed: {e}")
+                return []
+
+    for foods in await asyncio.gather(*[search(term) for term in terms]):
+        for food in foods:
+            food_id = str(food.id)
+            if food_id not in seen:
+                seen.add(food_id)
+                food_ids.append(food_id)
+    return food_ids
+
+
+async def import_foods(food_ids: List[str], concurrency: int = 8, batch_size: int = 500) -> ImportProgress:
+    """Fetch fresh details for every id and upsert them in batches"""
+    batch_size = max(1, min(batch_size, MAX_UPSERT_ROWS))
+    progress = ImportProgress(len(food_ids), report_every=max(1, min(batch_size, 100)))
+    queue: asyncio.Queue = asyncio.Queue()
+    for food_id in food_ids:
+        queue.put_nowait(food_id)
+
+    batch: List[FoodRecord] = []
+    flush_lock = asyncio.Lock()
+
+    async def flush() -> None:
+        async with flush_lock:
+            if not batch:
+                return
+            foods = batch[:]
+            batch.clear()
+
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(upsert_catalog_statement(foods, update=True))
+                rows = result.all()
+                progress.upserted += len(rows)
+                await unit_weight_index.store(session, {row.external_id: row.id for row in rows}, foods)
+                await session.commit()
+
+    async def worker() -> None:
+        # A fixed pool of workers bounds concurrency without a task per id
+        while True:
+            try:
+                food_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            try:
+                # Re-running the import refreshes foods already in the catalog
+                food = await fatsecret_service.get_food_details(food_id, refresh=True)
+            except Exception as e:
+                print(f"Fetching food {food_id} failed: {e}")
+                food = None
+
+            progress.record(food is not None)
+            if food is not None:
+                batch.append(food)
+                if len(batch) >= batch_size:
+                    await flush()
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    await flush()
+    return progress
+
+
+async def run(
+    terms: List[str],
+    food_ids: List[str],
+    results_per_term: int = 10,
+    concurrency: int = 8,
+    batch_size: int = 500,
+) -> ImportProgress:
+    """Import foods found by the search terms plus the explicit ids"""
+    await fatsecret_service.start()
+    try:
+        if not fatsecret_service.is_available:
+            raise SystemExit("FatSecret credentials are not configured")
+
+        ids = list(dict.fromkeys(food_ids))
+        if terms:
+            print(f"🔎 Resolving {len(terms)} search terms...")
+            for food_id in await resolve_terms(terms, results_per_term, concurrency):
+                if food_id not in ids:
+                    ids.append(food_id)
+
+        print(f"📥 Importing {len(ids)} foods with concurrency {concurrency}")
+        progress = await import_foods(ids, concurrency, batch_size)
+    finally:
+        await fatsecret_service.close()
+
+    elapsed = time.monotonic() - progress.started
+    print(f"✅ Imported {progress.upserted} foods ({progress.failed} failed) in {elapsed:.1f}s "
+          f"({progress.fetched / elapsed if elapsed else 0:.1f} foods/sec)")
+    return progress
+
+
+def _read_lines(path: Optional[str]) -> List[str]:
+    if not path:
+        return []
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import FatSecret foods into the local catalog")
+    parser.add_argument("--terms", nargs="*", default=[], help="Search terms to import results for")
+    parser.add_argument("--terms-file", help="File with one search term per line")
+    parser.add_argument("--ids", nargs="*", default=[], help="FatSecret food ids to import")
+    parser.add_argument("--ids-file", help="File with one FatSecret food id per line")
+    parser.add_argument("--results-per-term", type=int, default=10, help="Search results to import per term")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent upstream requests")
+    parser.add_argument("--batch-size", type=int, default=500, help=f"Foods per upsert statement (at most {MAX_UPSERT_ROWS})")
+    args = parser.parse_args()
+
+    terms = args.terms + _read_lines(args.terms_file)
+    food_ids = args.ids + _read_lines(args.ids_file)
+    if not terms and not food_ids:
+        parser.error("Provide search terms or food ids to import")
+
+    asyncio.run(run(terms, food_ids, args.results_per_term, args.concurrency, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
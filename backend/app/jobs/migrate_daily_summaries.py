@@ -0,0 +1,68 @@
+"""
+One-off migration adding the (user_id, date) key to daily_nutrition_summaries.
+
+Databases created before uq_daily_nutrition_summaries_user_date may hold
+several rows for one day, and their rows were frozen when first read, so
+the increments food log writes now apply would build on wrong totals.
+This DESTRUCTIVELY deletes every stored daily summary and adds the key;
+reads and the nightly rollup job rebuild the rows from food_logs.
+
+Run it once per database, with the API stopped or during a quiet period:
+the table is locked ACCESS EXCLUSIVE while it runs, so summary reads and
+food log writes wait for it. Without --confirm it only reports what it
+would do. Databases created with the key already have nothing to migrate.
+
+Usage:
+    python -m app.jobs.migrate_daily_summaries [--confirm]
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import text
+
+from ..core.database import async_engine, relation_exists
+
+CONSTRAINT = "uq_daily_nutrition_summaries_user_date"
+
+
+async def run(confirm: bool) -> int:
+    """Clear daily summaries and add the key; returns how many rows were deleted"""
+    try:
+        async with async_engine.begin() as conn:
+            if await relation_exists(conn, CONSTRAINT):
+                print(f"✅ {CONSTRAINT} already exists, nothing to migrate")
+                return 0
+
+            if not confirm:
+                rows = await conn.scalar(text("SELECT count(*) FROM daily_nutrition_summaries"))
+                print(f"Would delete {rows} daily summaries and add {CONSTRAINT}; rerun with --confirm")
+                return 0
+
+            # Hold off summary writes from other workers until the key exists
+            await conn.execute(text("LOCK TABLE daily_nutrition_summaries IN ACCESS EXCLUSIVE MODE"))
+            if await relation_exists(conn, CONSTRAINT):
+                return 0
+
+            result = await conn.execute(text("DELETE FROM daily_nutrition_summaries"))
+            await conn.execute(text(
+                f"ALTER TABLE daily_nutrition_summaries ADD CONSTRAINT {CONSTRAINT} UNIQUE (user_id, date)"
+            ))
+    finally:
+        await async_engine.dispose()
+
+    print(f"✅ Cleared {result.rowcount} daily summaries and added {CONSTRAINT}; "
+          f"they are rebuilt from food logs as they are read")
+    return result.rowcount
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Add the (user_id, date) key to daily_nutrition_summaries")
+    parser.add_argument("--confirm", action="store_true",
+                        help="Delete every stored daily summary and add the key")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.confirm))
+
+
+if __name__ == "__main__":
+    main()
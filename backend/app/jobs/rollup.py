@@ -0,0 +1,281 @@
+"""
+Nightly batch materialization of daily summaries and insight features.
+
+Streams active user ids in chunks and, for each chunk, computes the target
+day's DailyNutritionSummary rows and the trailing 7-day insight features
+with one set-based statement each. Chunks are spread across a process pool
+and progress is checkpointed, so an interrupted run resumes where it left
+off.
+
+Only days that are over (in UTC, as summaries are bucketed) can be
+materialized: the job writes absolute totals, which would overwrite
+increments that food log writes make to a day still being logged.
+
+Usage:
+    python -m app.jobs.rollup [--date YYYY-MM-DD] [--chunk-size 500]
+                              [--concurrency 4] [--checkpoint PATH] [--reset]
+"""
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date, timedelta
+from typing import Iterator, List, Optional
+import argparse
+import json
+import os
+import time
+
+from sqlalchemy import create_engine, select, func, extract, literal, Date, cast
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from ..core.config import settings
+from ..core.days import day_bounds, summary_today
+from ..models.user import User
+from ..models.food import FoodLog, MealType
+from ..models.nutrition import DailyNutritionSummary, NutritionGoal, NutritionInsightFeatures
+from ..services.summary_service import (
+    NUTRIENT_COLUMNS, MAIN_MEAL_TYPES, PROGRESS_COLUMNS, progress_expr, summary_time
+)
+
+INSIGHT_WINDOW_DAYS = 7
+
+# Engine owned by each pool worker process
+_worker_engine = None
+
+
+def _init_worker() -> None:
+    global _worker_engine
+    _worker_engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+
+
+def _summary_statement(user_ids: List[int], target_date: date):
+    """Upsert target_date's summary for every user in the chunk in one statement"""
+    start, end = day_bounds(target_date)
+
+    # One active goal per user, even if several are flagged active
+    goal = (
+        select(NutritionGoal)
+        .where(NutritionGoal.is_active == True)
+        .distinct(NutritionGoal.user_id)
+        .order_by(NutritionGoal.user_id, NutritionGoal.id.desc())
+        .subquery()
+    )
+    goals = {
+        "calories_goal": goal.c.daily_calories,
+        "protein_goal_g": goal.c.daily_protein_g,
+        "carbs_goal_g": goal.c.daily_carbs_g,
+        "fat_goal_g": goal.c.daily_fat_g,
+    }
+    totals = {
+        total_column: func.coalesce(func.sum(getattr(FoodLog, log_column)), 0)
+        for log_column, total_column in NUTRIENT_COLUMNS.items()
+    }
+    columns = {
+        "user_id": User.id,
+        "date": literal(target_date),
+        **totals,
+        "total_meals": func.count(FoodLog.id).filter(FoodLog.meal_type.in_(MAIN_MEAL_TYPES)),
+        "total_snacks": func.count(FoodLog.id).filter(FoodLog.meal_type == MealType.SNACK),
+        **goals,
+        **{
+            progress_column: progress_expr(totals[total_column], goals[goal_column])
+            for progress_column, (total_column, goal_column) in PROGRESS_COLUMNS.items()
+        },
+    }
+
+    aggregate = (
+        select(*[expr.label(name) for name, expr in columns.items()])
+        .select_from(User)
+        .outerjoin(FoodLog, (FoodLog.user_id == User.id) & (FoodLog.meal_time >= start) & (FoodLog.meal_time < end))
+        .outerjoin(goal, goal.c.user_id == User.id)
+        .where(User.id.in_(user_ids))
+        .group_by(User.id, *goals.values())
+    )
+    stmt = insert(DailyNutritionSummary).from_select(list(columns), aggregate)
+    return stmt.on_conflict_do_update(
+        constraint="uq_daily_nutrition_summaries_user_date",
+        set_={
+            **{name: stmt.excluded[name] for name in columns if name not in ("user_id", "date")},
+            "updated_at": func.now(),
+        }
+    )
+
+
+def _features_statement(user_ids: List[int], target_date: date):
+    """Upsert the trailing-window insight features for every user in the chunk"""
+    start, _ = day_bounds(target_date - timedelta(days=INSIGHT_WINDOW_DAYS - 1))
+    _, end = day_bounds(target_date)
+
+    columns = {
+        "user_id": User.id,
+        "as_of_date": literal(target_date),
+        "window_days": literal(INSIGHT_WINDOW_DAYS),
+        "avg_calories": func.coalesce(func.sum(FoodLog.calories), 0) / INSIGHT_WINDOW_DAYS,
+        "avg_protein_g": func.coalesce(func.sum(FoodLog.protein), 0) / INSIGHT_WINDOW_DAYS,
+        "avg_carbs_g": func.coalesce(func.sum(FoodLog.carbs), 0) / INSIGHT_WINDOW_DAYS,
+        "avg_fat_g": func.coalesce(func.sum(FoodLog.fat), 0) / INSIGHT_WINDOW_DAYS,
+        "total_entries": func.count(FoodLog.id),
+        "days_logged": func.count(func.distinct(cast(summary_time(FoodLog.meal_time), Date))),
+        "eating_window_hours": extract("epoch", func.max(FoodLog.meal_time) - func.min(FoodLog.meal_time)) / 3600,
+    }
+
+    aggregate = (
+        select(*[expr.label(name) for name, expr in columns.items()])
+        .select_from(User)
+        .outerjoin(FoodLog, (FoodLog.user_id == User.id) & (FoodLog.meal_time >= start) & (FoodLog.meal_time < end))
+        .where(User.id.in_(user_ids))
+        .group_by(User.id)
+    )
+    stmt = insert(NutritionInsightFeatures).from_select(list(columns), aggregate)
+    return stmt.on_conflict_do_update(
+        index_elements=[NutritionInsightFeatures.user_id],
+        set_={
+            **{name: stmt.excluded[name] for name in columns if name != "user_id"},
+            "updated_at": func.now(),
+        }
+    )
+
+
+def process_chunk(user_ids: List[int], target_date: date) -> int:
+    """Materialize one chunk of users inside a pool worker; returns the chunk size"""
+    with Session(_worker_engine) as session:
+        session.execute(_summary_statement(user_ids, target_date))
+        session.execute(_features_statement(user_ids, target_date))
+        session.commit()
+    return len(user_ids)
+
+
+def stream_user_ids(engine, chunk_size: int, after_id: int = 0) -> Iterator[List[int]]:
+    """Yield active user ids in ascending chunks using keyset pagination"""
+    with Session(engine) as session:
+        while True:
+            user_ids = session.scalars(
+                select(User.id)
+                .where(User.is_active == True, User.id > after_id)
+                .order_by(User.id)
+                .limit(chunk_size)
+            ).all()
+            if not user_ids:
+                return
+            yield list(user_ids)
+            after_id = user_ids[-1]
+
+
+def load_checkpoint(path: str, target_date: date) -> int:
+    """Return the last user id fully processed for target_date, or 0"""
+    if not os.path.exists(path):
+        return 0
+
+    with open(path) as f:
+        checkpoint = json.load(f)
+
+    if checkpoint.get("date") != target_date.isoformat():
+        return 0
+    return checkpoint.get("last_user_id", 0)
+
+
+def save_checkpoint(path: str, target_date: date, last_user_id: int) -> None:
+    # Write then rename, so an interruption never leaves a torn checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"date": target_date.isoformat(), "last_user_id": last_user_id}, f)
+    os.replace(tmp_path, path)
+
+
+def run(
+    target_date: date,
+    chunk_size: int = 500,
+    concurrency: Optional[int] = None,
+    checkpoint_path: str = ".rollup_checkpoint.json",
+) -> int:
+    """Run the job for target_date and return the number of users processed"""
+    if target_date >= summary_today():
+        raise ValueError(f"{target_date} is not over yet; only past days can be materialized")
+
+    concurrency = concurrency or os.cpu_count() or 1
+    after_id = load_checkpoint(checkpoint_path, target_date)
+    if after_id:
+        print(f"↩️  Resuming {target_date} after user id {after_id}")
+
+    engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    processed = 0
+    started = time.monotonic()
+
+    # Chunks finish out of order; the checkpoint only advances past a chunk
+    # once every chunk before it has finished too
+    pending = set()
+    finished = set()
+    order = []  # (future, last user id of its chunk) in submission order
+
+    with ProcessPoolExecutor(max_workers=concurrency, initializer=_init_worker) as pool:
+        for user_ids in stream_user_ids(engine, chunk_size, after_id):
+            future = pool.submit(process_chunk, user_ids, target_date)
+            pending.add(future)
+            order.append((future, user_ids[-1]))
+
+            # Keep the pool busy without buffering the whole user table
+            while len(pending) >= concurrency * 2:
+                processed += _collect(pending, finished, wait(pending, return_when=FIRST_COMPLETED).done)
+
+            after_id = _advance_checkpoint(order, finished, checkpoint_path, target_date, after_id)
+            _report(processed, started)
+
+        while pending:
+            processed += _collect(pending, finished, wait(pending, return_when=FIRST_COMPLETED).done)
+            after_id = _advance_checkpoint(order, finished, checkpoint_path, target_date, after_id)
+            _report(processed, started)
+
+    engine.dispose()
+
+    elapsed = time.monotonic() - started
+    print(f"✅ Materialized {processed} users for {target_date} in {elapsed:.1f}s "
+          f"({processed / elapsed if elapsed else 0:.1f} users/sec)")
+    return processed
+
+
+def _collect(pending, finished, done) -> int:
+    processed = 0
+    for future in done:
+        processed += future.result()
+        finished.add(future)
+        pending.discard(future)
+    return processed
+
+
+def _advance_checkpoint(order, finished, checkpoint_path, target_date, after_id) -> int:
+    last_user_id = after_id
+    while order and order[0][0] in finished:
+        future, last_user_id = order.pop(0)
+        finished.discard(future)
+
+    if last_user_id != after_id:
+        save_checkpoint(checkpoint_path, target_date, last_user_id)
+    return last_user_id
+
+
+def _report(processed: int, started: float) -> None:
+    elapsed = time.monotonic() - started
+    if processed and elapsed:
+        print(f"   {processed} users processed ({processed / elapsed:.1f} users/sec)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Materialize daily summaries and insight features for all active users")
+    parser.add_argument("--date", type=date.fromisoformat, default=summary_today() - timedelta(days=1),
+                        help="Past day to materialize (default: yesterday, UTC)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Users per chunk")
+    parser.add_argument("--concurrency", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--checkpoint", default=".rollup_checkpoint.json", help="Checkpoint file path")
+    parser.add_argument("--reset", action="store_true", help="Ignore any existing checkpoint")
+    args = parser.parse_args()
+    if args.date >= summary_today():
+        parser.error(f"--date {args.date} is not over yet; only past days can be materialized")
+
+    if args.reset and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    run(args.date, args.chunk_size, args.concurrency, args.checkpoint)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
@@ -6,6 +7,11 @@ import uvicorn
 
 from .core.config import settings, validate_settings
 from .core.database import init_db, close_db
+from .core.cache import dashboard_cache
+from .services.fatsecret_service import fatsecret_service
+from .services.nlp_service import nlp_service
+from .services.search_service import food_search_service
+from .services.unit_weights import unit_weight_index
 from .api.v1.api import api_router
 
 
@@ -26,10 +32,32 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"❌ Database initialization failed: {e}")
     
+    # Open the pooled FatSecret client shared by all requests
+    await fatsecret_service.start()
+    purged = await fatsecret_service.cache.purge_expired()
+    if purged:
+        print(f"🧹 Purged {purged} expired FatSecret cache entries")
+    purged = await nlp_service.cache.purge_expired()
+    if purged:
+        print(f"🧹 Purged {purged} expired parse cache entries")
+    
+    # Per-food unit weights, kept in memory and refreshed from the table
+    await unit_weight_index.start()
+    
+    # Load the spaCy model in the background; /ready reports when it's done
+    if settings.SPACY_PRELOAD:
+        nlp_service.start_loading()
+    
     yield
     
-    # Shutdown
+    # Shutdown: stop everything that may still use the database, then the engine
     print("🛑 Shutting down Personal AI Nutritionist...")
+    await unit_weight_index.stop()
+    await food_search_service.close()
+    await nlp_service.close()
+    await fatsecret_service.close()
+    print("✅ FatSecret client closed")
+    await dashboard_cache.close()
     await close_db()
     print("✅ Database connections closed")
 
@@ -71,9 +99,31 @@ async def health_check():
         "status": "healthy",
         "app": settings.APP_NAME,
         "version": settings.APP_VERSION,
-        "debug": settings.DEBUG
+        "debug": settings.DEBUG,
+        "fatsecret_cache": fatsecret_service.get_cache_stats(),
+        "nlp_parse_cache": nlp_service.cache.get_stats(),
+        "unit_weights": unit_weight_index.get_stats(),
+        "fatsecret_upstream": {
+            **fatsecret_service.get_resilience_state(),
+            "token": fatsecret_service.tokens.get_state()
+        },
+        "coalescing": {
+            "fatsecret": fatsecret_service.inflight.stats,
+            "nlp_parse": nlp_service.inflight.stats
+        },
+        "nlp": nlp_service.get_state()
     }
 
+# Readiness check, separate from liveness so workers still loading models get no traffic
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check endpoint"""
+    ready = nlp_service.is_ready
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "nlp": nlp_service.get_state()}
+    )
+
 # Root endpoint
 @app.get("/")
 async def root():
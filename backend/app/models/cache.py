@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, DateTime, Text
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class LookupCacheEntry(Base):
+    __tablename__ = "lookup_cache_entries"
+
+    # Namespaced key, e.g. "fatsecret:search:roti:20"
+    key = Column(String(512), primary_key=True)
+    namespace = Column(String(50), nullable=False, index=True)
+
+    # JSON-encoded payload
+    value = Column(Text, nullable=False)
+
+    # Served as-is until fresh_until, served stale and refreshed until expires_at
+    fresh_until = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Enum, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
@@ -15,6 +15,17 @@ class MealType(str, enum.Enum):
 
 class Food(Base):
     __tablename__ = "foods"
+    __table_args__ = (
+        # Trigram indexes back substring and fuzzy search (requires pg_trgm)
+        Index("ix_foods_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_foods_brand_trgm", "brand", postgresql_using="gin", postgresql_ops={"brand": "gin_trgm_ops"}),
+        Index(
+            "ix_foods_regional_variants_trgm", "regional_variants",
+            postgresql_using="gin", postgresql_ops={"regional_variants": "gin_trgm_ops"}
+        ),
+        # One catalog row per upstream food; NULL external ids never collide
+        Index("uq_foods_source_external_id", "source", "external_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
@@ -51,13 +62,51 @@ class Food(Base):
     
     # Relationships
     food_logs = relationship("FoodLog", back_populates="food")
+    barcodes = relationship("FoodBarcode", back_populates="food")
+    unit_weights = relationship("FoodUnitWeight", back_populates="food")
     
     def __repr__(self):
         return f"<Food(id={self.id}, name='{self.name}', calories={self.calories_per_100g})>"
 
 
+class FoodBarcode(Base):
+    __tablename__ = "food_barcodes"
+    
+    # Normalized GTIN-13; several barcodes may point at one food
+    barcode = Column(String(32), primary_key=True)
+    food_id = Column(Integer, ForeignKey("foods.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationships
+    food = relationship("Food", back_populates="barcodes")
+
+
+class FoodUnitWeight(Base):
+    __tablename__ = "food_unit_weights"
+    
+    # Grams in one unit of a food, e.g. one piece of roti or one bowl of dal
+    food_id = Column(Integer, ForeignKey("foods.id", ondelete="CASCADE"), primary_key=True)
+    unit = Column(String(50), primary_key=True)
+    grams = Column(Float, nullable=False)
+    source = Column(String(50), default="fatsecret")  # fatsecret, curated
+    
+    # Timestamps; updated_at is set on insert too so workers can load changes incrementally
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
+    
+    # Relationships
+    food = relationship("Food", back_populates="unit_weights")
+
+
 class FoodLog(Base):
     __tablename__ = "food_logs"
+    __table_args__ = (
+        # Per-user date range scans (daily summaries, dashboard aggregates)
+        Index("ix_food_logs_user_meal_time", "user_id", "meal_time"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
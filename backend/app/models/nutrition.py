@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Date, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Date, Text, Boolean, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
@@ -50,6 +50,10 @@ class NutritionGoal(Base):
 
 class DailyNutritionSummary(Base):
     __tablename__ = "daily_nutrition_summaries"
+    __table_args__ = (
+        # One row per user and day; food log writes upsert against this key
+        UniqueConstraint("user_id", "date", name="uq_daily_nutrition_summaries_user_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -102,3 +106,68 @@ class DailyNutritionSummary(Base):
         
         if self.fat_goal_g and self.fat_goal_g > 0:
             self.fat_progress = min((self.total_fat_g / self.fat_goal_g) * 100, 100)
+
+
+class NutritionRollup(Base):
+    __tablename__ = "nutrition_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "granularity", "period_start", name="uq_nutrition_rollups_user_period"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    # Period covered: week (Monday to Sunday), month or year
+    granularity = Column(String(10), nullable=False)
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+    
+    # Nutrition consumed over the period
+    total_calories = Column(Float, default=0)
+    total_protein_g = Column(Float, default=0)
+    total_carbs_g = Column(Float, default=0)
+    total_fat_g = Column(Float, default=0)
+    total_fiber_g = Column(Float, default=0)
+    total_sugar_g = Column(Float, default=0)
+    total_sodium_mg = Column(Float, default=0)
+    
+    # Entry counts
+    total_meals = Column(Integer, default=0)
+    total_snacks = Column(Integer, default=0)
+    total_entries = Column(Integer, default=0)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<NutritionRollup(id={self.id}, user_id={self.user_id}, granularity='{self.granularity}', period_start={self.period_start})>"
+
+
+class NutritionInsightFeatures(Base):
+    __tablename__ = "nutrition_insight_features"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True)
+    
+    # Window covered: window_days days ending on as_of_date
+    as_of_date = Column(Date, nullable=False)
+    window_days = Column(Integer, nullable=False, default=7)
+    
+    # Daily averages over the window
+    avg_calories = Column(Float, default=0)
+    avg_protein_g = Column(Float, default=0)
+    avg_carbs_g = Column(Float, default=0)
+    avg_fat_g = Column(Float, default=0)
+    
+    # Logging behaviour
+    total_entries = Column(Integer, default=0)
+    days_logged = Column(Integer, default=0)
+    eating_window_hours = Column(Float)  # span between first and last meal in the window
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<NutritionInsightFeatures(user_id={self.user_id}, as_of_date={self.as_of_date})>"
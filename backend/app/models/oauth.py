@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime, Text
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class OAuthToken(Base):
+    __tablename__ = "oauth_tokens"
+
+    # One row per upstream API, e.g. "fatsecret"; shared by every worker
+    provider = Column(String(50), primary_key=True)
+
+    access_token = Column(Text)
+    refresh_token = Column(Text)
+    expires_at = Column(DateTime)  # UTC
+
+    # PKCE verifier between the authorization redirect and the code exchange
+    code_verifier = Column(String(128))
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from dataclasses import dataclass
+from typing import Optional, List, Dict
 from datetime import datetime, date
 from enum import Enum
 
@@ -83,11 +84,39 @@ class FoodResponse(BaseModel):
     category: Optional[str]
     subcategory: Optional[str]
     is_indian_food: bool
+    # Grams in one of each serving measure ("cup", "medium"), when known
+    serving_weights: Optional[Dict[str, float]] = None
     
     class Config:
         from_attributes = True
 
 
+@dataclass(slots=True)
+class FoodRecord:
+    """
+    FoodResponse fields for a FatSecret food, without validation.
+
+    Upstream payloads are decoded into these; endpoints that return one
+    validate it into a FoodResponse through their response_model.
+    """
+    id: int
+    name: str
+    brand: Optional[str]
+    calories_per_100g: Optional[float]
+    protein_per_100g: Optional[float]
+    carbs_per_100g: Optional[float]
+    fat_per_100g: Optional[float]
+    fiber_per_100g: Optional[float]
+    sugar_per_100g: Optional[float]
+    sodium_per_100g: Optional[float]
+    serving_size: Optional[str]
+    serving_weight_grams: Optional[float]
+    category: Optional[str]
+    subcategory: Optional[str]
+    is_indian_food: bool
+    serving_weights: Optional[Dict[str, float]] = None
+
+
 class NaturalLanguageFoodEntry(BaseModel):
     text: str = Field(..., min_length=1, max_length=500)
     meal_type: Optional[MealType] = None
@@ -100,6 +129,10 @@ class NaturalLanguageFoodEntry(BaseModel):
         return v.strip()
 
 
+class NaturalLanguageFoodBatch(BaseModel):
+    entries: List[NaturalLanguageFoodEntry] = Field(..., min_length=1, max_length=100)
+
+
 class FoodSearchQuery(BaseModel):
     query: str = Field(..., min_length=1, max_length=100)
     limit: int = Field(10, ge=1, le=50)
@@ -0,0 +1,185 @@
+import numpy as np
+import warnings
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional
+from datetime import date, timedelta
+
+from ..models.nutrition import NutritionGoal
+from .summary_service import summary_service
+
+
+# Nutrients tracked against goals: (label, summary total column, goal attribute on NutritionGoal)
+NUTRIENTS = [
+    ("calories", "total_calories", "daily_calories"),
+    ("protein", "total_protein_g", "daily_protein_g"),
+    ("carbs", "total_carbs_g", "daily_carbs_g"),
+    ("fat", "total_fat_g", "daily_fat_g"),
+]
+NUTRIENT_INDEX = {label: i for i, (label, _, _) in enumerate(NUTRIENTS)}
+
+ADHERENCE_TOLERANCE = 0.10  # within ±10% of goal counts as on target
+
+
+class AnalyticsService:
+    """
+    Vectorized nutrition analytics over daily nutrient series.
+
+    Series are float arrays shaped (..., days, nutrients) with columns in
+    NUTRIENTS order and goals shaped (..., nutrients); any leading axes are
+    treated as a batch of users, so the same code scores one user or many.
+    """
+
+    async def load_user_series(
+        self, user_id: int, end_date: date, days: int, db: AsyncSession, materialize: bool = True
+    ) -> np.ndarray:
+        """
+        Load a user's daily nutrient totals for the days ending on end_date.
+
+        Days without a summary row are materialized from food logs unless
+        materialize is False, in which case they count as empty.
+        """
+        start_date = end_date - timedelta(days=days - 1)
+        if materialize:
+            summaries = await summary_service.get_summaries(user_id, start_date, end_date, db)
+        else:
+            summaries = await summary_service.get_stored_summaries(user_id, start_date, end_date, db)
+
+        series = np.zeros((days, len(NUTRIENTS)), dtype=np.float64)
+        for summary in summaries:
+            row = (summary.date - start_date).days
+            series[row] = [getattr(summary, column) or 0 for _, column, _ in NUTRIENTS]
+        return series
+
+    def goal_vector(self, goal: Optional[NutritionGoal]) -> np.ndarray:
+        """Goals in NUTRIENTS order; NaN where the user has no goal"""
+        if not goal:
+            return np.full(len(NUTRIENTS), np.nan)
+        return np.array(
+            [getattr(goal, attribute) or np.nan for _, _, attribute in NUTRIENTS],
+            dtype=np.float64
+        )
+
+    def compute_features(self, series: np.ndarray, goals: np.ndarray, window: int = 3) -> Dict[str, np.ndarray]:
+        """
+        Compute every feature in one vectorized pass.
+
+        Returns arrays shaped (..., nutrients) except rolling_mean, which is
+        (..., days - window + 1, nutrients), or has no rows for an empty
+        series. Goals of zero or less count as no goal. An empty series has
+        zero means and NaN goal deviations.
+        """
+        series = np.asarray(series, dtype=np.float64)
+        goals = np.asarray(goals, dtype=np.float64)
+        goals = np.where(goals > 0, goals, np.nan)
+        days = series.shape[-2]
+        window = max(min(window, days), 1)
+
+        mean = series.sum(axis=-2) / max(days, 1)
+        variance = ((series - mean[..., None, :]) ** 2).sum(axis=-2) / max(days, 1)
+
+        # Rolling mean via cumulative sums
+        cumulative = np.cumsum(series, axis=-2)
+        padded = np.concatenate([np.zeros_like(cumulative[..., :1, :]), cumulative], axis=-2)
+        rolling_mean = (padded[..., window:, :] - padded[..., :-window, :]) / window
+
+        # Least-squares slope per nutrient, in units per day
+        x = np.arange(days, dtype=np.float64) - (days - 1) / 2
+        denominator = (x ** 2).sum()
+        slope = (
+            np.einsum("d,...dn->...n", x, series - mean[..., None, :]) / denominator
+            if denominator else np.zeros_like(mean)
+        )
+
+        # Goal comparisons; NaN goals propagate to NaN scores
+        goal = goals[..., None, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            relative = (series - goal) / goal
+            deviation = np.abs(relative).sum(axis=-2) / days
+            goal_ratio = mean / goals
+            coefficient_of_variation = np.where(mean > 0, np.sqrt(variance) / mean, 0.0)
+
+        # Trailing run of on-target days, counted back from the last day
+        on_target = np.abs(np.nan_to_num(relative, nan=np.inf)) <= ADHERENCE_TOLERANCE
+        streak = np.cumprod(on_target[..., ::-1, :], axis=-2).sum(axis=-2)
+
+        return {
+            "mean": mean,
+            "variance": variance,
+            "coefficient_of_variation": coefficient_of_variation,
+            "rolling_mean": rolling_mean,
+            "trend_slope": slope,
+            "goal_ratio": goal_ratio,
+            "goal_deviation": deviation,
+            "adherence_streak": streak,
+            "days_logged": (series[..., NUTRIENT_INDEX["calories"]] > 0).sum(axis=-1),
+        }
+
+    def score_users(self, series: np.ndarray, goals: np.ndarray) -> np.ndarray:
+        """
+        Batch score users from (users, days, nutrients) series and (users, nutrients) goals.
+
+        The score is 100 for intake exactly on goal, falling with the mean
+        relative deviation across nutrients that have a goal.
+        """
+        deviation = self.compute_features(series, goals)["goal_deviation"]
+        with warnings.catch_warnings():
+            # Users without any goal have an all-NaN row
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mean_deviation = np.nanmean(deviation, axis=-1)
+        return np.clip(100 * (1 - np.nan_to_num(mean_deviation, nan=1.0)), 0, 100)
+
+    def build_insights(self, features: Dict[str, np.ndarray], goal: Optional[NutritionGoal]) -> List[Dict[str, Any]]:
+        """Turn one user's features into insight messages"""
+        insights = []
+        calories = NUTRIENT_INDEX["calories"]
+        protein = NUTRIENT_INDEX["protein"]
+        mean = features["mean"]
+
+        if not features["days_logged"]:
+            return insights
+
+        if goal:
+            if mean[calories] < goal.daily_calories * 0.8:
+                insights.append({
+                    "type": "warning",
+                    "title": "Low Calorie Intake",
+                    "message": f"Your average daily calories ({mean[calories]:.0f}) are below your goal ({goal.daily_calories}). Consider adding healthy snacks or increasing portion sizes."
+                })
+
+            if mean[protein] < goal.daily_protein_g * 0.8:
+                insights.append({
+                    "type": "warning",
+                    "title": "Low Protein Intake",
+                    "message": f"Your average daily protein ({mean[protein]:.1f}g) is below your goal ({goal.daily_protein_g}g). Consider adding more protein-rich foods like eggs, chicken, or legumes."
+                })
+
+            # A drift of more than 3% of the goal per day is worth flagging
+            slope = features["trend_slope"][calories]
+            if goal.daily_calories > 0 and abs(slope) > goal.daily_calories * 0.03:
+                direction = "up" if slope > 0 else "down"
+                insights.append({
+                    "type": "info",
+                    "title": f"Calories Trending {direction.capitalize()}",
+                    "message": f"Your daily calories are trending {direction} by about {abs(slope):.0f} kcal per day this week."
+                })
+
+            streak = int(features["adherence_streak"][calories])
+            if streak >= 3:
+                insights.append({
+                    "type": "success",
+                    "title": "On-Target Streak",
+                    "message": f"You've hit your calorie goal (within 10%) {streak} days in a row. Keep it up!"
+                })
+
+        if features["coefficient_of_variation"][calories] > 0.35:
+            insights.append({
+                "type": "info",
+                "title": "Inconsistent Intake",
+                "message": "Your daily calories vary a lot from day to day. Steadier meals can help with energy levels and hunger."
+            })
+
+        return insights
+
+
+# Create service instance
+analytics_service = AnalyticsService()
@@ -0,0 +1,99 @@
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from typing import Any, Dict, List, Optional
+
+from ..core.database import AsyncSessionLocal
+from ..models.food import Food, FoodBarcode
+from ..schemas.food import FoodRecord
+from .unit_weights import unit_weight_index
+
+
+# FoodRecord fields copied into the catalog when importing from FatSecret
+CATALOG_FIELDS = [
+    "name", "brand",
+    "calories_per_100g", "protein_per_100g", "carbs_per_100g", "fat_per_100g",
+    "fiber_per_100g", "sugar_per_100g", "sodium_per_100g",
+    "serving_size", "serving_weight_grams", "category", "subcategory", "is_indian_food",
+]
+
+
+# Rows per upsert_catalog_statement that stay under Postgres' 32767 bind
+# parameters: one per CATALOG_FIELDS column plus source and external_id
+MAX_UPSERT_ROWS = 32767 // (len(CATALOG_FIELDS) + 2)
+
+
+def catalog_values(food: FoodRecord) -> Dict[str, Any]:
+    """Column values for a FatSecret food in the foods table"""
+    values = {field: getattr(food, field) for field in CATALOG_FIELDS}
+    values.update(source="fatsecret", external_id=str(food.id))
+    return values
+
+
+def upsert_catalog_statement(foods: List[FoodRecord], update: bool = False):
+    """
+    Insert FatSecret foods keyed on (source, external_id) in one statement.
+    
+    Existing rows are left alone unless update is set. Returns id, name,
+    brand, regional_variants and external_id of every row written.
+    """
+    # A statement may touch each key only once
+    rows = list({str(food.id): catalog_values(food) for food in foods}.values())
+    stmt = insert(Food).values(rows)
+    
+    if update:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Food.source, Food.external_id],
+            set_={
+                **{field: stmt.excluded[field] for field in CATALOG_FIELDS},
+                "updated_at": func.now(),
+            }
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Food.source, Food.external_id])
+    
+    return stmt.returning(Food.id, Food.name, Food.brand, Food.regional_variants, Food.external_id)
+
+
+def normalize_barcode(barcode: str) -> Optional[str]:
+    """
+    Normalize a scanned code to the GTIN-13 form FatSecret expects.
+    
+    UPC-A (12 digits) and EAN-8 codes are zero-padded; a GTIN-14 with a
+    leading zero is trimmed. Returns None for anything that isn't a barcode.
+    """
+    digits = "".join(ch for ch in barcode if ch.isdigit())
+    if len(digits) == 14 and digits.startswith("0"):
+        digits = digits[1:]
+    if len(digits) < 8 or len(digits) > 13:
+        return None
+    return digits.zfill(13)
+
+
+async def find_food_by_barcode(barcode: str) -> Optional[Food]:
+    """Look up a catalog food by normalized barcode with one indexed query"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Food)
+            .join(FoodBarcode, FoodBarcode.food_id == Food.id)
+            .where(FoodBarcode.barcode == barcode)
+        )
+        return result.scalar_one_or_none()
+
+
+async def store_barcode(barcode: str, food: FoodRecord) -> int:
+    """Import a FatSecret food if needed and link the barcode to it; returns the food id"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(upsert_catalog_statement([food], update=True))
+        food_id = result.first()[0]
+        weights = await unit_weight_index.store(session, {str(food.id): food_id}, [food])
+        
+        stmt = insert(FoodBarcode).values(barcode=barcode, food_id=food_id)
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[FoodBarcode.barcode],
+                set_={"food_id": stmt.excluded.food_id, "updated_at": func.now()}
+            )
+        )
+        await session.commit()
+        unit_weight_index.apply(weights)
+        return food_id
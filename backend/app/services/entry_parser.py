@@ -0,0 +1,282 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import re
+
+from ..schemas.food import ParsedFoodEntry, FoodItem, MealType
+
+
+# Numbers (including decimals and simple fractions), words and list separators
+TOKEN_PATTERN = re.compile(r"\d+(?:\.\d+)?(?:/\d+)?|[a-z]+|[,&+;]")
+
+# Tokens that end one food and start the next
+CONNECTORS = {"and", "with", "plus", "then", "also", ",", "&", "+", ";"}
+
+# Words that never name a food on their own
+FILLER_WORDS = {
+    "i", "we", "had", "have", "ate", "eaten", "eat", "drank", "drink", "took",
+    "some", "of", "the", "my", "for", "at", "in", "on", "to", "was", "were",
+    "today", "yesterday", "tonight", "morning", "evening", "just", "about",
+    "around", "approx", "approximately", "x", "s", "little", "bit", "small",
+    "large", "big", "medium", "full", "more", "extra",
+}
+
+# Number words beyond NLPService.quantity_patterns
+EXTRA_NUMBER_WORDS = {
+    "a": 1, "an": 1, "another": 1, "single": 1, "couple": 2, "double": 2,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "dozen": 12,
+}
+
+MEAL_WORDS = {
+    "breakfast": MealType.BREAKFAST,
+    "lunch": MealType.LUNCH,
+    "dinner": MealType.DINNER,
+    "supper": MealType.DINNER,
+    "snack": MealType.SNACK,
+    "snacks": MealType.SNACK,
+}
+
+NUMBER, UNIT, FOOD = "number", "unit", "food"
+
+# Trie key marking the end of a phrase; tokens are never empty
+_TERMINAL = ""
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def plural_forms(word: str) -> List[str]:
+    """Common English plurals of word, for matching "rotis" or "samosas" to their singular"""
+    forms = [word + "s", word + "es"]
+    if word.endswith("y") and len(word) > 2:
+        forms.append(word[:-1] + "ies")
+    return forms
+
+
+def singular_form(word: str) -> str:
+    """Undo the plurals plural_forms() makes, so "idlis" or "tomatoes" match the catalog"""
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("ches", "shes", "sses", "xes", "oes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us")) and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+class Gazetteer:
+    """
+    Token trie of known phrases (foods, units, number words).
+
+    match() finds the longest phrase starting at a token position, so a
+    scan over an entry costs at most max_phrase_tokens steps per token.
+    The first registration of a phrase wins, which lets curated aliases
+    take precedence over catalog names added later.
+    """
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+        self.max_phrase_tokens = 0
+        self.size = 0
+
+    def add(self, phrase: str, kind: str, value: Any) -> bool:
+        tokens = [token for token in tokenize(phrase) if token not in CONNECTORS]
+        if not tokens:
+            return False
+
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if _TERMINAL in node:
+            return False
+
+        node[_TERMINAL] = (kind, value)
+        self.max_phrase_tokens = max(self.max_phrase_tokens, len(tokens))
+        self.size += 1
+        return True
+
+    def match(self, tokens: List[str], start: int) -> Optional[Tuple[int, str, Any]]:
+        """Longest phrase at tokens[start:] as (end, kind, value), or None"""
+        node = self._root
+        best = None
+        for i in range(start, min(len(tokens), start + self.max_phrase_tokens)):
+            node = node.get(tokens[i])
+            if node is None:
+                break
+            if _TERMINAL in node:
+                best = (i + 1, *node[_TERMINAL])
+        return best
+
+
+class RuleParser:
+    """
+    Single-pass parser for entries like "2 rotis, a bowl of dal and chai".
+
+    Tokens are matched against the gazetteer left to right; numbers and
+    units are held until the next food, which takes them. A quantity after
+    a food ("rotis 2", "dal 1 bowl") attaches to it when its segment ends.
+    Words the gazetteer doesn't know lower the confidence of the result. Right
+    before a known food they name it more precisely ("chicken curry", "brown
+    rice") and are kept as a prefix for the catalog to resolve; on their own
+    they become a food only if nothing known was found in their segment, with
+    their last word singularized. Known foods with nothing between them lower
+    the confidence too: "orange juice" and "dal chawal" read alike, so a
+    better parser should decide. Items with a quantity of zero are dropped.
+    """
+
+    KNOWN_CONFIDENCE = 0.8
+    MIXED_CONFIDENCE = 0.6
+    UNKNOWN_CONFIDENCE = 0.5
+    EMPTY_CONFIDENCE = 0.3
+
+    def __init__(self, infer_unit: Callable[[str], str]):
+        self.gazetteer = Gazetteer()
+        self.infer_unit = infer_unit
+        self.catalog_foods = 0
+
+    def add_numbers(self, numbers: Dict[str, float]) -> None:
+        for word, value in numbers.items():
+            self.gazetteer.add(word.replace("_", " "), NUMBER, float(value))
+
+    def add_units(self, aliases: Dict[str, str]) -> None:
+        for alias, unit in aliases.items():
+            self.gazetteer.add(alias, UNIT, unit)
+
+    def add_foods(self, names: Iterable[str], units: Optional[Dict[str, str]] = None) -> int:
+        """Register food names (and their plurals); returns how many were new"""
+        added = 0
+        for name in names:
+            name = " ".join(tokenize(name))
+            if not name or name in FILLER_WORDS or name in MEAL_WORDS:
+                continue
+
+            unit = (units or {}).get(name) or self.infer_unit(name)
+            if self.gazetteer.add(name, FOOD, (name, unit)):
+                added += 1
+                head, _, last = name.rpartition(" ")
+                for plural in plural_forms(last):
+                    self.gazetteer.add(f"{head} {plural}".strip(), FOOD, (name, unit))
+        return added
+
+    def parse(self, text: str, meal_type: Optional[MealType] = None) -> ParsedFoodEntry:
+        tokens = tokenize(text)
+        foods: List[FoodItem] = []
+        known = unknown = 0
+        detected_meal: Optional[MealType] = None
+
+        # Pending state for the item being assembled
+        quantity: Optional[float] = None
+        unit: Optional[str] = None
+        words: List[str] = []
+        # Token position right after the last unknown word
+        words_end: Optional[int] = None
+        # Index in foods of the segment's last item without an explicit quantity
+        open_item: Optional[int] = None
+        segment_has_food = False
+        # Token position right after the last food, and whether two foods touched
+        last_food_end: Optional[int] = None
+        adjacent_foods = False
+
+        def end_segment() -> None:
+            nonlocal quantity, unit, words, open_item, segment_has_food, unknown
+            if words and not segment_has_food:
+                item = " ".join(words[:-1] + [singular_form(words[-1])])
+                foods.append(FoodItem(
+                    item=item,
+                    quantity=quantity if quantity is not None else 1.0,
+                    unit=unit or self.infer_unit(item)
+                ))
+                unknown += 1
+            elif words:
+                # Unknown words after the segment's food: "dal tadka"
+                unknown += 1
+            elif quantity is not None and open_item is not None:
+                # Trailing quantity: "rotis 2", "dal 1 bowl"
+                food = foods[open_item]
+                food.quantity = quantity
+                if unit:
+                    food.unit = unit
+            quantity, unit, words, open_item, segment_has_food = None, None, [], None, False
+
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token in CONNECTORS:
+                end_segment()
+                i += 1
+                continue
+
+            match = self.gazetteer.match(tokens, i)
+            if match is None:
+                if token in MEAL_WORDS:
+                    detected_meal = detected_meal or MEAL_WORDS[token]
+                elif token[0].isdigit():
+                    quantity = _parse_number(token)
+                elif token in EXTRA_NUMBER_WORDS:
+                    # "half a bowl": the article doesn't replace the quantity
+                    if quantity is None:
+                        quantity = float(EXTRA_NUMBER_WORDS[token])
+                elif token not in FILLER_WORDS:
+                    words.append(token)
+                    words_end = i + 1
+                i += 1
+                continue
+
+            end, kind, value = match
+            if kind == NUMBER:
+                quantity = value
+            elif kind == UNIT:
+                unit = value
+            else:
+                name, default_unit = value
+                if last_food_end == i and quantity is None and unit is None:
+                    adjacent_foods = True
+                if words:
+                    if words_end == i:
+                        name = " ".join(words + [name])
+                    unknown += 1
+                foods.append(FoodItem(
+                    item=name,
+                    quantity=quantity if quantity is not None else 1.0,
+                    unit=unit or default_unit
+                ))
+                open_item = len(foods) - 1 if quantity is None else None
+                known += 1
+                segment_has_food = True
+                last_food_end = end
+                quantity, unit, words = None, None, []
+            i = end
+        end_segment()
+
+        return ParsedFoodEntry(
+            foods=[food for food in _merge_repeats(foods) if food.quantity > 0],
+            meal_type=meal_type or detected_meal or MealType.OTHER,
+            confidence=self._confidence(known, unknown, adjacent_foods)
+        )
+
+    def _confidence(self, known: int, unknown: int, adjacent_foods: bool = False) -> float:
+        if known and not unknown and not adjacent_foods:
+            return self.KNOWN_CONFIDENCE
+        if known:
+            return self.MIXED_CONFIDENCE
+        if unknown:
+            return self.UNKNOWN_CONFIDENCE
+        return self.EMPTY_CONFIDENCE
+
+
+def _parse_number(token: str) -> float:
+    if "/" in token:
+        numerator, denominator = token.split("/")
+        return float(numerator) / float(denominator) if float(denominator) else 1.0
+    return float(token)
+
+
+def _merge_repeats(foods: List[FoodItem]) -> List[FoodItem]:
+    """Sum quantities of the same item in the same unit ("a roti ... and another roti")"""
+    merged: Dict[Tuple[str, str], FoodItem] = {}
+    for food in foods:
+        key = (food.item, food.unit)
+        if key in merged:
+            merged[key].quantity += food.quantity
+        else:
+            merged[key] = food
+    return list(merged.values())
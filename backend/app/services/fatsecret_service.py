@@ -1,18 +1,75 @@
 import httpx
-import json
+import asyncio
 from typing import List, Dict, Any, Optional
+from dataclasses import asdict, fields
+from sqlalchemy import select
+from ..core import fastjson
 from ..core.config import settings
-from ..schemas.food import FoodResponse
+from ..core.cache import InMemoryCache
+from ..core.database import AsyncSessionLocal
+from ..core.singleflight import SingleFlight
+from ..core.resilience import TokenBucket, CircuitBreaker, backoff_delay
+from ..models.food import Food
+from ..schemas.food import FoodRecord
+from .catalog import normalize_barcode, find_food_by_barcode, store_barcode
+from .lookup_cache import LookupCache
+from .token_manager import TokenManager
+from .food_matching import indian_food_matcher
 import base64
 import hashlib
-import time
-import hmac
+import re
+
+
+# Catalog columns that fill a FoodRecord for a stored food
+STORED_FOOD_FIELDS = [field.name for field in fields(FoodRecord) if field.name != 'serving_weights']
+
+# Per-serving nutrient fields in FatSecret payloads and our per-100g fields
+SERVING_NUTRIENTS = [
+    ('calories', 'calories_per_100g'),
+    ('protein', 'protein_per_100g'),
+    ('carbohydrate', 'carbs_per_100g'),
+    ('fat', 'fat_per_100g'),
+    ('fiber', 'fiber_per_100g'),
+    ('sugar', 'sugar_per_100g'),
+    ('sodium', 'sodium_per_100g'),
+]
+
+# Grams per metric serving unit in FatSecret payloads; ml is taken as 1 g
+METRIC_UNIT_GRAMS = {'g': 1.0, 'ml': 1.0, 'oz': 28.35}
+
+# Leading counts and parenthetical notes in measurement descriptions ("1/2 cup (cooked)")
+MEASUREMENT_NOISE = re.compile(r"^[\d./\s]+|\(.*?\)")
+
+
+def _serving_weights(servings: List[Dict[str, Any]]) -> Optional[Dict[str, float]]:
+    """Grams in one of each serving measure, keyed by its description"""
+    weights: Dict[str, float] = {}
+    for serving in servings:
+        factor = METRIC_UNIT_GRAMS.get(serving.get('metric_serving_unit'))
+        description = MEASUREMENT_NOISE.sub('', serving.get('measurement_description') or '')
+        description = description.split(',')[0].strip().lower()
+        if not factor or not description:
+            continue
+        
+        try:
+            amount = float(serving.get('metric_serving_amount') or 0) * factor
+            units = float(serving.get('number_of_units') or 1)
+        except ValueError:
+            continue
+        if amount > 0 and units > 0:
+            weights.setdefault(description, round(amount / units, 2))
+    return weights or None
 
 
 class FatSecretService:
     """Service for interacting with FatSecret API"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[LookupCache] = None,
+        tokens: Optional[TokenManager] = None
+    ):
         self.client_id = settings.FATSECRET_CLIENT_ID
         self.client_secret = settings.FATSECRET_CLIENT_SECRET
         self.redirect_uri = settings.FATSECRET_REDIRECT_URI
@@ -20,36 +77,127 @@ class FatSecretService:
         self.auth_url = "https://oauth.fatsecret.com/connect/authorize"
         self.token_url = "https://oauth.fatsecret.com/connect/token"
         
-        # OAuth 2.0 PKCE parameters
-        self.code_verifier = None
-        self.code_challenge = None
-        self.access_token = None
-        self.refresh_token = None
+        # OAuth tokens live in a shared store and are refreshed ahead of expiry;
+        # client credentials let every worker authenticate without a user flow
+        client_credentials_grant = None
+        if self.client_id and self.client_secret:
+            client_credentials_grant = {
+                'grant_type': 'client_credentials',
+                'scope': settings.FATSECRET_TOKEN_SCOPE
+            }
+        self.tokens = tokens or TokenManager(
+            provider="fatsecret",
+            request_token=self._request_token,
+            client_credentials_grant=client_credentials_grant,
+            refresh_margin=settings.FATSECRET_TOKEN_REFRESH_MARGIN_SECONDS
+        )
+        
+        # Long-lived HTTP client, opened by the app lifespan; a custom
+        # transport (e.g. httpx.MockTransport) can stand in for the API
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # Search, food and barcode lookups are cached in memory and in the database
+        self.cache = cache or LookupCache(
+            namespace="fatsecret",
+            local=InMemoryCache(settings.FATSECRET_CACHE_MAX_ENTRIES),
+            persistent=settings.FATSECRET_CACHE_PERSISTENT,
+            stale_seconds=settings.FATSECRET_CACHE_STALE_SECONDS
+        )
+        
+        # Concurrent misses for the same key share one upstream request
+        self.inflight = SingleFlight("fatsecret")
+        
+        # Stay under the API quota and stop calling a degraded upstream
+        self.rate_limiter = TokenBucket(
+            rate=settings.FATSECRET_RATE_LIMIT_PER_SECOND,
+            capacity=settings.FATSECRET_RATE_LIMIT_BURST
+        )
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=settings.FATSECRET_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.FATSECRET_BREAKER_RESET_SECONDS
+        )
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled client, created on first use outside the lifespan"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+    
+    def _create_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.FATSECRET_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.FATSECRET_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.FATSECRET_KEEPALIVE_EXPIRY_SECONDS
+        )
+        timeout = httpx.Timeout(
+            settings.FATSECRET_READ_TIMEOUT_SECONDS,
+            connect=settings.FATSECRET_CONNECT_TIMEOUT_SECONDS
+        )
+        
+        http2 = settings.FATSECRET_HTTP2 and self._transport is None
+        if http2:
+            try:
+                import h2  # noqa: F401 - optional, installed by httpx[http2]
+            except ImportError:
+                print("h2 package not installed; FatSecret client falls back to HTTP/1.1")
+                http2 = False
+        
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=limits,
+            timeout=timeout,
+            transport=self._transport
+        )
+    
+    @property
+    def access_token(self) -> Optional[str]:
+        return self.tokens.access_token
+    
+    @property
+    def is_available(self) -> bool:
+        """Whether upstream calls can authenticate at all"""
+        return self.tokens.can_authenticate
+    
+    async def start(self) -> None:
+        """Open the shared client ahead of the first request and start token refreshes"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        await self.tokens.start()
+    
+    async def close(self) -> None:
+        """Close the shared client and its pooled connections"""
+        await self.tokens.stop()
+        await self.cache.close()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     def _generate_pkce_params(self):
         """Generate PKCE code verifier and challenge"""
         import secrets
-        import base64
         
         # Generate random code verifier
-        self.code_verifier = base64.urlsafe_b64encode(secrets.token_bytes(32)).decode('utf-8').rstrip('=')
+        code_verifier = base64.urlsafe_b64encode(secrets.token_bytes(32)).decode('utf-8').rstrip('=')
         
         # Generate code challenge
-        code_challenge_bytes = hashlib.sha256(self.code_verifier.encode('utf-8')).digest()
-        self.code_challenge = base64.urlsafe_b64encode(code_challenge_bytes).decode('utf-8').rstrip('=')
+        code_challenge_bytes = hashlib.sha256(code_verifier.encode('utf-8')).digest()
+        code_challenge = base64.urlsafe_b64encode(code_challenge_bytes).decode('utf-8').rstrip('=')
         
-        return self.code_verifier, self.code_challenge
+        return code_verifier, code_challenge
     
-    def get_authorization_url(self) -> str:
+    async def get_authorization_url(self) -> str:
         """Get OAuth 2.0 authorization URL"""
-        self._generate_pkce_params()
+        code_verifier, code_challenge = self._generate_pkce_params()
+        await self.tokens.save_code_verifier(code_verifier)
         
         params = {
             'response_type': 'code',
             'client_id': self.client_id,
             'redirect_uri': self.redirect_uri,
             'scope': 'basic',
-            'code_challenge': self.code_challenge,
+            'code_challenge': code_challenge,
             'code_challenge_method': 'S256'
         }
         
@@ -58,52 +206,188 @@ class FatSecretService:
     
     async def exchange_code_for_token(self, authorization_code: str) -> Dict[str, Any]:
         """Exchange authorization code for access token"""
-        data = {
+        token_data = await self._request_token({
             'grant_type': 'authorization_code',
-            'client_id': self.client_id,
-            'client_secret': self.client_secret,
             'redirect_uri': self.redirect_uri,
             'code': authorization_code,
-            'code_verifier': self.code_verifier
-        }
+            'code_verifier': await self.tokens.load_code_verifier()
+        })
+        await self.tokens.save_tokens(token_data)
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(self.token_url, data=data)
-            response.raise_for_status()
-            
-            token_data = response.json()
-            self.access_token = token_data['access_token']
-            self.refresh_token = token_data.get('refresh_token')
-            
-            return token_data
+        return token_data
     
-    async def refresh_access_token(self) -> Dict[str, Any]:
-        """Refresh access token using refresh token"""
-        if not self.refresh_token:
-            raise ValueError("No refresh token available")
+    async def refresh_access_token(self) -> str:
+        """Force a token refresh, e.g. after the upstream rejected the current one"""
+        return await self.tokens.get_access_token(rejected=self.tokens.access_token)
+    
+    async def _request_token(self, data: Dict[str, str]) -> Dict[str, Any]:
+        """POST a grant to the token endpoint"""
+        response = await self.client.post(
+            self.token_url,
+            data=data,
+            auth=(self.client_id or '', self.client_secret or '')
+        )
+        response.raise_for_status()
         
-        data = {
-            'grant_type': 'refresh_token',
-            'client_id': self.client_id,
-            'client_secret': self.client_secret,
-            'refresh_token': self.refresh_token
+        return fastjson.loads(response.content)
+    
+    async def search_foods(self, query: str, max_results: int = 20) -> List[FoodRecord]:
+        """Search for foods in FatSecret database"""
+        key = f"search:{' '.join(query.lower().split())}:{max_results}"
+        return await self.cache.get_or_fetch(
+            key,
+            lambda: self.inflight.do(key, lambda: self._fetch_search_foods(query, max_results)),
+            ttl=settings.FATSECRET_SEARCH_TTL_SECONDS,
+            encode=_encode_foods,
+            decode=_decode_foods
+        )
+    
+    async def get_food_details(self, food_id: str, refresh: bool = False) -> Optional[FoodRecord]:
+        """
+        Get detailed nutrition information for a specific food.
+        
+        With refresh, the stored row and cached response are skipped and the
+        food is fetched from FatSecret, replacing the cached response.
+        """
+        key = f"food:{food_id}"
+        if refresh:
+            food = await self.inflight.do(f"{key}:refresh", lambda: self._fetch_food_details(food_id))
+            if food:
+                await self.cache.set(key, food, ttl=_food_ttl, encode=_encode_food)
+            return food
+        
+        # Foods we've already imported don't need an API call at all
+        if self.cache.persistent:
+            stored_food = await self._get_stored_food(food_id)
+            if stored_food:
+                return stored_food
+        
+        return await self.cache.get_or_fetch(
+            key,
+            lambda: self.inflight.do(key, lambda: self._fetch_food_details(food_id)),
+            ttl=_food_ttl,
+            encode=_encode_food,
+            decode=_decode_food
+        )
+    
+    async def get_food_by_barcode(self, barcode: str) -> Optional[FoodRecord]:
+        """Get food information by barcode"""
+        barcode = normalize_barcode(barcode)
+        if not barcode:
+            return None
+        
+        # Barcodes scanned before resolve with one indexed query instead of
+        # two dependent API calls
+        if self.cache.persistent:
+            try:
+                food = await find_food_by_barcode(barcode)
+            except Exception as e:
+                print(f"Barcode index lookup failed: {e}")
+                food = None
+            if food:
+                return self._stored_food_response(food)
+        
+        key = f"barcode:{barcode}"
+        return await self.cache.get_or_fetch(
+            key,
+            lambda: self.inflight.do(key, lambda: self._fetch_food_by_barcode(barcode)),
+            ttl=_barcode_ttl,
+            encode=_encode_food,
+            decode=_decode_food
+        )
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the lookup cache"""
+        return self.cache.get_stats()
+    
+    def get_resilience_state(self) -> Dict[str, Any]:
+        """Circuit breaker and rate limiter state for monitoring"""
+        return {
+            "circuit_breaker": self.circuit_breaker.get_state(),
+            "rate_limiter": self.rate_limiter.get_state()
         }
+    
+    async def _api_get(self, params: Dict[str, Any]) -> httpx.Response:
+        """
+        GET the REST API through the circuit breaker and rate limiter.
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(self.token_url, data=data)
-            response.raise_for_status()
-            
-            token_data = response.json()
-            self.access_token = token_data['access_token']
-            self.refresh_token = token_data.get('refresh_token', self.refresh_token)
-            
-            return token_data
+        Timeouts, connection errors, 429s and 5xx responses are retried with
+        jittered exponential backoff and count toward opening the circuit;
+        a 401 triggers one token refresh and retry; other errors are raised
+        straight away.
+        """
+        access_token = await self.tokens.get_access_token()
+        trial = self.circuit_breaker.before_call()
+        
+        try:
+            attempt = 0
+            refreshed_token = False
+            while True:
+                await self.rate_limiter.acquire(max_wait=settings.FATSECRET_RATE_LIMIT_MAX_WAIT_SECONDS)
+                
+                try:
+                    headers = {'Authorization': f'Bearer {access_token}'}
+                    response = await self.client.get(self.base_url, params=params, headers=headers)
+                    if response.status_code == 401 and not refreshed_token:
+                        # Revoked or expired early; another worker may already have a new one
+                        access_token = await self.tokens.get_access_token(rejected=access_token)
+                        refreshed_token = True
+                        continue
+                    if response.status_code != 429 and response.status_code < 500:
+                        response.raise_for_status()
+                        self.circuit_breaker.record_success()
+                        return response
+                    error = httpx.HTTPStatusError(
+                        f"FatSecret returned {response.status_code}",
+                        request=response.request,
+                        response=response
+                    )
+                except httpx.HTTPStatusError:
+                    # A 4xx is our problem, not the upstream's
+                    self.circuit_breaker.record_success()
+                    raise
+                except httpx.TransportError as e:
+                    error = e
+                
+                if attempt >= settings.FATSECRET_MAX_RETRIES:
+                    self.circuit_breaker.record_failure()
+                    raise error
+                
+                await asyncio.sleep(backoff_delay(attempt, settings.FATSECRET_RETRY_BASE_DELAY_SECONDS))
+                attempt += 1
+        finally:
+            # Cancellation or a rate limit rejection mustn't wedge a half-open
+            # trial; calls from before the circuit opened aren't the trial
+            if trial:
+                self.circuit_breaker.release()
     
-    async def search_foods(self, query: str, max_results: int = 20) -> List[FoodResponse]:
-        """Search for foods in FatSecret database"""
-        if not self.access_token:
-            raise ValueError("No access token available. Please authenticate first.")
+    async def _get_stored_food(self, food_id: str) -> Optional[FoodRecord]:
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(Food).where(
+                        Food.source == "fatsecret",
+                        Food.external_id == str(food_id)
+                    ).limit(1)
+                )
+                food = result.scalar_one_or_none()
+        except Exception as e:
+            print(f"Stored food lookup failed: {e}")
+            return None
         
+        if not food:
+            return None
+        
+        return self._stored_food_response(food)
+    
+    def _stored_food_response(self, food: Food) -> FoodRecord:
+        record = FoodRecord(**{field: getattr(food, field) for field in STORED_FOOD_FIELDS})
+        # Keep FatSecret's id so callers see the same shape as an API result
+        if food.source == "fatsecret" and food.external_id:
+            record.id = int(food.external_id)
+        return record
+    
+    async def _fetch_search_foods(self, query: str, max_results: int) -> List[FoodRecord]:
         params = {
             'method': 'foods.search',
             'search_expression': query,
@@ -111,79 +395,73 @@ class FatSecretService:
             'format': 'json'
         }
         
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json'
-        }
+        response = await self._api_get(params)
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.base_url, params=params, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            foods = data.get('foods', {}).get('food', [])
-            
-            # Convert to list if single food item
-            if not isinstance(foods, list):
-                foods = [foods]
-            
-            return [self._convert_fatsecret_food(food) for food in foods]
-    
-    async def get_food_details(self, food_id: str) -> Optional[FoodResponse]:
-        """Get detailed nutrition information for a specific food"""
-        if not self.access_token:
-            raise ValueError("No access token available. Please authenticate first.")
+        data = fastjson.loads(response.content)
+        foods = data.get('foods', {}).get('food', [])
         
+        # Convert to list if single food item
+        if not isinstance(foods, list):
+            foods = [foods]
+        
+        return self._convert_fatsecret_foods([food for food in foods if food.get('food_id')])
+    
+    async def _fetch_food_details(self, food_id: str) -> Optional[FoodRecord]:
         params = {
             'method': 'food.get.v2',
             'food_id': food_id,
             'format': 'json'
         }
         
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json'
-        }
+        response = await self._api_get(params)
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.base_url, params=params, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            food = data.get('food', {})
-            
-            return self._convert_fatsecret_food(food)
-    
-    async def get_food_by_barcode(self, barcode: str) -> Optional[FoodResponse]:
-        """Get food information by barcode"""
-        if not self.access_token:
-            raise ValueError("No access token available. Please authenticate first.")
+        data = fastjson.loads(response.content)
+        food = data.get('food')
         
+        # Unknown ids come back as an error payload, which has no food
+        if not food or not food.get('food_id'):
+            return None
+        
+        return self._convert_fatsecret_food(food)
+    
+    async def _fetch_food_by_barcode(self, barcode: str) -> Optional[FoodRecord]:
         params = {
             'method': 'food.find_id_for_barcode',
             'barcode': barcode,
             'format': 'json'
         }
         
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json'
-        }
+        response = await self._api_get(params)
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.base_url, params=params, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            food_id = data.get('food_id')
-            
-            if food_id:
-                return await self.get_food_details(food_id)
-            
+        data = fastjson.loads(response.content)
+        food_id = data.get('food_id')
+        
+        # Unknown barcodes come back as {"food_id": {"value": "0"}}
+        if isinstance(food_id, dict):
+            food_id = food_id.get('value')
+        if not food_id or str(food_id) == "0":
             return None
+        
+        # Skips the second hop when the food is already in the catalog
+        food = await self.get_food_details(food_id)
+        if food and self.cache.persistent:
+            try:
+                await store_barcode(barcode, food)
+            except Exception as e:
+                print(f"Storing barcode {barcode} failed: {e}")
+        
+        return food
+    
+    def _convert_fatsecret_food(self, fatsecret_food: Dict[str, Any]) -> FoodRecord:
+        """Convert FatSecret food data to a FoodRecord"""
+        return FoodRecord(**self._convert_fatsecret_record(fatsecret_food))
+    
+    def _convert_fatsecret_foods(self, fatsecret_foods: List[Dict[str, Any]]) -> List[FoodRecord]:
+        """Convert a list of FatSecret foods; nothing is validated until a response needs it"""
+        return [FoodRecord(**self._convert_fatsecret_record(food)) for food in fatsecret_foods]
     
-    def _convert_fatsecret_food(self, fatsecret_food: Dict[str, Any]) -> FoodResponse:
-        """Convert FatSecret food data to our FoodResponse schema"""
+    def _convert_fatsecret_record(self, fatsecret_food: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert FatSecret food data to a plain dict of FoodRecord fields"""
         
         # Extract nutrition information
         servings = fatsecret_food.get('servings', {}).get('serving', [])
@@ -194,92 +472,65 @@ class FatSecretService:
         first_serving = servings[0] if servings else {}
         
         # Calculate nutrition per 100g
-        serving_size = first_serving.get('metric_serving_amount', 0)
+        serving_size = float(first_serving.get('metric_serving_amount') or 0)
         if serving_size == 0:
-            serving_size = 100
-        
-        calories_per_100g = None
-        protein_per_100g = None
-        carbs_per_100g = None
-        fat_per_100g = None
-        fiber_per_100g = None
-        sugar_per_100g = None
-        sodium_per_100g = None
-        
-        if first_serving:
-            # Calculate per 100g values
-            multiplier = 100 / serving_size
-            
-            calories = float(first_serving.get('calories', 0))
-            calories_per_100g = calories * multiplier
-            
-            protein = float(first_serving.get('protein', 0))
-            protein_per_100g = protein * multiplier
-            
-            carbs = float(first_serving.get('carbohydrate', 0))
-            carbs_per_100g = carbs * multiplier
-            
-            fat = float(first_serving.get('fat', 0))
-            fat_per_100g = fat * multiplier
-            
-            fiber = float(first_serving.get('fiber', 0))
-            fiber_per_100g = fiber * multiplier
-            
-            sugar = float(first_serving.get('sugar', 0))
-            sugar_per_100g = sugar * multiplier
-            
-            sodium = float(first_serving.get('sodium', 0))
-            sodium_per_100g = sodium * multiplier
-        
-        # Determine if it's Indian food based on name
-        food_name = fatsecret_food.get('food_name', '').lower()
-        indian_food_keywords = [
-            'roti', 'chapati', 'dal', 'lentil', 'curry', 'naan', 'paratha',
-            'puri', 'biryani', 'pulao', 'samosa', 'pakora', 'gulab jamun',
-            'rasgulla', 'jalebi', 'lassi', 'chai', 'masala', 'tandoori'
-        ]
-        
-        is_indian_food = any(keyword in food_name for keyword in indian_food_keywords)
-        
-        return FoodResponse(
-            id=int(fatsecret_food.get('food_id', 0)),
-            name=fatsecret_food.get('food_name', ''),
-            brand=fatsecret_food.get('brand_name'),
-            calories_per_100g=calories_per_100g,
-            protein_per_100g=protein_per_100g,
-            carbs_per_100g=carbs_per_100g,
-            fat_per_100g=fat_per_100g,
-            fiber_per_100g=fiber_per_100g,
-            sugar_per_100g=sugar_per_100g,
-            sodium_per_100g=sodium_per_100g,
-            serving_size=first_serving.get('metric_serving_unit'),
-            serving_weight_grams=serving_size,
-            category=fatsecret_food.get('food_type'),
-            subcategory=None,
-            is_indian_food=is_indian_food
-        )
+            serving_size = 100.0
+        
+        record = {
+            'id': int(fatsecret_food.get('food_id', 0)),
+            'name': fatsecret_food.get('food_name', ''),
+            'brand': fatsecret_food.get('brand_name'),
+            'serving_size': first_serving.get('metric_serving_unit'),
+            'serving_weight_grams': serving_size,
+            'category': fatsecret_food.get('food_type'),
+            'subcategory': None,
+            # Determine if it's Indian food based on name
+            'is_indian_food': indian_food_matcher.matches(fatsecret_food.get('food_name', '')),
+            'serving_weights': _serving_weights(servings)
+        }
+        
+        multiplier = 100 / serving_size
+        for serving_field, field in SERVING_NUTRIENTS:
+            record[field] = float(first_serving.get(serving_field) or 0) * multiplier if first_serving else None
+        
+        return record
     
     async def get_daily_summary(self, date: str) -> Dict[str, Any]:
         """Get user's daily food summary"""
-        if not self.access_token:
-            raise ValueError("No access token available. Please authenticate first.")
-        
         params = {
             'method': 'food_entries.get_month',
             'date': date,
             'format': 'json'
         }
         
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json'
-        }
+        response = await self._api_get(params)
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.base_url, params=params, headers=headers)
-            response.raise_for_status()
-            
-            return response.json()
+        return fastjson.loads(response.content)
+
+
+def _encode_food(food: Optional[FoodRecord]) -> Optional[Dict[str, Any]]:
+    return asdict(food) if food else None
+
+
+def _decode_food(payload: Optional[Dict[str, Any]]) -> Optional[FoodRecord]:
+    return FoodRecord(**payload) if payload else None
+
+
+def _food_ttl(food: Optional[FoodRecord]) -> int:
+    return settings.FATSECRET_FOOD_TTL_SECONDS if food else settings.FATSECRET_MISS_TTL_SECONDS
+
+
+def _barcode_ttl(food: Optional[FoodRecord]) -> int:
+    # A product FatSecret adds later shouldn't stay unknown for a month
+    return settings.FATSECRET_BARCODE_TTL_SECONDS if food else settings.FATSECRET_MISS_TTL_SECONDS
+
+
+def _encode_foods(foods: List[FoodRecord]) -> List[Dict[str, Any]]:
+    return [asdict(food) for food in foods]
+
+
+def _decode_foods(payload: List[Dict[str, Any]]) -> List[FoodRecord]:
+    return [FoodRecord(**food) for food in payload]
 
 
 # Create service instance
@@ -0,0 +1,41 @@
+from typing import Iterable, List, Optional
+import re
+
+
+# Substrings that mark a food name as Indian
+INDIAN_FOOD_KEYWORDS = [
+    'roti', 'chapati', 'dal', 'lentil', 'curry', 'naan', 'paratha',
+    'puri', 'biryani', 'pulao', 'samosa', 'pakora', 'gulab jamun',
+    'rasgulla', 'jalebi', 'lassi', 'chai', 'masala', 'tandoori'
+]
+
+
+class KeywordMatcher:
+    """
+    Find any of a fixed set of keywords in text in a single scan.
+
+    All keywords are compiled into one alternation, longest first so the
+    most specific keyword wins where several overlap, instead of testing
+    each keyword against the text in turn.
+    """
+
+    def __init__(self, keywords: Iterable[str], whole_words: bool = False):
+        self.keywords = sorted({keyword.lower() for keyword in keywords}, key=len, reverse=True)
+        pattern = "|".join(re.escape(keyword) for keyword in self.keywords)
+        if whole_words:
+            pattern = rf"\b(?:{pattern})\b"
+        self._pattern = re.compile(pattern)
+
+    def search(self, text: str) -> Optional[str]:
+        """First keyword found in text, or None"""
+        match = self._pattern.search(text.lower())
+        return match.group(0) if match else None
+
+    def matches(self, text: str) -> bool:
+        return self._pattern.search(text.lower()) is not None
+
+    def find_all(self, text: str) -> List[str]:
+        return self._pattern.findall(text.lower())
+
+
+indian_food_matcher = KeywordMatcher(INDIAN_FOOD_KEYWORDS)
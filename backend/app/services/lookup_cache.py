@@ -0,0 +1,239 @@
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+from datetime import datetime, timezone
+import asyncio
+import time
+
+from ..core import fastjson
+from ..core.cache import InMemoryCache
+from ..core.database import AsyncSessionLocal
+from ..models.cache import LookupCacheEntry
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _resolve_ttl(ttl: Union[int, Callable[[Any], int]], value: Any) -> int:
+    return ttl(value) if callable(ttl) else ttl
+
+
+class LookupCache:
+    """
+    Two-tier TTL cache for slow lookups such as upstream API calls.
+
+    Entries live in an in-process LRU and, when persistent, in the
+    lookup_cache_entries table so they survive restarts and are shared by
+    every worker. An entry is fresh for its TTL and is then served stale
+    for up to stale_seconds more while a background task refreshes it.
+    """
+
+    def __init__(self, namespace: str, local: InMemoryCache, persistent: bool = True, stale_seconds: int = 0):
+        self.namespace = namespace
+        self.local = local
+        self.persistent = persistent
+        self.stale_seconds = stale_seconds
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "persistent_hits": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: Union[int, Callable[[Any], int]],
+        encode: Callable[[Any], Any] = _identity,
+        decode: Callable[[Any], Any] = _identity,
+    ) -> Any:
+        """
+        Return the cached value for key, calling fetch on a miss.
+
+        encode/decode convert between the value and a JSON-serializable
+        payload; None results are cached too, so repeated misses upstream
+        don't cost a request each. ttl may be a function of the fetched
+        value, and a ttl of 0 or less leaves that value uncached.
+        """
+        key = f"{self.namespace}:{key}"
+        entry = await self._get(key)
+
+        if entry is not None:
+            fresh_until, payload = entry
+            if time.time() < fresh_until:
+                self.stats["hits"] += 1
+            else:
+                self.stats["stale_hits"] += 1
+                self._schedule_refresh(key, fetch, ttl, encode)
+            return decode(payload)
+
+        self.stats["misses"] += 1
+        value = await fetch()
+        value_ttl = _resolve_ttl(ttl, value)
+        if value_ttl > 0:
+            await self._set(key, encode(value), value_ttl)
+        return value
+
+    async def get(self, key: str, decode: Callable[[Any], Any] = _identity) -> Optional[Any]:
+        """
+        Return the cached value for key, or None on a miss.
+
+        For callers that fetch misses themselves, several at a time, and
+        store them with set(). A stale entry is served without a refresh,
+        and a cached None reads as a miss.
+        """
+        entry = await self._get(f"{self.namespace}:{key}")
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        fresh_until, payload = entry
+        self.stats["hits" if time.time() < fresh_until else "stale_hits"] += 1
+        return decode(payload)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Union[int, Callable[[Any], int]],
+        encode: Callable[[Any], Any] = _identity,
+    ) -> None:
+        """Store a value obtained outside get_or_fetch, e.g. a late better answer"""
+        value_ttl = _resolve_ttl(ttl, value)
+        if value_ttl > 0:
+            await self._set(f"{self.namespace}:{key}", encode(value), value_ttl)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus the share of lookups served without going upstream"""
+        lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"]
+        served = self.stats["hits"] + self.stats["stale_hits"]
+        return {
+            **self.stats,
+            "hit_ratio": round(served / lookups, 4) if lookups else None,
+        }
+
+    async def purge_expired(self) -> int:
+        """Delete persisted entries past their stale window; returns the count"""
+        if not self.persistent:
+            return 0
+
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    delete(LookupCacheEntry).where(
+                        LookupCacheEntry.namespace == self.namespace,
+                        LookupCacheEntry.expires_at <= datetime.utcnow()
+                    )
+                )
+                await session.commit()
+                return result.rowcount
+        except Exception as e:
+            print(f"Lookup cache purge failed: {e}")
+            return 0
+
+    async def close(self) -> None:
+        """Cancel in-flight background refreshes and wait for them to stop"""
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refreshing.clear()
+
+    def _schedule_refresh(self, key: str, fetch, ttl, encode) -> None:
+        # One refresh per key at a time, however many stale reads arrive
+        if key in self._refreshing:
+            return
+
+        task = asyncio.create_task(self._refresh(key, fetch, ttl, encode))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: str, fetch, ttl, encode) -> None:
+        try:
+            value = await fetch()
+            value_ttl = _resolve_ttl(ttl, value)
+            if value_ttl > 0:
+                await self._set(key, encode(value), value_ttl)
+            self.stats["refreshes"] += 1
+        except Exception as e:
+            # Keep serving the stale entry; the next stale read retries
+            self.stats["refresh_errors"] += 1
+            print(f"Background refresh of {key} failed: {e}")
+
+    async def _get(self, key: str) -> Optional[Tuple[float, Any]]:
+        body = await self.local.get(key)
+        if body is not None:
+            envelope = fastjson.loads(body)
+            return envelope["fresh_until"], envelope["value"]
+
+        if not self.persistent:
+            return None
+
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(LookupCacheEntry).where(
+                        LookupCacheEntry.key == key,
+                        LookupCacheEntry.expires_at > datetime.utcnow()
+                    )
+                )
+                row = result.scalar_one_or_none()
+        except Exception as e:
+            print(f"Persistent lookup cache unavailable: {e}")
+            return None
+
+        if row is None:
+            return None
+
+        self.stats["persistent_hits"] += 1
+        fresh_until = row.fresh_until.replace(tzinfo=timezone.utc).timestamp()
+        expires_at = row.expires_at.replace(tzinfo=timezone.utc).timestamp()
+        payload = fastjson.loads(row.value)
+
+        # Promote to the in-memory tier for the rest of its lifetime
+        await self._set_local(key, payload, fresh_until, expires_at)
+        return fresh_until, payload
+
+    async def _set(self, key: str, payload: Any, ttl: int) -> None:
+        now = time.time()
+        fresh_until = now + ttl
+        expires_at = fresh_until + self.stale_seconds
+        await self._set_local(key, payload, fresh_until, expires_at)
+
+        if not self.persistent:
+            return
+
+        values = {
+            "key": key,
+            "namespace": self.namespace,
+            "value": fastjson.dumps(payload).decode("utf-8"),
+            "fresh_until": datetime.utcfromtimestamp(fresh_until),
+            "expires_at": datetime.utcfromtimestamp(expires_at),
+        }
+        stmt = insert(LookupCacheEntry).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LookupCacheEntry.key],
+            set_={
+                "value": stmt.excluded.value,
+                "fresh_until": stmt.excluded.fresh_until,
+                "expires_at": stmt.excluded.expires_at,
+                "updated_at": datetime.utcnow(),
+            }
+        )
+
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(stmt)
+                await session.commit()
+        except Exception as e:
+            print(f"Persistent lookup cache unavailable: {e}")
+
+    async def _set_local(self, key: str, payload: Any, fresh_until: float, expires_at: float) -> None:
+        body = fastjson.dumps({"fresh_until": fresh_until, "value": payload})
+        ttl = max(int(expires_at - time.time()), 1)
+        await self.local.set(key, body, ttl)
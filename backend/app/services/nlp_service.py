@@ -1,21 +1,103 @@
 import openai
-import spacy
 import re
-from typing import List, Dict, Any, Optional
+import json
+import asyncio
+import time
+from typing import List, Dict, Any, Optional, Set, Tuple
 from ..schemas.food import ParsedFoodEntry, FoodItem, MealType
 from ..core.config import settings
-from datetime import datetime
+from ..core.cache import InMemoryCache
+from ..core.database import AsyncSessionLocal, close_db
+from ..core.singleflight import SingleFlight
+from ..core.workers import WorkerPool
+from .entry_parser import RuleParser
+from .lookup_cache import LookupCache
+from ..models.food import Food
+from sqlalchemy import select
 
 # Initialize OpenAI client
 openai.api_key = settings.OPENAI_API_KEY
 
-# Load spaCy model
-try:
-    nlp = spacy.load(settings.SPACY_MODEL)
-except OSError:
-    print(f"spaCy model '{settings.SPACY_MODEL}' not found. Please install it with:")
-    print(f"python -m spacy download {settings.SPACY_MODEL}")
-    nlp = None
+# Parsed once the model has loaded, to pay spaCy's lazy pipeline setup up front
+WARM_UP_TEXT = "2 rotis with a bowl of dal and a glass of milk"
+
+
+def _load_spacy_model():
+    """Import spaCy and load the configured model; None if it isn't installed"""
+    try:
+        import spacy
+    except ImportError:
+        print("spaCy is not installed; falling back to basic parsing")
+        return None
+    
+    try:
+        nlp = spacy.load(settings.SPACY_MODEL)
+    except OSError:
+        print(f"spaCy model '{settings.SPACY_MODEL}' not found. Please install it with:")
+        print(f"python -m spacy download {settings.SPACY_MODEL}")
+        return None
+    
+    # Parsing only needs tokens, tags and lexical attributes
+    disabled = [name for name in settings.SPACY_DISABLED_COMPONENTS if name in nlp.pipe_names]
+    if disabled:
+        nlp.select_pipes(disable=disabled)
+    
+    nlp(WARM_UP_TEXT)
+    return nlp
+
+
+def normalize_entry_text(text: str) -> str:
+    """Lowercase, collapse whitespace and drop edge punctuation so repeats share a cache key"""
+    return " ".join(text.lower().split()).strip(" .,!;")
+
+
+def parse_cache_key(text: str, meal_type: Optional[MealType] = None) -> str:
+    """Cache key shared by single and batch parses of the same phrase"""
+    return f"v{settings.NLP_PARSER_VERSION}:{meal_type.value if meal_type else ''}:{normalize_entry_text(text)}"
+
+
+def _parse_cache_ttl(result: Tuple[ParsedFoodEntry, bool]) -> int:
+    # A local fallback for a GPT call that missed the budget isn't cached, so
+    # the late answer or the next request for the phrase gets a proper parse
+    _, degraded = result
+    return 0 if degraded else settings.NLP_PARSE_CACHE_TTL_SECONDS
+
+
+def _encode_parse(result: Tuple[ParsedFoodEntry, bool]) -> Dict[str, Any]:
+    return result[0].model_dump(mode="json")
+
+
+def _decode_parse(payload: Dict[str, Any]) -> Tuple[ParsedFoodEntry, bool]:
+    return ParsedFoodEntry.model_validate(payload), False
+
+
+def _init_parse_worker() -> None:
+    """Process pool initializer: load the model and catalog once per worker process"""
+    nlp_service.nlp = _load_spacy_model()
+    nlp_service.model_state = "ready" if nlp_service.nlp else "unavailable"
+    asyncio.run(_load_worker_catalog())
+
+
+async def _load_worker_catalog() -> None:
+    try:
+        await nlp_service.load_catalog_foods()
+    finally:
+        await close_db()
+
+
+def _worker_has_model() -> bool:
+    return nlp_service.nlp is not None
+
+
+def _parse_local(text: str, meal_type: Optional[MealType] = None) -> ParsedFoodEntry:
+    """Pool entry point; module-level so process pools can pickle it"""
+    return nlp_service._parse_local(text, meal_type)
+
+
+def _parse_local_batch(
+    texts: List[str], meal_types: List[Optional[MealType]], rule_entries: List[ParsedFoodEntry]
+) -> List[ParsedFoodEntry]:
+    return nlp_service._parse_local_batch(texts, meal_types, rule_entries)
 
 
 class NLPService:
@@ -56,24 +138,363 @@ class NLPService:
             'four': 4,
             'five': 5
         }
+        
+        # Variant -> category lookups, built once instead of scanning every list per word
+        self.food_categories = {
+            variant: category
+            for category, variants in self.indian_food_patterns.items()
+            for variant in variants
+        }
+        self.unit_aliases = {
+            variant: unit
+            for unit, variants in self.unit_patterns.items()
+            for variant in variants
+        }
+        
+        # Default units by food category, and for common foods outside them
+        self.category_units = {
+            'roti': 'piece', 'bread': 'piece',
+            'dal': 'bowl', 'curry': 'bowl', 'rice': 'bowl', 'yogurt': 'bowl',
+            'milk': 'glass', 'tea': 'glass', 'coffee': 'glass'
+        }
+        self.default_units = {
+            'apple': 'piece', 'banana': 'piece', 'orange': 'piece',
+            'water': 'glass', 'juice': 'glass'
+        }
+        
+        # Primary local parser: one pass over a gazetteer of the tables above,
+        # extended with catalog food names by load_catalog_foods()
+        self.rule_parser = RuleParser(self._infer_unit)
+        self.rule_parser.add_numbers(self.quantity_patterns)
+        self.rule_parser.add_units(self.unit_aliases)
+        self.rule_parser.add_foods(self.food_categories)
+        self.rule_parser.add_foods(self.default_units)
+        
+        # Repeated phrases are answered from cache; bumping NLP_PARSER_VERSION
+        # changes every key, so results from an older parser are never served
+        self.cache = LookupCache(
+            namespace="nlp_parse",
+            local=InMemoryCache(settings.NLP_PARSE_CACHE_MAX_ENTRIES),
+            persistent=settings.NLP_PARSE_CACHE_PERSISTENT
+        )
+        
+        # Identical entries parsed concurrently share one parse
+        self.inflight = SingleFlight("nlp_parse")
+        
+        # Outcomes of GPT-4 racing the local parser, for tuning the budget
+        self.race_stats = {"rules": 0, "llm": 0, "local": 0, "upgraded": 0}
+        self._upgrades: Set[asyncio.Task] = set()
+        
+        # spaCy model, loaded off the import path by start_loading()
+        self.nlp = None
+        self.model_state = "not_loaded"
+        self.model_load_seconds: Optional[float] = None
+        self._model_task: Optional[asyncio.Task] = None
+        
+        # spaCy and regex parsing are CPU-bound, so they run here rather than
+        # on the event loop; process workers each load their own model
+        self.parse_pool = WorkerPool(
+            "nlp_parse",
+            kind=settings.NLP_PARSE_EXECUTOR,
+            workers=settings.NLP_PARSE_WORKERS,
+            max_pending=settings.NLP_PARSE_MAX_PENDING,
+            initializer=_init_parse_worker if settings.NLP_PARSE_EXECUTOR == "process" else None
+        )
+    
+    @property
+    def is_ready(self) -> bool:
+        """False while the spaCy model is still loading"""
+        return self.model_state != "loading"
+    
+    def start_loading(self) -> asyncio.Task:
+        """Load the spaCy model on a worker thread; later calls share the same load"""
+        if self._model_task is None:
+            self.model_state = "loading"
+            self._model_task = asyncio.create_task(self._load_model())
+        return self._model_task
+    
+    async def ensure_model(self) -> None:
+        """Wait for the spaCy model, starting the load if nothing has yet"""
+        if self.model_state in ("ready", "unavailable"):
+            return
+        # Shielded so a cancelled request doesn't abort the load for everyone
+        await asyncio.shield(self.start_loading())
+    
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "model": settings.SPACY_MODEL,
+            "state": self.model_state,
+            "ready": self.is_ready,
+            "load_seconds": self.model_load_seconds,
+            "gazetteer": {
+                "phrases": self.rule_parser.gazetteer.size,
+                "catalog_foods": self.rule_parser.catalog_foods
+            },
+            "pool": self.parse_pool.get_state(),
+            "llm_race": self.race_stats
+        }
+    
+    async def close(self) -> None:
+        """Stop background cache upgrades and refreshes, then the worker pool"""
+        upgrades = list(self._upgrades)
+        for task in upgrades:
+            task.cancel()
+        await asyncio.gather(*upgrades, return_exceptions=True)
+        await self.cache.close()
+        self.parse_pool.shutdown()
+    
+    async def _load_model(self) -> None:
+        started = time.monotonic()
+        loaded = False
+        try:
+            if self.parse_pool.kind == "process":
+                # Start every worker so each has its model before traffic arrives.
+                # Workers load the catalog in their initializer; this process
+                # needs it too, for the rules it runs before going to the pool
+                results = await asyncio.gather(*[
+                    self.parse_pool.run(_worker_has_model)
+                    for _ in range(self.parse_pool.workers)
+                ])
+                loaded = any(results)
+                await self.load_catalog_foods()
+            else:
+                self.nlp = await asyncio.to_thread(_load_spacy_model)
+                loaded = self.nlp is not None
+                await self.load_catalog_foods()
+        except Exception as e:
+            print(f"Loading spaCy model failed: {e}")
+        
+        self.model_load_seconds = round(time.monotonic() - started, 2)
+        self.model_state = "ready" if loaded else "unavailable"
+        print(f"🧠 spaCy model {self.model_state} after {self.model_load_seconds}s")
+    
+    async def load_catalog_foods(self) -> int:
+        """Add catalog food names and their regional variants to the rule parser's gazetteer"""
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(Food.name, Food.regional_variants)
+                    .order_by(Food.id)
+                    .limit(settings.NLP_GAZETTEER_MAX_FOODS)
+                )
+                rows = result.all()
+        except Exception as e:
+            print(f"Loading catalog foods for the parser failed: {e}")
+            return 0
+        
+        names = []
+        for name, regional_variants in rows:
+            # Drop qualifiers like "(Homestyle)" that nobody types
+            names.append(re.sub(r"\(.*?\)", "", name))
+            if regional_variants:
+                try:
+                    variants = json.loads(regional_variants)
+                except ValueError:
+                    variants = []
+                if isinstance(variants, list):
+                    names.extend(variant for variant in variants if isinstance(variant, str))
+        
+        added = await asyncio.to_thread(self.rule_parser.add_foods, names)
+        self.rule_parser.catalog_foods += added
+        return added
     
     async def parse_food_entry(self, text: str, meal_type: Optional[MealType] = None) -> ParsedFoodEntry:
         """
         Parse natural language food entry using GPT-4 and spaCy
         """
+        key = parse_cache_key(text, meal_type)
+        parsed_entry, _ = await self.cache.get_or_fetch(
+            key,
+            lambda: self.inflight.do(key, lambda: self._parse_food_entry(text, meal_type, key)),
+            ttl=_parse_cache_ttl,
+            encode=_encode_parse,
+            decode=_decode_parse
+        )
+        
+        # Callers fill in fields like meal_time, so each gets its own copy
+        return parsed_entry.model_copy(deep=True)
+    
+    async def _parse_food_entry(
+        self, text: str, meal_type: Optional[MealType] = None, cache_key: Optional[str] = None
+    ) -> Tuple[ParsedFoodEntry, bool]:
+        """
+        Parse with the best answer available within the latency budget.
+        
+        GPT-4 and the local parser start together. GPT's answer is used if
+        it arrives within NLP_LLM_BUDGET_SECONDS with higher confidence;
+        otherwise the local one is returned. Only when GPT missed the budget
+        is the flag set, and a late GPT answer for cache_key is written to
+        the cache when it lands; a local answer after GPT failed or lost is
+        cached as usual.
+        """
+        if not settings.OPENAI_API_KEY:
+            return await self._parse_locally(text, meal_type), False
+        
+        # The rules take microseconds; when they recognise every food there
+        # is nothing for GPT to add
+        if settings.NLP_SKIP_LLM_FOR_KNOWN_FOODS:
+            parsed_entry = self.rule_parser.parse(text, meal_type)
+            if parsed_entry.confidence >= RuleParser.KNOWN_CONFIDENCE:
+                self.race_stats["rules"] += 1
+                return parsed_entry, False
+        
+        gpt_task = asyncio.create_task(self._parse_with_gpt(text, meal_type))
+        local_task = asyncio.create_task(self._parse_locally(text, meal_type))
+        done, _ = await asyncio.wait({gpt_task}, timeout=settings.NLP_LLM_BUDGET_SECONDS)
+        gpt_entry = gpt_task.result() if done else None
+        
         try:
-            # First try with GPT-4 for better accuracy
-            if settings.OPENAI_API_KEY:
-                return await self._parse_with_gpt(text, meal_type)
-            else:
-                # Fallback to spaCy
-                return self._parse_with_spacy(text, meal_type)
+            local_entry = await local_task
+        except Exception:
+            if gpt_entry:
+                self.race_stats["llm"] += 1
+                return gpt_entry, False
+            gpt_task.cancel()
+            raise
+        
+        if gpt_entry and gpt_entry.confidence > local_entry.confidence:
+            self.race_stats["llm"] += 1
+            return gpt_entry, False
+        
+        self.race_stats["local"] += 1
+        if not done and cache_key and settings.NLP_LLM_BACKGROUND_UPGRADE:
+            self._upgrade_in_background(cache_key, gpt_task, local_entry.confidence)
+        else:
+            gpt_task.cancel()
+        return local_entry, not done
+    
+    async def _parse_locally(self, text: str, meal_type: Optional[MealType] = None) -> ParsedFoodEntry:
+        # The rules take microseconds, so they run here and only entries
+        # they can't place wait for the model
+        parsed_entry = self.rule_parser.parse(text, meal_type)
+        if not self._needs_spacy(parsed_entry):
+            return parsed_entry
+        
+        # spaCy runs off the event loop; raises PoolSaturatedError when too
+        # many parses are already waiting
+        await self.ensure_model()
+        return await self.parse_pool.run(_parse_local, text, meal_type)
+    
+    def _upgrade_in_background(self, cache_key: str, gpt_task: asyncio.Task, local_confidence: float) -> None:
+        async def upgrade() -> None:
+            parsed_entry = await gpt_task
+            if parsed_entry and parsed_entry.confidence > local_confidence:
+                await self.cache.set(cache_key, (parsed_entry, False), ttl=_parse_cache_ttl, encode=_encode_parse)
+                self.race_stats["upgraded"] += 1
+        
+        task = asyncio.create_task(upgrade())
+        self._upgrades.add(task)
+        task.add_done_callback(self._upgrades.discard)
+    
+    async def parse_food_entries(self, entries: List[Tuple[str, Optional[MealType]]]) -> List[ParsedFoodEntry]:
+        """
+        Parse many (text, meal_type) entries, returning results in the same order.
+        
+        Entries share parse_food_entry's cache. The misses, each distinct
+        phrase once, are parsed together: with an OpenAI key, those the rule
+        parser can't fully place are packed several to a GPT-4 request, and
+        anything GPT doesn't answer is parsed locally with one nlp.pipe pass
+        on the worker pool.
+        """
+        keys = [parse_cache_key(text, meal_type) for text, meal_type in entries]
+        unique_keys = list(dict.fromkeys(keys))
+        cached = await asyncio.gather(*[self.cache.get(key, decode=_decode_parse) for key in unique_keys])
+        parsed_by_key = {key: hit[0] for key, hit in zip(unique_keys, cached) if hit is not None}
+        
+        misses = [key for key in unique_keys if key not in parsed_by_key]
+        if misses:
+            first_entry = {}
+            for key, entry in zip(keys, entries):
+                first_entry.setdefault(key, entry)
+            parsed = await self._parse_entries([first_entry[key] for key in misses])
+            parsed_by_key.update(zip(misses, parsed))
+            await asyncio.gather(*[
+                self.cache.set(key, (parsed_entry, False), ttl=_parse_cache_ttl, encode=_encode_parse)
+                for key, parsed_entry in zip(misses, parsed)
+            ])
+        
+        # Callers fill in fields like meal_time, so each gets its own copy
+        return [parsed_by_key[key].model_copy(deep=True) for key in keys]
+    
+    async def _parse_entries(self, entries: List[Tuple[str, Optional[MealType]]]) -> List[ParsedFoodEntry]:
+        # The rules run once per entry; their answer stands unless GPT or
+        # spaCy does better
+        rule_entries = [self.rule_parser.parse(text, meal_type) for text, meal_type in entries]
+        results: List[Optional[ParsedFoodEntry]] = [None] * len(entries)
+        
+        if settings.OPENAI_API_KEY:
+            pending = list(range(len(entries)))
+            if settings.NLP_SKIP_LLM_FOR_KNOWN_FOODS:
+                for i, parsed_entry in enumerate(rule_entries):
+                    if parsed_entry.confidence >= RuleParser.KNOWN_CONFIDENCE:
+                        results[i] = parsed_entry
+                pending = [i for i in pending if results[i] is None]
+            
+            size = settings.NLP_LLM_BATCH_SIZE
+            chunks = [pending[start:start + size] for start in range(0, len(pending), size)]
+            parsed_chunks = await asyncio.gather(*[
+                self._parse_batch_with_gpt([entries[i] for i in chunk]) for chunk in chunks
+            ])
+            for chunk, parsed in zip(chunks, parsed_chunks):
+                for i, parsed_entry in zip(chunk, parsed):
+                    results[i] = parsed_entry
+        
+        missing = [i for i, parsed_entry in enumerate(results) if parsed_entry is None]
+        for i in missing:
+            results[i] = rule_entries[i]
+        
+        # Only entries the rules couldn't place wait for the model
+        unresolved = [i for i in missing if self._needs_spacy(results[i])]
+        if unresolved:
+            await self.ensure_model()
+            parsed = await self.parse_pool.run(
+                _parse_local_batch,
+                [entries[i][0] for i in unresolved],
+                [entries[i][1] for i in unresolved],
+                [rule_entries[i] for i in unresolved]
+            )
+            for i, parsed_entry in zip(unresolved, parsed):
+                results[i] = parsed_entry
+        
+        return results
+    
+    def _parse_local_batch(
+        self, texts: List[str], meal_types: List[Optional[MealType]], rule_entries: List[ParsedFoodEntry]
+    ) -> List[ParsedFoodEntry]:
+        results = list(rule_entries)
+        if not self.nlp:
+            return results
+        
+        # Only entries the rules couldn't place go through spaCy, in one pipe
+        unresolved = [i for i, parsed_entry in enumerate(results) if self._needs_spacy(parsed_entry)]
+        docs = self.nlp.pipe((texts[i].lower() for i in unresolved), batch_size=settings.SPACY_PIPE_BATCH_SIZE)
+        for i, doc in zip(unresolved, docs):
+            try:
+                spacy_entry = self._entry_from_doc(doc, texts[i], meal_types[i])
+            except Exception as e:
+                print(f"Error parsing food entry: {e}")
+                continue
+            if spacy_entry.confidence > results[i].confidence:
+                results[i] = spacy_entry
+        return results
+    
+    def _parse_local(self, text: str, meal_type: Optional[MealType] = None) -> ParsedFoodEntry:
+        parsed_entry = self.rule_parser.parse(text, meal_type)
+        if not self.nlp or not self._needs_spacy(parsed_entry):
+            return parsed_entry
+        
+        try:
+            spacy_entry = self._parse_with_spacy(text, meal_type)
         except Exception as e:
             print(f"Error parsing food entry: {e}")
-            # Fallback to basic parsing
-            return self._parse_basic(text, meal_type)
+            return parsed_entry
+        return spacy_entry if spacy_entry.confidence > parsed_entry.confidence else parsed_entry
     
-    async def _parse_with_gpt(self, text: str, meal_type: Optional[MealType] = None) -> ParsedFoodEntry:
+    def _needs_spacy(self, parsed_entry: ParsedFoodEntry) -> bool:
+        # spaCy only helps when the rules recognised no food at all
+        return parsed_entry.confidence <= RuleParser.UNKNOWN_CONFIDENCE
+    
+    async def _parse_with_gpt(self, text: str, meal_type: Optional[MealType] = None) -> Optional[ParsedFoodEntry]:
         """Parse using OpenAI GPT-4"""
         
         prompt = f"""
@@ -103,49 +524,124 @@ class NLPService:
         """
         
         try:
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a food parsing assistant. Parse food entries accurately and return valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=500
+            response = await asyncio.wait_for(
+                openai.ChatCompletion.acreate(
+                    model="gpt-4",
+                    messages=[
+                        {"role": "system", "content": "You are a food parsing assistant. Parse food entries accurately and return valid JSON."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.1,
+                    max_tokens=500
+                ),
+                timeout=settings.NLP_LLM_TIMEOUT_SECONDS
             )
             
             content = response.choices[0].message.content
             # Extract JSON from response
             json_match = re.search(r'\{.*\}', content, re.DOTALL)
             if json_match:
-                import json
-                parsed_data = json.loads(json_match.group())
-                
-                foods = []
-                for food in parsed_data.get('foods', []):
-                    foods.append(FoodItem(
-                        item=food['item'],
-                        quantity=float(food['quantity']),
-                        unit=food['unit']
-                    ))
-                
-                return ParsedFoodEntry(
-                    foods=foods,
-                    meal_type=MealType(parsed_data.get('meal_type', 'other')),
-                    confidence=parsed_data.get('confidence', 0.9)
-                )
+                return self._entry_from_gpt(json.loads(json_match.group()))
         
         except Exception as e:
             print(f"GPT-4 parsing failed: {e}")
         
-        # Fallback to spaCy
-        return self._parse_with_spacy(text, meal_type)
+        return None
+    
+    async def _parse_batch_with_gpt(self, entries: List[Tuple[str, Optional[MealType]]]) -> List[Optional[ParsedFoodEntry]]:
+        """Parse several entries with one GPT-4 request; None for any entry it didn't answer"""
+        
+        numbered = "\n".join(
+            f'{i}. [{meal_type.value if meal_type else "unknown"}] "{text}"'
+            for i, (text, meal_type) in enumerate(entries)
+        )
+        prompt = f"""
+        Parse each numbered food entry below and extract food items with quantities and units.
+        Each entry is prefixed with its meal type in brackets.
+        Return a JSON response in this exact format, with one object per entry:
+        {{
+            "entries": [
+                {{
+                    "index": 0,
+                    "foods": [
+                        {{"item": "food_name", "quantity": number, "unit": "unit_name"}}
+                    ],
+                    "meal_type": "breakfast",
+                    "confidence": 0.95
+                }}
+            ]
+        }}
+        
+        Food entries:
+        {numbered}
+        
+        Rules:
+        - Extract all food items mentioned in each entry
+        - Convert quantities to numbers (e.g., "two" -> 2, "half" -> 0.5)
+        - Use standard units (piece, bowl, glass, gram, ml, etc.)
+        - For Indian foods, use appropriate units (roti -> piece, dal -> bowl, milk -> glass)
+        - If no quantity mentioned, assume 1
+        - If no unit mentioned, infer from context
+        - Keep each entry's meal type; use "other" where it is unknown
+        """
+        
+        results: List[Optional[ParsedFoodEntry]] = [None] * len(entries)
+        try:
+            response = await asyncio.wait_for(
+                openai.ChatCompletion.acreate(
+                    model="gpt-4",
+                    messages=[
+                        {"role": "system", "content": "You are a food parsing assistant. Parse food entries accurately and return valid JSON."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.1,
+                    max_tokens=min(200 * len(entries), 4000)
+                ),
+                timeout=settings.NLP_LLM_TIMEOUT_SECONDS
+            )
+            
+            content = response.choices[0].message.content
+            json_match = re.search(r'\{.*\}', content, re.DOTALL)
+            if not json_match:
+                return results
+            
+            for parsed_data in json.loads(json_match.group()).get('entries', []):
+                try:
+                    index = int(parsed_data['index'])
+                    if 0 <= index < len(entries):
+                        results[index] = self._entry_from_gpt(parsed_data)
+                except Exception as e:
+                    # Only this entry falls back to local parsing
+                    print(f"GPT-4 batch entry parsing failed: {e}")
+        
+        except Exception as e:
+            print(f"GPT-4 batch parsing failed: {e}")
+        
+        return results
+    
+    def _entry_from_gpt(self, parsed_data: Dict[str, Any]) -> ParsedFoodEntry:
+        foods = []
+        for food in parsed_data.get('foods', []):
+            foods.append(FoodItem(
+                item=food['item'],
+                quantity=float(food['quantity']),
+                unit=food['unit']
+            ))
+        
+        return ParsedFoodEntry(
+            foods=foods,
+            meal_type=MealType(parsed_data.get('meal_type', 'other')),
+            confidence=parsed_data.get('confidence', 0.9)
+        )
     
     def _parse_with_spacy(self, text: str, meal_type: Optional[MealType] = None) -> ParsedFoodEntry:
         """Parse using spaCy NLP"""
-        if not nlp:
-            return self._parse_basic(text, meal_type)
+        if not self.nlp:
+            return self.rule_parser.parse(text, meal_type)
         
-        doc = nlp(text.lower())
+        return self._entry_from_doc(self.nlp(text.lower()), text, meal_type)
+    
+    def _entry_from_doc(self, doc, text: str, meal_type: Optional[MealType] = None) -> ParsedFoodEntry:
         foods = []
         
         # Extract numbers and quantities
@@ -159,7 +655,7 @@ class NLPService:
         
         # Simple parsing logic
         if not food_items:
-            return self._parse_basic(text, meal_type)
+            return self.rule_parser.parse(text, meal_type)
         
         # Match with Indian food patterns
         for item in food_items:
@@ -187,83 +683,21 @@ class NLPService:
             confidence=0.7
         )
     
-    def _parse_basic(self, text: str, meal_type: Optional[MealType] = None) -> ParsedFoodEntry:
-        """Basic parsing fallback"""
-        # Simple regex-based parsing
-        foods = []
-        
-        # Look for patterns like "2 rotis", "dal", etc.
-        patterns = [
-            r'(\d+(?:\.\d+)?)\s+(\w+)',  # "2 rotis"
-            r'(\w+)\s+(\d+(?:\.\d+)?)',  # "rotis 2"
-            r'(\w+)',                     # "dal"
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text.lower())
-            for match in matches:
-                if len(match) == 2:
-                    quantity, item = match
-                    foods.append(FoodItem(
-                        item=item,
-                        quantity=float(quantity),
-                        unit=self._infer_unit(item)
-                    ))
-                elif len(match) == 1:
-                    item = match
-                    foods.append(FoodItem(
-                        item=item,
-                        quantity=1.0,
-                        unit=self._infer_unit(item)
-                    ))
-        
-        # Remove duplicates
-        unique_foods = []
-        seen_items = set()
-        for food in foods:
-            if food.item not in seen_items:
-                unique_foods.append(food)
-                seen_items.add(food.item)
-        
-        return ParsedFoodEntry(
-            foods=unique_foods,
-            meal_type=meal_type or MealType.OTHER,
-            confidence=0.5
-        )
-    
     def _infer_unit(self, food_item: str) -> str:
         """Infer appropriate unit for a food item"""
-        # Check Indian food patterns
-        for category, items in self.indian_food_patterns.items():
-            if food_item in items:
-                if category in ['roti', 'bread']:
-                    return 'piece'
-                elif category in ['dal', 'curry']:
-                    return 'bowl'
-                elif category in ['milk', 'tea', 'coffee']:
-                    return 'glass'
-                elif category in ['rice']:
-                    return 'bowl'
-                elif category in ['yogurt']:
-                    return 'bowl'
-        
-        # Default units
-        if food_item in ['apple', 'banana', 'orange']:
-            return 'piece'
-        elif food_item in ['water', 'juice']:
-            return 'glass'
-        else:
-            return 'serving'
+        # "masala chai" is served like chai
+        for name in (food_item, food_item.rsplit(' ', 1)[-1]):
+            category = self.food_categories.get(name)
+            if category in self.category_units:
+                return self.category_units[category]
+            if name in self.default_units:
+                return self.default_units[name]
+        return 'serving'
     
     def normalize_unit(self, unit: str) -> str:
         """Normalize units to standard format"""
         unit_lower = unit.lower()
-        
-        for standard_unit, variations in self.unit_patterns.items():
-            if unit_lower in variations:
-                return standard_unit
-        
-        return unit_lower
+        return self.unit_aliases.get(unit_lower, unit_lower)
     
     def convert_to_grams(self, quantity: float, unit: str) -> float:
         """Convert various units to grams for nutrition calculation"""
@@ -0,0 +1,280 @@
+from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Optional, Set, Tuple, Union
+from collections import defaultdict
+import asyncio
+import re
+import time
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.food import Food
+from ..schemas.food import FoodRecord
+from .fatsecret_service import fatsecret_service
+from .catalog import upsert_catalog_statement
+from .unit_weights import unit_weight_index
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase and collapse whitespace so equivalent queries match alike"""
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of each word, padded like pg_trgm"""
+    grams = set()
+    for word in re.findall(r"\w+", text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NGramIndex:
+    """
+    In-process trigram index over food names, brands and regional variants.
+
+    Used where pg_trgm is unavailable (SQLite, tests). Scores candidates by
+    the share of query trigrams they contain, mirroring word_similarity.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._documents: Dict[int, Tuple[str, Set[str]]] = {}
+        self.loaded = False
+
+    def add(self, food_id: int, *fields: Optional[str]) -> None:
+        text = normalize_query(" ".join(field for field in fields if field))
+        self.remove(food_id)
+
+        grams = trigrams(text)
+        self._documents[food_id] = (text, grams)
+        for gram in grams:
+            self._postings[gram].add(food_id)
+
+    def remove(self, food_id: int) -> None:
+        document = self._documents.pop(food_id, None)
+        if document:
+            for gram in document[1]:
+                self._postings[gram].discard(food_id)
+
+    def search(self, query: str, limit: int, threshold: float = 0.3) -> List[int]:
+        query = normalize_query(query)
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        # Count shared trigrams per candidate using only the query's postings
+        overlap: Dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for food_id in self._postings.get(gram, ()):
+                overlap[food_id] += 1
+
+        scored = []
+        for food_id, shared in overlap.items():
+            text, _ = self._documents[food_id]
+            score = shared / len(query_grams)
+            if query in text:
+                score += 1.0
+            if score >= threshold:
+                scored.append((-score, len(text), food_id))
+
+        scored.sort()
+        return [food_id for _, _, food_id in scored[:limit]]
+
+
+class FoodSearchService:
+    """Ranked food catalog search backed by pg_trgm, with an in-process fallback"""
+
+    def __init__(self):
+        self.fallback_index = NGramIndex()
+        self._background: Set[asyncio.Task] = set()
+
+    async def search(self, query: str, limit: int, db: AsyncSession) -> List[Food]:
+        """Search foods by name, brand and regional variants, best matches first"""
+        query = normalize_query(query)
+        if not query:
+            return []
+
+        if db.get_bind().dialect.name == "postgresql":
+            return await self._search_postgres(query, limit, db)
+        return await self._search_fallback(query, limit, db)
+
+    async def find_best_match(self, name: str, db: AsyncSession) -> Optional[Food]:
+        """Return the single best catalog match for a food name, if any"""
+        results = await self.search(name, 1, db)
+        return results[0] if results else None
+
+    async def search_with_upstream(
+        self, query: str, limit: int, db: AsyncSession, deadline: Optional[float] = None
+    ) -> List[Union[Food, FoodRecord]]:
+        """
+        Search the local catalog and FatSecret concurrently under a deadline.
+        
+        Local results are always returned; FatSecret results are merged in
+        only if they arrive in time, deduplicated against catalog foods by
+        external_id. Whenever the upstream answers, on time or late, the
+        foods not already among the local results are imported into the
+        catalog in the background so the next search for the term is served
+        locally.
+        """
+        deadline = deadline if deadline is not None else settings.FOOD_SEARCH_DEADLINE_SECONDS
+        started = time.monotonic()
+        
+        upstream = None
+        if fatsecret_service.is_available:
+            upstream = asyncio.ensure_future(fatsecret_service.search_foods(query, limit))
+        
+        try:
+            local_foods = await self.search(query, limit, db)
+        except Exception:
+            if upstream is not None:
+                upstream.cancel()
+            raise
+        
+        if upstream is None:
+            return local_foods
+        
+        remaining = deadline - (time.monotonic() - started)
+        done, _ = await asyncio.wait({upstream}, timeout=max(remaining, 0))
+        
+        if not done:
+            # Too slow for this request, but still worth keeping
+            self._run_in_background(self._import_when_ready(upstream, local_foods))
+            return local_foods
+        
+        if upstream.exception():
+            print(f"FatSecret API search failed: {upstream.exception()}")
+            return local_foods
+        
+        upstream_foods = upstream.result()
+        new_foods = self.new_upstream_foods(local_foods, upstream_foods)
+        if new_foods:
+            self._run_in_background(self.import_foods(new_foods))
+        return self.merge_results(query, local_foods, new_foods, limit)
+    
+    def new_upstream_foods(self, local_foods: List[Food], upstream_foods: List[FoodRecord]) -> List[FoodRecord]:
+        """Upstream foods whose external_id isn't among the local results"""
+        imported_ids = {
+            food.external_id for food in local_foods
+            if food.source == "fatsecret" and food.external_id
+        }
+        return [food for food in upstream_foods if str(food.id) not in imported_ids]
+    
+    def merge_results(
+        self, query: str, local_foods: List[Food], upstream_foods: List[FoodRecord], limit: int
+    ) -> List[Union[Food, FoodRecord]]:
+        """Drop upstream foods already in the catalog and rank the rest by similarity"""
+        candidates = [(food, True) for food in local_foods]
+        candidates.extend((food, False) for food in self.new_upstream_foods(local_foods, upstream_foods))
+        
+        query = normalize_query(query)
+        query_grams = trigrams(query)
+        
+        def rank(candidate):
+            food, is_local = candidate
+            name = normalize_query(food.name or "")
+            shared = len(query_grams & trigrams(name))
+            score = shared / len(query_grams) if query_grams else 0.0
+            if name == query:
+                score += 1.0
+            # Catalog foods win ties; they carry our own corrections
+            return (-score, not is_local, len(name))
+        
+        candidates.sort(key=rank)
+        return [food for food, _ in candidates[:limit]]
+    
+    async def import_foods(self, foods: List[FoodRecord]) -> int:
+        """Add FatSecret foods missing from the catalog; returns how many were added"""
+        if not foods:
+            return 0
+        
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(upsert_catalog_statement(foods))
+            added = result.all()
+            weights = await unit_weight_index.store(session, {row.external_id: row.id for row in added}, foods)
+            await session.commit()
+        unit_weight_index.apply(weights)
+        
+        for food_id, name, brand, regional_variants, _ in added:
+            if self.fallback_index.loaded:
+                self.fallback_index.add(food_id, name, brand, regional_variants)
+        return len(added)
+    
+    def index_food(self, food: Food) -> None:
+        """Keep the fallback index current when a food is created or renamed"""
+        if self.fallback_index.loaded:
+            self.fallback_index.add(food.id, food.name, food.brand, food.regional_variants)
+
+    async def _import_when_ready(self, upstream: asyncio.Future, local_foods: List[Food]) -> None:
+        try:
+            foods = await upstream
+        except Exception as e:
+            print(f"FatSecret API search failed: {e}")
+            return
+        new_foods = self.new_upstream_foods(local_foods, foods)
+        if new_foods:
+            await self.import_foods(new_foods)
+    
+    async def close(self) -> None:
+        """Cancel background catalog imports and wait for them to stop"""
+        tasks = list(self._background)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _run_in_background(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        # Hold a reference until done so the task isn't garbage collected
+        self._background.add(task)
+        task.add_done_callback(self._finish_background)
+    
+    def _finish_background(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"Background catalog import failed: {task.exception()}")
+    
+    async def _search_postgres(self, query: str, limit: int, db: AsyncSession) -> List[Food]:
+        pattern = f"%{_escape_like(query)}%"
+
+        # word_similarity ranks partial matches ("dal" in "Dal Makhani");
+        # substring matches on any field always qualify
+        rank = func.greatest(
+            func.word_similarity(query, Food.name),
+            func.word_similarity(query, func.coalesce(Food.brand, "")) * 0.8,
+            func.word_similarity(query, func.coalesce(Food.regional_variants, "")) * 0.9,
+        )
+
+        result = await db.execute(
+            select(Food).where(
+                or_(
+                    Food.name.ilike(pattern, escape="\\"),
+                    Food.brand.ilike(pattern, escape="\\"),
+                    Food.regional_variants.ilike(pattern, escape="\\"),
+                    Food.name.op("%>")(query),
+                )
+            ).order_by(rank.desc(), func.length(Food.name)).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def _search_fallback(self, query: str, limit: int, db: AsyncSession) -> List[Food]:
+        if not self.fallback_index.loaded:
+            result = await db.execute(select(Food.id, Food.name, Food.brand, Food.regional_variants))
+            for food_id, name, brand, regional_variants in result:
+                self.fallback_index.add(food_id, name, brand, regional_variants)
+            self.fallback_index.loaded = True
+
+        food_ids = self.fallback_index.search(query, limit)
+        if not food_ids:
+            return []
+
+        result = await db.execute(select(Food).where(Food.id.in_(food_ids)))
+        foods = {food.id: food for food in result.scalars().all()}
+        return [foods[food_id] for food_id in food_ids if food_id in foods]
+
+
+# Create service instance
+food_search_service = FoodSearchService()
@@ -0,0 +1,662 @@
+from sqlalchemy import select, update, func, case, literal, literal_column, cast, and_, or_, Date
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime, date, timedelta
+
+from ..core.days import SUMMARY_TIMEZONE_NAME, day_bounds, summary_date, summary_today
+from ..models.food import FoodLog, MealType
+from ..models.nutrition import DailyNutritionSummary, NutritionGoal, NutritionRollup, NutritionInsightFeatures
+
+
+MAIN_MEAL_TYPES = [MealType.BREAKFAST, MealType.LUNCH, MealType.DINNER]
+
+# FoodLog column -> DailyNutritionSummary total column
+NUTRIENT_COLUMNS = {
+    "calories": "total_calories",
+    "protein": "total_protein_g",
+    "carbs": "total_carbs_g",
+    "fat": "total_fat_g",
+    "fiber": "total_fiber_g",
+    "sugar": "total_sugar_g",
+    "sodium": "total_sodium_mg",
+}
+
+# Summary total column -> goal column used for its progress percentage
+PROGRESS_COLUMNS = {
+    "calories_progress": ("total_calories", "calories_goal"),
+    "protein_progress": ("total_protein_g", "protein_goal_g"),
+    "carbs_progress": ("total_carbs_g", "carbs_goal_g"),
+    "fat_progress": ("total_fat_g", "fat_goal_g"),
+}
+
+
+# Counters of a day with no food logs
+EMPTY_DAY = {
+    **{total_column: 0 for total_column in NUTRIENT_COLUMNS.values()},
+    "total_meals": 0,
+    "total_snacks": 0,
+}
+
+# Columns written when materializing missing days
+MATERIALIZED_COLUMNS = ["user_id", "date", *EMPTY_DAY, "calories_goal", "protein_goal_g",
+                        "carbs_goal_g", "fat_goal_g", *PROGRESS_COLUMNS]
+
+# Rollup grains, coarsest first
+ROLLUP_GRANULARITIES = ["year", "month", "week"]
+RANGE_GRANULARITIES = ["day", *reversed(ROLLUP_GRANULARITIES)]
+
+# Counters of a rollup period with no food logs
+EMPTY_ROLLUP = {**EMPTY_DAY, "total_entries": 0}
+
+# Columns written when materializing missing rollup periods
+MATERIALIZED_ROLLUP_COLUMNS = ["user_id", "granularity", "period_start", "period_end", *EMPTY_ROLLUP]
+
+# Rows per bulk insert that stay under Postgres' 32767 bind parameters
+MAX_MATERIALIZE_ROWS = 32767 // len(MATERIALIZED_COLUMNS)
+MAX_ROLLUP_ROWS = 32767 // len(MATERIALIZED_ROLLUP_COLUMNS)
+
+
+def progress_expr(total, goal):
+    """SQL equivalent of DailyNutritionSummary.calculate_progress for one nutrient"""
+    return case((goal > 0, func.least(total * 100.0 / goal, 100)), else_=None)
+
+
+def summary_time(column):
+    """SQL wall-clock time of a timestamptz column in SUMMARY_TIMEZONE, for grouping by day"""
+    # Rendered inline so GROUP BY matches the selected expression exactly
+    return func.timezone(literal_column(f"'{SUMMARY_TIMEZONE_NAME}'"), column)
+
+
+def period_start(day: date, granularity: str) -> date:
+    """First day of the week (Monday), month or year containing day"""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "year":
+        return day.replace(month=1, day=1)
+    return day
+
+
+def period_end(start: date, granularity: str) -> date:
+    """Last day of the period beginning at start"""
+    if granularity == "week":
+        return start + timedelta(days=6)
+    if granularity == "month":
+        next_month = date(start.year + 1, 1, 1) if start.month == 12 else date(start.year, start.month + 1, 1)
+        return next_month - timedelta(days=1)
+    if granularity == "year":
+        return date(start.year, 12, 31)
+    return start
+
+
+def chunked(rows: List[Any], size: int) -> List[List[Any]]:
+    """Split rows into consecutive lists of at most size"""
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+def iter_periods(start_date: date, end_date: date, granularity: str) -> List[date]:
+    """Start dates of every period overlapping [start_date, end_date]"""
+    starts = []
+    current = period_start(start_date, granularity)
+    while current <= end_date:
+        starts.append(current)
+        current = period_end(current, granularity) + timedelta(days=1)
+    return starts
+
+
+class SummaryService:
+    """Service maintaining per-day nutrition summaries and their week/month/year rollups"""
+
+    async def get_active_goal(self, user_id: int, db: AsyncSession) -> Optional[NutritionGoal]:
+        """Get the user's active nutrition goal, if any"""
+        result = await db.execute(
+            select(NutritionGoal).where(
+                NutritionGoal.user_id == user_id,
+                NutritionGoal.is_active == True
+            )
+        )
+        return result.scalars().first()
+
+    async def get_insight_features(self, user_id: int, db: AsyncSession) -> Optional[NutritionInsightFeatures]:
+        """Get the insight features the nightly rollup job last stored for the user, if any"""
+        result = await db.execute(
+            select(NutritionInsightFeatures).where(NutritionInsightFeatures.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_stored_summaries(
+        self, user_id: int, start_date: date, end_date: date, db: AsyncSession
+    ) -> List[DailyNutritionSummary]:
+        """Get the summary rows that exist in [start_date, end_date] without materializing missing days"""
+        return await self._fetch_range(user_id, start_date, end_date, db)
+
+    async def get_daily_summary(self, user_id: int, target_date: date, db: AsyncSession) -> DailyNutritionSummary:
+        """Get the summary row for a day, materializing it from food logs if missing"""
+        summaries = await self.get_summaries(user_id, target_date, target_date, db)
+        return summaries[0]
+
+    async def get_summaries(
+        self, user_id: int, start_date: date, end_date: date, db: AsyncSession
+    ) -> List[DailyNutritionSummary]:
+        """
+        Get one summary row per day in [start_date, end_date], oldest first.
+
+        Days without a row are materialized together: one goal lookup, one
+        aggregate over food_logs grouped by day and one bulk insert (split
+        to stay under the bind parameter limit), so the query count does not
+        grow with the window length. Days after summary_today() are returned
+        but never stored, so a read never writes rows for the future.
+        """
+        summaries = await self._fetch_range(user_id, start_date, end_date, db)
+        by_date = {summary.date: summary for summary in summaries}
+
+        num_days = (end_date - start_date).days + 1
+        missing = [
+            start_date + timedelta(days=i) for i in range(num_days)
+            if start_date + timedelta(days=i) not in by_date
+        ]
+        if not missing:
+            return summaries
+
+        goal = await self.get_active_goal(user_id, db)
+        totals = await self._aggregate_by_day(user_id, missing[0], missing[-1], db)
+
+        today = summary_today()
+        rows = []
+        future = []
+        for day in missing:
+            summary = DailyNutritionSummary(user_id=user_id, date=day, **totals.get(day, EMPTY_DAY))
+            if goal:
+                summary.calories_goal = goal.daily_calories
+                summary.protein_goal_g = goal.daily_protein_g
+                summary.carbs_goal_g = goal.daily_carbs_g
+                summary.fat_goal_g = goal.daily_fat_g
+                summary.calculate_progress()
+            if day > today:
+                future.append(summary)
+            else:
+                rows.append({column: getattr(summary, column) for column in MATERIALIZED_COLUMNS})
+
+        inserted = []
+        for chunk in chunked(rows, MAX_MATERIALIZE_ROWS):
+            result = await db.scalars(
+                insert(DailyNutritionSummary)
+                .values(chunk)
+                .on_conflict_do_nothing(constraint="uq_daily_nutrition_summaries_user_date")
+                .returning(DailyNutritionSummary)
+            )
+            inserted.extend(result.all())
+        if rows:
+            await db.commit()
+
+        if len(inserted) < len(rows):
+            # A concurrent request materialized some of these days first
+            summaries = await self._fetch_range(user_id, start_date, end_date, db)
+            by_date = {summary.date: summary for summary in summaries}
+
+        by_date.update((summary.date, summary) for summary in inserted)
+        by_date.update((summary.date, summary) for summary in future)
+        return [by_date[day] for day in sorted(by_date)]
+
+    async def aggregate_food_logs(
+        self, user_id: int, start: datetime, end: datetime, db: AsyncSession
+    ) -> Dict[str, Any]:
+        """
+        Aggregate a user's food logs with meal_time in [start, end).
+
+        Totals, entry counts per meal type and the meal_time span are computed
+        by the database and come back as a single row.
+        """
+        result = await db.execute(
+            select(
+                *[
+                    func.coalesce(func.sum(getattr(FoodLog, log_column)), 0).label(log_column)
+                    for log_column in NUTRIENT_COLUMNS
+                ],
+                func.count(FoodLog.id).label("total_entries"),
+                *[
+                    func.count(FoodLog.id).filter(FoodLog.meal_type == meal_type).label(meal_type.value)
+                    for meal_type in MealType
+                ],
+                func.min(FoodLog.meal_time).label("first_meal_time"),
+                func.max(FoodLog.meal_time).label("last_meal_time"),
+            ).where(
+                FoodLog.user_id == user_id,
+                FoodLog.meal_time >= start,
+                FoodLog.meal_time < end
+            )
+        )
+        row = result.one()
+
+        return {
+            "totals": {log_column: getattr(row, log_column) for log_column in NUTRIENT_COLUMNS},
+            "total_entries": row.total_entries,
+            "meal_distribution": {
+                meal_type.value: getattr(row, meal_type.value)
+                for meal_type in MealType
+                if getattr(row, meal_type.value)
+            },
+            "first_meal_time": row.first_meal_time,
+            "last_meal_time": row.last_meal_time,
+        }
+
+    async def apply_food_log(self, food_log: FoodLog, db: AsyncSession, sign: int = 1) -> None:
+        """
+        Apply a food log's nutrients to its day's summary and rollups.
+
+        Must run after the log has been flushed and before the transaction is
+        committed, so the summary and the log are written atomically. Use
+        ``sign=-1`` when removing a log.
+        """
+        target_date = summary_date(food_log.meal_time)
+        deltas = self._deltas(food_log, sign)
+
+        # Fast path: the day already has a row, bump it in place
+        result = await db.execute(
+            update(DailyNutritionSummary)
+            .where(
+                DailyNutritionSummary.user_id == food_log.user_id,
+                DailyNutritionSummary.date == target_date
+            )
+            .values(self._increment_values(deltas))
+            .returning(DailyNutritionSummary.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.first() is None:
+            await self._insert_day_with_delta(food_log, target_date, deltas, db)
+
+        await self._apply_rollups(food_log, target_date, {**deltas, "total_entries": sign}, db)
+
+    async def apply_active_goal(self, user_id: int, db: AsyncSession) -> None:
+        """
+        Copy the user's active goal onto today's and later summary rows and
+        recompute their progress.
+
+        Call after changing goals and before the transaction is committed.
+        Earlier days keep the goal they were summarized against.
+        """
+        await db.flush()
+        goal = await self.get_active_goal(user_id, db)
+
+        table = DailyNutritionSummary.__table__.c
+        values = {name: literal(value, table[name].type) for name, value in self._goal_values(goal).items()}
+        for progress_column, (total_column, goal_column) in PROGRESS_COLUMNS.items():
+            values[progress_column] = progress_expr(table[total_column], values[goal_column])
+        values["updated_at"] = func.now()
+
+        await db.execute(
+            update(DailyNutritionSummary)
+            .where(
+                DailyNutritionSummary.user_id == user_id,
+                DailyNutritionSummary.date >= summary_today()
+            )
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _insert_day_with_delta(
+        self, food_log: FoodLog, target_date: date, deltas: Dict[str, Any], db: AsyncSession
+    ) -> None:
+        """
+        First write for the day: build the row from the day's logs, which
+        already include this one. A concurrent writer that got there first
+        turns the insert into an increment.
+        """
+        stmt = await self._materialize_stmt(food_log.user_id, target_date, db)
+        await db.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_daily_nutrition_summaries_user_date",
+                set_=self._increment_values(deltas)
+            )
+        )
+
+    async def _apply_rollups(
+        self, food_log: FoodLog, target_date: date, deltas: Dict[str, Any], db: AsyncSession
+    ) -> None:
+        """Apply a food log's deltas to the week, month and year containing its day"""
+        starts = {granularity: period_start(target_date, granularity) for granularity in ROLLUP_GRANULARITIES}
+
+        result = await db.execute(
+            update(NutritionRollup)
+            .where(
+                NutritionRollup.user_id == food_log.user_id,
+                or_(*[
+                    and_(NutritionRollup.granularity == granularity, NutritionRollup.period_start == start)
+                    for granularity, start in starts.items()
+                ])
+            )
+            .values(self._increment_values(deltas, NutritionRollup))
+            .returning(NutritionRollup.granularity)
+            .execution_options(synchronize_session=False)
+        )
+        updated = set(result.scalars().all())
+
+        # Periods without a row yet are built from their food logs, which
+        # already include this one
+        for granularity, start in starts.items():
+            if granularity in updated:
+                continue
+            await db.execute(
+                self._rollup_stmt(food_log.user_id, granularity, start).on_conflict_do_update(
+                    constraint="uq_nutrition_rollups_user_period",
+                    set_=self._increment_values(deltas, NutritionRollup)
+                )
+            )
+
+    def _rollup_stmt(self, user_id: int, granularity: str, start: date):
+        """Build an INSERT ... SELECT of one period's aggregate into nutrition_rollups"""
+        end = period_end(start, granularity)
+        range_start, _ = day_bounds(start)
+        _, range_end = day_bounds(end)
+
+        columns = {
+            "user_id": literal(user_id),
+            "granularity": literal(granularity),
+            "period_start": literal(start),
+            "period_end": literal(end),
+            **self._aggregate_columns(),
+        }
+        aggregate = select(*[expr.label(name) for name, expr in columns.items()]).where(
+            FoodLog.user_id == user_id,
+            FoodLog.meal_time >= range_start,
+            FoodLog.meal_time < range_end
+        )
+        return insert(NutritionRollup).from_select(list(columns), aggregate)
+
+    def _aggregate_columns(self) -> Dict[str, Any]:
+        """Rollup counters as SQL aggregates over food_logs"""
+        return {
+            **{
+                total_column: func.coalesce(func.sum(getattr(FoodLog, log_column)), 0)
+                for log_column, total_column in NUTRIENT_COLUMNS.items()
+            },
+            "total_meals": func.count(FoodLog.id).filter(FoodLog.meal_type.in_(MAIN_MEAL_TYPES)),
+            "total_snacks": func.count(FoodLog.id).filter(FoodLog.meal_type == MealType.SNACK),
+            "total_entries": func.count(FoodLog.id),
+        }
+
+    async def get_rollups(
+        self, user_id: int, granularity: str, starts: List[date], db: AsyncSession
+    ) -> Dict[date, NutritionRollup]:
+        """
+        Get rollup rows for the given period starts, keyed by period start.
+
+        Missing periods are materialized with one aggregate over food_logs
+        grouped by period and one bulk insert (split to stay under the bind
+        parameter limit). Periods starting after summary_today() are
+        returned empty but never stored.
+        """
+        if not starts:
+            return {}
+
+        rollups = await self._fetch_rollups(user_id, granularity, starts, db)
+
+        missing = sorted(set(starts) - set(rollups))
+        if not missing:
+            return rollups
+
+        period = cast(func.date_trunc(granularity, summary_time(FoodLog.meal_time)), Date)
+        range_start, _ = day_bounds(missing[0])
+        _, range_end = day_bounds(period_end(missing[-1], granularity))
+        aggregate_columns = self._aggregate_columns()
+
+        result = await db.execute(
+            select(
+                period.label("period_start"),
+                *[expr.label(name) for name, expr in aggregate_columns.items()]
+            ).where(
+                FoodLog.user_id == user_id,
+                FoodLog.meal_time >= range_start,
+                FoodLog.meal_time < range_end
+            ).group_by(period)
+        )
+        totals = {
+            row.period_start: {column: getattr(row, column) for column in aggregate_columns}
+            for row in result
+        }
+
+        today = summary_today()
+        rows = []
+        future = []
+        for start in missing:
+            row = {
+                "user_id": user_id,
+                "granularity": granularity,
+                "period_start": start,
+                "period_end": period_end(start, granularity),
+                **totals.get(start, EMPTY_ROLLUP),
+            }
+            if start > today:
+                future.append(NutritionRollup(**row))
+            else:
+                rows.append(row)
+
+        inserted = []
+        for chunk in chunked(rows, MAX_ROLLUP_ROWS):
+            result = await db.scalars(
+                insert(NutritionRollup)
+                .values(chunk)
+                .on_conflict_do_nothing(constraint="uq_nutrition_rollups_user_period")
+                .returning(NutritionRollup)
+            )
+            inserted.extend(result.all())
+        if rows:
+            await db.commit()
+
+        if len(inserted) < len(rows):
+            # A concurrent request materialized some of these periods first
+            rollups = await self._fetch_rollups(user_id, granularity, starts, db)
+
+        rollups.update((rollup.period_start, rollup) for rollup in inserted)
+        rollups.update((rollup.period_start, rollup) for rollup in future)
+        return rollups
+
+    async def _fetch_rollups(
+        self, user_id: int, granularity: str, starts: List[date], db: AsyncSession
+    ) -> Dict[date, NutritionRollup]:
+        result = await db.execute(
+            select(NutritionRollup).where(
+                NutritionRollup.user_id == user_id,
+                NutritionRollup.granularity == granularity,
+                NutritionRollup.period_start.in_(starts)
+            )
+        )
+        return {rollup.period_start: rollup for rollup in result.scalars().all()}
+
+    async def get_range(
+        self, user_id: int, start_date: date, end_date: date, granularity: str, db: AsyncSession
+    ) -> List[Dict[str, Any]]:
+        """
+        Totals per day, week, month or year over [start_date, end_date].
+
+        Each bucket is clipped to the range and assembled from the coarsest
+        rows that fit inside it: whole years, then whole months or weeks,
+        then single days at the ragged edges.
+        """
+        if granularity == "day":
+            summaries = await self.get_summaries(user_id, start_date, end_date, db)
+            return [self._bucket(summary.date, summary.date, [summary]) for summary in summaries]
+
+        # Plan which rows make up each bucket
+        plan = []
+        needed = {granularity: [] for granularity in ROLLUP_GRANULARITIES}
+        days = []
+        for start in iter_periods(start_date, end_date, granularity):
+            bucket_start = max(start, start_date)
+            bucket_end = min(period_end(start, granularity), end_date)
+            pieces = self._cover(bucket_start, bucket_end, granularity)
+            for piece_granularity, piece_start in pieces:
+                if piece_granularity == "day":
+                    days.append(piece_start)
+                else:
+                    needed[piece_granularity].append(piece_start)
+            plan.append((bucket_start, bucket_end, pieces))
+
+        rows = {}
+        for piece_granularity, starts in needed.items():
+            rollups = await self.get_rollups(user_id, piece_granularity, starts, db)
+            rows.update(((piece_granularity, start), rollup) for start, rollup in rollups.items())
+
+        # Leftover days sit at the edges of the range, so fetch them per contiguous run
+        for run_start, run_end in self._contiguous_runs(sorted(days)):
+            for summary in await self.get_summaries(user_id, run_start, run_end, db):
+                rows[("day", summary.date)] = summary
+
+        return [
+            self._bucket(bucket_start, bucket_end, [rows[piece] for piece in pieces])
+            for bucket_start, bucket_end, pieces in plan
+        ]
+
+    def _cover(self, start_date: date, end_date: date, granularity: str) -> List[Tuple[str, date]]:
+        """Split [start_date, end_date] into the coarsest whole periods up to granularity, then days"""
+        if granularity == "week":
+            grains = ["week"]
+        else:
+            grains = ROLLUP_GRANULARITIES[ROLLUP_GRANULARITIES.index(granularity):]
+            grains = [grain for grain in grains if grain != "week"]
+
+        pieces = []
+        day = start_date
+        while day <= end_date:
+            for grain in grains:
+                if period_start(day, grain) == day and period_end(day, grain) <= end_date:
+                    pieces.append((grain, day))
+                    day = period_end(day, grain) + timedelta(days=1)
+                    break
+            else:
+                pieces.append(("day", day))
+                day += timedelta(days=1)
+        return pieces
+
+    def _contiguous_runs(self, days: List[date]) -> List[Tuple[date, date]]:
+        runs = []
+        for day in days:
+            if runs and runs[-1][1] + timedelta(days=1) == day:
+                runs[-1] = (runs[-1][0], day)
+            else:
+                runs.append((day, day))
+        return runs
+
+    def _bucket(self, start_date: date, end_date: date, rows: List[Any]) -> Dict[str, Any]:
+        """Sum summary or rollup rows into one range bucket"""
+        return {
+            "period_start": start_date.isoformat(),
+            "period_end": end_date.isoformat(),
+            "days": (end_date - start_date).days + 1,
+            **{
+                log_column: sum(getattr(row, total_column) or 0 for row in rows)
+                for log_column, total_column in NUTRIENT_COLUMNS.items()
+            },
+            "total_meals": sum(row.total_meals or 0 for row in rows),
+            "total_snacks": sum(row.total_snacks or 0 for row in rows),
+        }
+
+    async def _fetch_range(
+        self, user_id: int, start_date: date, end_date: date, db: AsyncSession
+    ) -> List[DailyNutritionSummary]:
+        result = await db.execute(
+            select(DailyNutritionSummary).where(
+                DailyNutritionSummary.user_id == user_id,
+                DailyNutritionSummary.date >= start_date,
+                DailyNutritionSummary.date <= end_date
+            ).order_by(DailyNutritionSummary.date)
+        )
+        return list(result.scalars().all())
+
+    async def _aggregate_by_day(
+        self, user_id: int, start_date: date, end_date: date, db: AsyncSession
+    ) -> Dict[date, Dict[str, Any]]:
+        """Sum food logs per day over a date range in a single grouped query"""
+        day = func.date(summary_time(FoodLog.meal_time))
+        start, _ = day_bounds(start_date)
+        _, end = day_bounds(end_date)
+
+        result = await db.execute(
+            select(
+                day.label("day"),
+                *[
+                    func.coalesce(func.sum(getattr(FoodLog, log_column)), 0).label(total_column)
+                    for log_column, total_column in NUTRIENT_COLUMNS.items()
+                ],
+                func.count(FoodLog.id).filter(FoodLog.meal_type.in_(MAIN_MEAL_TYPES)).label("total_meals"),
+                func.count(FoodLog.id).filter(FoodLog.meal_type == MealType.SNACK).label("total_snacks"),
+            ).where(
+                FoodLog.user_id == user_id,
+                FoodLog.meal_time >= start,
+                FoodLog.meal_time < end
+            ).group_by(day)
+        )
+        return {
+            row.day: {column: getattr(row, column) for column in EMPTY_DAY}
+            for row in result
+        }
+
+    async def _materialize_stmt(self, user_id: int, target_date: date, db: AsyncSession):
+        """Build an INSERT ... SELECT of the day's aggregate into daily_nutrition_summaries"""
+        goal = await self.get_active_goal(user_id, db)
+        goals = self._goal_values(goal)
+
+        table = DailyNutritionSummary.__table__.c
+        start, end = day_bounds(target_date)
+        totals = {
+            total_column: func.coalesce(func.sum(getattr(FoodLog, log_column)), 0)
+            for log_column, total_column in NUTRIENT_COLUMNS.items()
+        }
+        columns = {
+            "user_id": literal(user_id),
+            "date": literal(target_date),
+            **totals,
+            "total_meals": func.count(FoodLog.id).filter(FoodLog.meal_type.in_(MAIN_MEAL_TYPES)),
+            "total_snacks": func.count(FoodLog.id).filter(FoodLog.meal_type == MealType.SNACK),
+            **{name: literal(value, table[name].type) for name, value in goals.items()},
+            **{
+                progress_column: progress_expr(totals[total_column], literal(goals[goal_column], table[goal_column].type))
+                for progress_column, (total_column, goal_column) in PROGRESS_COLUMNS.items()
+            },
+        }
+
+        aggregate = select(*[expr.label(name) for name, expr in columns.items()]).where(
+            FoodLog.user_id == user_id,
+            FoodLog.meal_time >= start,
+            FoodLog.meal_time < end
+        )
+        return insert(DailyNutritionSummary).from_select(list(columns), aggregate)
+
+    def _goal_values(self, goal: Optional[NutritionGoal]) -> Dict[str, Any]:
+        """Summary goal columns for a goal, all None without one"""
+        return {
+            "calories_goal": goal.daily_calories if goal else None,
+            "protein_goal_g": goal.daily_protein_g if goal else None,
+            "carbs_goal_g": goal.daily_carbs_g if goal else None,
+            "fat_goal_g": goal.daily_fat_g if goal else None,
+        }
+
+    def _deltas(self, food_log: FoodLog, sign: int) -> Dict[str, Any]:
+        deltas = {
+            total_column: sign * (getattr(food_log, log_column) or 0)
+            for log_column, total_column in NUTRIENT_COLUMNS.items()
+        }
+        deltas["total_meals"] = sign if food_log.meal_type in MAIN_MEAL_TYPES else 0
+        deltas["total_snacks"] = sign if food_log.meal_type == MealType.SNACK else 0
+        return deltas
+
+    def _increment_values(self, deltas: Dict[str, Any], model=DailyNutritionSummary) -> Dict[str, Any]:
+        """SET clause adding deltas to the current row and recomputing progress"""
+        table = model.__table__.c
+        values = {
+            column: func.coalesce(table[column], 0) + delta
+            for column, delta in deltas.items()
+        }
+        values["updated_at"] = func.now()
+        if model is not DailyNutritionSummary:
+            return values
+
+        for progress_column, (total_column, goal_column) in PROGRESS_COLUMNS.items():
+            values[progress_column] = progress_expr(values[total_column], table[goal_column])
+        return values
+
+
+# Create service instance
+summary_service = SummaryService()
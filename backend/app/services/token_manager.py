@@ -0,0 +1,246 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from typing import Any, Awaitable, Callable, Dict, Optional
+from datetime import datetime, timezone
+import asyncio
+import httpx
+import random
+import time
+
+from ..core.database import AsyncSessionLocal
+from ..models.oauth import OAuthToken
+
+DEFAULT_EXPIRES_IN = 3600
+IDLE_CHECK_SECONDS = 60
+RETRY_SECONDS = 30
+
+
+class TokenManager:
+    """
+    OAuth token holder shared by every worker through the oauth_tokens table.
+
+    Tokens are refreshed refresh_margin seconds before they expire by a
+    background task, so requests never wait on an expired-token round trip.
+    Refreshes are serialized twice over: an asyncio lock within the process
+    and a row lock on the provider's row across workers, and whoever gets
+    the lock second adopts the token the first one stored.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        request_token: Callable[[Dict[str, str]], Awaitable[Dict[str, Any]]],
+        client_credentials_grant: Optional[Dict[str, str]] = None,
+        refresh_margin: int = 300,
+        shared: bool = True,
+    ):
+        self.provider = provider
+        self.request_token = request_token
+        self.client_credentials_grant = client_credentials_grant
+        self.refresh_margin = refresh_margin
+        self.shared = shared
+        self.refreshes = 0
+
+        self._access_token: Optional[str] = None
+        self._refresh_token: Optional[str] = None
+        self._expires_at: float = 0.0
+        self._code_verifier: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def access_token(self) -> Optional[str]:
+        """The current token if it hasn't expired, without refreshing"""
+        return self._access_token if time.time() < self._expires_at else None
+
+    @property
+    def can_authenticate(self) -> bool:
+        return bool(self.access_token or self._refresh_token or self.client_credentials_grant)
+
+    async def get_access_token(self, rejected: Optional[str] = None) -> str:
+        """
+        Return a valid access token, refreshing it if needed.
+
+        Pass the token the upstream just rejected (401) to force a refresh
+        unless someone else has replaced it already.
+        """
+        if self._is_valid(rejected):
+            return self._access_token
+
+        async with self._lock:
+            if self._is_valid(rejected):
+                return self._access_token
+
+            if self.shared:
+                try:
+                    await self._refresh_shared(rejected)
+                    return self._access_token
+                except (httpx.HTTPError, ValueError):
+                    raise
+                except Exception as e:
+                    print(f"Shared token store unavailable, refreshing locally: {e}")
+
+            self._apply(await self._request_new_token())
+            return self._access_token
+
+    async def save_tokens(self, token_data: Dict[str, Any]) -> None:
+        """Store tokens obtained outside the manager, e.g. an authorization code exchange"""
+        async with self._lock:
+            self._apply(token_data)
+            await self._store(
+                access_token=self._access_token,
+                refresh_token=self._refresh_token,
+                expires_at=self._expires_at_utc(),
+                code_verifier=None,
+            )
+
+    async def save_code_verifier(self, code_verifier: str) -> None:
+        # The callback carrying the code may land on a different worker
+        self._code_verifier = code_verifier
+        await self._store(code_verifier=code_verifier)
+
+    async def load_code_verifier(self) -> Optional[str]:
+        row = await self._load_row()
+        return row.code_verifier if row and row.code_verifier else self._code_verifier
+
+    async def start(self) -> None:
+        """Load the shared token and keep it fresh in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "has_token": self.access_token is not None,
+            "expires_in_seconds": max(0, int(self._expires_at - time.time())) if self._access_token else None,
+            "refreshes": self.refreshes,
+        }
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                # Pick up tokens stored by other workers
+                row = await self._load_row()
+                if row:
+                    self._load(row)
+
+                if self.can_authenticate:
+                    await self.get_access_token()
+                    delay = self._expires_at - self.refresh_margin - time.time()
+                    # Spread workers out so one refresh usually serves them all
+                    delay = max(delay, 1) * random.uniform(0.9, 1.0)
+                else:
+                    delay = IDLE_CHECK_SECONDS
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Background {self.provider} token refresh failed: {e}")
+                delay = RETRY_SECONDS
+
+            await asyncio.sleep(delay)
+
+    async def _refresh_shared(self, rejected: Optional[str]) -> None:
+        async with AsyncSessionLocal() as session:
+            # Make sure the row exists so there is something to lock
+            await session.execute(
+                insert(OAuthToken).values(provider=self.provider).on_conflict_do_nothing()
+            )
+            result = await session.execute(
+                select(OAuthToken).where(OAuthToken.provider == self.provider).with_for_update()
+            )
+            row = result.scalar_one()
+            self._load(row)
+
+            # Another worker refreshed while we waited for the lock
+            if self._is_valid(rejected):
+                await session.commit()
+                return
+
+            self._apply(await self._request_new_token())
+            row.access_token = self._access_token
+            row.refresh_token = self._refresh_token
+            row.expires_at = self._expires_at_utc()
+            await session.commit()
+
+    async def _request_new_token(self) -> Dict[str, Any]:
+        if self._refresh_token:
+            try:
+                return await self.request_token({
+                    "grant_type": "refresh_token",
+                    "refresh_token": self._refresh_token,
+                })
+            except httpx.HTTPStatusError as e:
+                # A revoked refresh token can still be replaced via client credentials
+                if not self.client_credentials_grant:
+                    raise
+                print(f"{self.provider} refresh token rejected ({e.response.status_code}); using client credentials")
+
+        if self.client_credentials_grant:
+            return await self.request_token(self.client_credentials_grant)
+
+        raise ValueError("No access token available. Please authenticate first.")
+
+    def _apply(self, token_data: Dict[str, Any]) -> None:
+        self._access_token = token_data["access_token"]
+        self._refresh_token = token_data.get("refresh_token", self._refresh_token)
+        self._expires_at = time.time() + int(token_data.get("expires_in", DEFAULT_EXPIRES_IN))
+        self.refreshes += 1
+
+    def _load(self, row: OAuthToken) -> None:
+        if not row.access_token or not row.expires_at:
+            return
+
+        # Only adopt a stored token that outlives the one held locally
+        expires_at = row.expires_at.replace(tzinfo=timezone.utc).timestamp()
+        if expires_at > self._expires_at:
+            self._access_token = row.access_token
+            self._refresh_token = row.refresh_token
+            self._expires_at = expires_at
+
+    def _is_valid(self, rejected: Optional[str] = None) -> bool:
+        return (
+            self._access_token is not None
+            and self._access_token != rejected
+            and time.time() < self._expires_at - self.refresh_margin
+        )
+
+    def _expires_at_utc(self) -> datetime:
+        return datetime.utcfromtimestamp(self._expires_at)
+
+    async def _load_row(self) -> Optional[OAuthToken]:
+        if not self.shared:
+            return None
+
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(OAuthToken).where(OAuthToken.provider == self.provider)
+                )
+                return result.scalar_one_or_none()
+        except Exception as e:
+            print(f"Shared token store unavailable: {e}")
+            return None
+
+    async def _store(self, **values: Any) -> None:
+        if not self.shared:
+            return
+
+        stmt = insert(OAuthToken).values(provider=self.provider, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[OAuthToken.provider],
+            set_={**values, "updated_at": datetime.utcnow()}
+        )
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(stmt)
+                await session.commit()
+        except Exception as e:
+            print(f"Shared token store unavailable: {e}")
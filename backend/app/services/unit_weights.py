@@ -0,0 +1,192 @@
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.food import Food, FoodUnitWeight
+from ..schemas.food import FoodRecord
+from .nlp_service import nlp_service
+
+
+# Typical weights for foods whose servings we don't know, keyed by food
+# name or its last word ("masala dosa" falls back to "dosa")
+CURATED_UNIT_GRAMS: Dict[str, Dict[str, float]] = {
+    'roti': {'piece': 40}, 'chapati': {'piece': 40}, 'phulka': {'piece': 30},
+    'naan': {'piece': 90}, 'paratha': {'piece': 80}, 'puri': {'piece': 25},
+    'idli': {'piece': 40}, 'dosa': {'piece': 100}, 'samosa': {'piece': 60},
+    'bread': {'piece': 30}, 'egg': {'piece': 50},
+    'apple': {'piece': 180}, 'banana': {'piece': 120}, 'orange': {'piece': 130},
+    'rice': {'bowl': 180}, 'dal': {'bowl': 200}, 'curry': {'bowl': 200},
+    'sabzi': {'bowl': 150}, 'yogurt': {'bowl': 150}, 'curd': {'bowl': 150},
+    'milk': {'glass': 250}, 'juice': {'glass': 250}, 'water': {'glass': 250},
+    'tea': {'glass': 150}, 'chai': {'glass': 150}, 'coffee': {'glass': 150},
+}
+
+# FatSecret measures that mean "one of it" for countable foods
+PIECE_MEASURES = {'medium', 'item', 'whole', 'each'}
+
+# Units whose weight doesn't depend on the food
+ABSOLUTE_UNITS = {'gram', 'kilogram', 'milliliter', 'liter'}
+
+# Re-read this far back on each refresh, for transactions that committed
+# after a later-stamped row was already loaded
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+class UnitWeightIndex:
+    """
+    In-memory (food_id, unit) -> grams lookup backed by food_unit_weights.
+
+    Rows come from FatSecret serving measures when a food is imported, and
+    from curated defaults. Each process loads the table at startup and then
+    only rows updated since, on an interval, so catalog changes made by
+    other workers show up without per-request queries.
+    """
+
+    def __init__(self):
+        self._weights: Dict[Tuple[int, str], float] = {}
+        self._loaded_until: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"food_hits": 0, "curated_hits": 0, "serving_hits": 0, "defaults": 0}
+
+    def grams(self, food: Food, quantity: float, unit: str) -> float:
+        """Weight of quantity units of food, from the most specific source available"""
+        unit = nlp_service.normalize_unit(unit)
+        if unit in ABSOLUTE_UNITS:
+            return nlp_service.convert_to_grams(quantity, unit)
+
+        grams = self._weights.get((food.id, unit))
+        if grams is not None:
+            self.stats["food_hits"] += 1
+            return quantity * grams
+
+        grams = _curated_grams(food.name, unit)
+        if grams is not None:
+            self.stats["curated_hits"] += 1
+            return quantity * grams
+
+        if unit == 'serving' and food.serving_weight_grams:
+            self.stats["serving_hits"] += 1
+            return quantity * food.serving_weight_grams
+
+        self.stats["defaults"] += 1
+        return nlp_service.convert_to_grams(quantity, unit)
+
+    def weights_for(self, food: FoodRecord) -> Dict[str, Tuple[float, str]]:
+        """Unit -> (grams, source) rows for a food about to be stored"""
+        weights: Dict[str, Tuple[float, str]] = {}
+        pieces: Optional[float] = None
+        for description, grams in (food.serving_weights or {}).items():
+            if description in PIECE_MEASURES:
+                pieces = pieces or grams
+                continue
+            unit = nlp_service.normalize_unit(description.rsplit(' ', 1)[-1])
+            if unit in nlp_service.unit_patterns and unit not in ABSOLUTE_UNITS:
+                weights.setdefault(unit, (grams, "fatsecret"))
+
+        if pieces and 'piece' not in weights:
+            weights['piece'] = (pieces, "fatsecret")
+        if food.serving_weight_grams and 'serving' not in weights:
+            weights['serving'] = (food.serving_weight_grams, "fatsecret")
+
+        for unit, grams in (_curated_units(food.name) or {}).items():
+            weights.setdefault(unit, (grams, "curated"))
+        return weights
+
+    async def store(
+        self, session: AsyncSession, food_ids: Dict[str, int], foods: List[FoodRecord]
+    ) -> List[Dict[str, Any]]:
+        """
+        Upsert weights for FatSecret foods in the caller's transaction.
+
+        food_ids maps FatSecret ids to catalog ids; foods without a catalog
+        id are skipped. Returns the rows written, to pass to apply() once the
+        caller has committed; until then the in-memory index is unchanged.
+        """
+        rows = []
+        for food in foods:
+            food_id = food_ids.get(str(food.id))
+            if food_id is None:
+                continue
+            for unit, (grams, source) in self.weights_for(food).items():
+                rows.append({"food_id": food_id, "unit": unit, "grams": grams, "source": source})
+        if not rows:
+            return rows
+
+        stmt = insert(FoodUnitWeight).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FoodUnitWeight.food_id, FoodUnitWeight.unit],
+            set_={
+                "grams": stmt.excluded.grams,
+                "source": stmt.excluded.source,
+                "updated_at": func.now(),
+            }
+        )
+        await session.execute(stmt)
+        return rows
+
+    def apply(self, rows: List[Dict[str, Any]]) -> None:
+        """Make rows from a committed store() visible without waiting for a refresh"""
+        for row in rows:
+            self._weights[(row["food_id"], row["unit"])] = row["grams"]
+
+    async def refresh(self) -> int:
+        """Load rows changed since the last refresh (everything the first time)"""
+        query = select(
+            FoodUnitWeight.food_id, FoodUnitWeight.unit, FoodUnitWeight.grams, FoodUnitWeight.updated_at
+        )
+        if self._loaded_until is not None:
+            query = query.where(FoodUnitWeight.updated_at > self._loaded_until - REFRESH_OVERLAP)
+
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(query)
+                rows = result.all()
+        except Exception as e:
+            print(f"Unit weight refresh failed: {e}")
+            return 0
+
+        for food_id, unit, grams, updated_at in rows:
+            self._weights[(food_id, unit)] = grams
+            if updated_at and (self._loaded_until is None or updated_at > self._loaded_until):
+                self._loaded_until = updated_at
+        return len(rows)
+
+    async def start(self) -> None:
+        """Refresh from the table now and then every UNIT_WEIGHTS_REFRESH_SECONDS"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._weights), **self.stats}
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(settings.UNIT_WEIGHTS_REFRESH_SECONDS)
+
+
+def _curated_units(food_name: str) -> Optional[Dict[str, float]]:
+    name = food_name.lower().strip()
+    return CURATED_UNIT_GRAMS.get(name) or CURATED_UNIT_GRAMS.get(name.rsplit(' ', 1)[-1])
+
+
+def _curated_grams(food_name: str, unit: str) -> Optional[float]:
+    units = _curated_units(food_name)
+    return units.get(unit) if units else None
+
+
+unit_weight_index = UnitWeightIndex()
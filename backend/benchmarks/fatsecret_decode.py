@@ -0,0 +1,147 @@
+"""
+Micro-benchmark for decoding and converting FatSecret search payloads.
+
+Compares the previous path (json module, per-item keyword scan, validated
+FoodResponse construction) with the current one (fastjson, precompiled
+keyword matcher, unvalidated FoodRecord dataclasses) on a synthetic payload.
+
+Usage:
+    cd backend
+    python -m benchmarks.fatsecret_decode [--items 5000] [--repeat 5]
+"""
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List
+import argparse
+import json
+import random
+import time
+
+from app.core import fastjson
+from app.schemas.food import FoodResponse
+from app.services.fatsecret_service import FatSecretService, SERVING_NUTRIENTS
+from app.services.food_matching import INDIAN_FOOD_KEYWORDS, indian_food_matcher
+
+NAMES = [
+    "Butter Chicken", "Masala Dosa", "Grilled Salmon", "Dal Makhani", "Caesar Salad",
+    "Chicken Biryani", "Greek Yogurt", "Aloo Paratha", "Oatmeal with Berries", "Paneer Tikka",
+    "Peanut Butter Sandwich", "Gulab Jamun", "Veggie Burger", "Mango Lassi", "Brown Rice",
+]
+
+
+def build_payload(items: int) -> bytes:
+    """A foods.search style response body with `items` foods"""
+    rng = random.Random(42)
+    foods = []
+    for i in range(items):
+        foods.append({
+            "food_id": str(10000 + i),
+            "food_name": f"{rng.choice(NAMES)} {rng.choice(['', 'Homestyle', 'Restaurant', 'Frozen'])}".strip(),
+            "brand_name": rng.choice([None, "Haldiram's", "Amul", "Generic"]),
+            "food_type": rng.choice(["Generic", "Brand"]),
+            "servings": {"serving": [{
+                "metric_serving_amount": f"{rng.uniform(50, 300):.3f}",
+                "metric_serving_unit": "g",
+                "calories": f"{rng.uniform(50, 600):.0f}",
+                "protein": f"{rng.uniform(0, 40):.2f}",
+                "carbohydrate": f"{rng.uniform(0, 80):.2f}",
+                "fat": f"{rng.uniform(0, 30):.2f}",
+                "fiber": f"{rng.uniform(0, 10):.1f}",
+                "sugar": f"{rng.uniform(0, 30):.2f}",
+                "sodium": f"{rng.uniform(0, 900):.0f}",
+            }]},
+        })
+    return json.dumps({"foods": {"food": foods}}).encode("utf-8")
+
+
+def baseline_convert(fatsecret_food: Dict[str, Any]) -> FoodResponse:
+    """The previous conversion, with the serving amount parsed as a float"""
+    servings = fatsecret_food.get('servings', {}).get('serving', [])
+    if not isinstance(servings, list):
+        servings = [servings]
+    first_serving = servings[0] if servings else {}
+
+    serving_size = float(first_serving.get('metric_serving_amount', 0))
+    if serving_size == 0:
+        serving_size = 100
+
+    values = {}
+    multiplier = 100 / serving_size
+    for serving_field, field in SERVING_NUTRIENTS:
+        values[field] = float(first_serving.get(serving_field, 0)) * multiplier
+
+    food_name = fatsecret_food.get('food_name', '').lower()
+    indian_food_keywords = list(INDIAN_FOOD_KEYWORDS)
+    is_indian_food = any(keyword in food_name for keyword in indian_food_keywords)
+
+    return FoodResponse(
+        id=int(fatsecret_food.get('food_id', 0)),
+        name=fatsecret_food.get('food_name', ''),
+        brand=fatsecret_food.get('brand_name'),
+        serving_size=first_serving.get('metric_serving_unit'),
+        serving_weight_grams=serving_size,
+        category=fatsecret_food.get('food_type'),
+        subcategory=None,
+        is_indian_food=is_indian_food,
+        **values
+    )
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> float:
+    """Best wall time of `repeat` runs, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark FatSecret payload decoding and conversion")
+    parser.add_argument("--items", type=int, default=5000, help="Foods per payload")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    service = FatSecretService()
+    body = build_payload(args.items)
+    foods: List[Dict[str, Any]] = json.loads(body)["foods"]["food"]
+    names = [food["food_name"] for food in foods]
+
+    def baseline_classify():
+        for name in names:
+            lowered = name.lower()
+            any(keyword in lowered for keyword in INDIAN_FOOD_KEYWORDS)
+
+    def baseline_end_to_end():
+        return [baseline_convert(food) for food in json.loads(body)["foods"]["food"]]
+
+    def current_end_to_end():
+        return service._convert_fatsecret_foods(fastjson.loads(body)["foods"]["food"])
+
+    # Same answers before timing anything; serving weights postdate the baseline
+    baseline = [food.model_dump(exclude={"serving_weights"}) for food in baseline_end_to_end()]
+    current = [asdict(food) for food in current_end_to_end()]
+    for food in current:
+        del food["serving_weights"]
+    assert baseline == current
+
+    measurements = [
+        ("decode", lambda: json.loads(body), lambda: fastjson.loads(body)),
+        ("classify", baseline_classify, lambda: [indian_food_matcher.matches(name) for name in names]),
+        ("convert", lambda: [baseline_convert(food) for food in foods],
+         lambda: service._convert_fatsecret_foods(foods)),
+        ("end-to-end", baseline_end_to_end, current_end_to_end),
+    ]
+
+    decoder = "orjson" if fastjson.orjson is not None else "json (orjson not installed)"
+    print(f"{args.items} foods, {len(body) / 1024:.0f} KiB payload, decoder: {decoder}")
+    print(f"{'stage':<12}{'before items/s':>16}{'after items/s':>16}{'speedup':>10}")
+    for stage, before, after in measurements:
+        before_time = timed(before, args.repeat)
+        after_time = timed(after, args.repeat)
+        print(f"{stage:<12}{args.items / before_time:>16,.0f}{args.items / after_time:>16,.0f}"
+              f"{before_time / after_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
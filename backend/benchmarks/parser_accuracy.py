@@ -0,0 +1,234 @@
+"""
+Accuracy and latency benchmark for the natural-language food parsers.
+
+Runs every entry of a labeled corpus through each parsing strategy and
+reports throughput, p50/p95 latency, and precision/recall for items,
+item+quantity and item+unit. Strategies:
+
+    rules   the gazetteer rule parser alone
+    spacy   the spaCy parser alone (skipped if the model isn't installed)
+    local   the production local path: rules, with spaCy for what they miss
+    gpt     the GPT-4 path against a mocked LLM
+    race    the production path: rules, then GPT racing the local parser
+
+Corpus labels name each food the way the entry does: every word saying
+what the food is stays ("chicken curry", "orange juice", "boiled egg"),
+while amounts, containers, sizes and meals go to quantity, unit and
+meal_type. Item matching singularizes both sides, so label number doesn't
+matter. Label from the text, never from a parser's output.
+
+The LLM is mocked offline: it answers from the corpus labels after a
+simulated delay, so gpt accuracy is an upper bound and its latency is
+whatever --llm-latency-ms says. What it measures is our side of the call
+(prompt, JSON extraction, conversion) and how the race behaves under a
+given budget.
+
+Usage:
+    cd backend
+    python -m benchmarks.parser_accuracy [--strategies rules,local] [--repeat 5]
+        [--llm-latency-ms 800] [--budget-ms 1500] [--show-errors]
+"""
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import time
+
+from app.core.config import settings
+from app.schemas.food import MealType, ParsedFoodEntry
+from app.services import nlp_service as nlp_module
+from app.services.nlp_service import nlp_service
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "parser_corpus.jsonl")
+
+STRATEGIES = ["rules", "spacy", "local", "gpt", "race"]
+
+Parse = Callable[[str, Optional[MealType]], Awaitable[ParsedFoodEntry]]
+
+
+class MockChatCompletion:
+    """Stands in for openai.ChatCompletion, answering from corpus labels after a delay"""
+
+    def __init__(self, corpus: List[Dict[str, Any]], latency_ms: float, jitter_ms: float):
+        self.labels = {entry["text"]: entry for entry in corpus}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rng = random.Random(42)
+
+    async def acreate(self, **kwargs: Any) -> Any:
+        prompt = kwargs["messages"][-1]["content"]
+        match = re.search(r'Food entry: "(.*)"', prompt)
+        entry = self.labels.get(match.group(1)) if match else None
+
+        delay = max(self.rng.gauss(self.latency_ms, self.jitter_ms), 0) / 1000
+        await asyncio.sleep(delay)
+
+        body = {
+            "foods": entry["foods"] if entry else [],
+            "meal_type": (entry or {}).get("meal_type") or "other",
+            "confidence": 0.95,
+        }
+        message = SimpleNamespace(content=json.dumps(body))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def normalize_item(item: str) -> str:
+    """Lowercase and singularize each word so "Rotis" matches "roti" """
+    words = []
+    for word in item.lower().split():
+        if word.endswith("ies") and len(word) > 4:
+            word = word[:-3] + "y"
+        elif word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+            word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+
+def score(gold: List[Dict[str, Any]], predicted: List[Any]) -> Dict[str, int]:
+    """True positives for items, item+quantity and item+unit, plus totals"""
+    counts = {"gold": len(gold), "predicted": len(predicted), "item": 0, "quantity": 0, "unit": 0}
+    unmatched = list(predicted)
+    for expected in gold:
+        name = normalize_item(expected["item"])
+        found = next((food for food in unmatched if normalize_item(food.item) == name), None)
+        if found is None:
+            continue
+        unmatched.remove(found)
+        counts["item"] += 1
+        if abs(found.quantity - float(expected["quantity"])) < 1e-6:
+            counts["quantity"] += 1
+        if nlp_service.normalize_unit(found.unit) == nlp_service.normalize_unit(expected["unit"]):
+            counts["unit"] += 1
+    return counts
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def build_strategies(names: List[str]) -> Dict[str, Parse]:
+    empty = lambda meal_type: ParsedFoodEntry(foods=[], meal_type=meal_type, confidence=0)
+
+    async def rules(text, meal_type):
+        return nlp_service.rule_parser.parse(text, meal_type)
+
+    async def spacy(text, meal_type):
+        return nlp_service._parse_with_spacy(text, meal_type)
+
+    async def local(text, meal_type):
+        return nlp_service._parse_local(text, meal_type)
+
+    async def gpt(text, meal_type):
+        return await nlp_service._parse_with_gpt(text, meal_type) or empty(meal_type)
+
+    async def race(text, meal_type):
+        parsed_entry, _ = await nlp_service._parse_food_entry(text, meal_type)
+        return parsed_entry
+
+    available = {"rules": rules, "spacy": spacy, "local": local, "gpt": gpt, "race": race}
+    return {name: available[name] for name in names}
+
+
+async def run_strategy(parse: Parse, corpus: List[Dict[str, Any]], repeat: int, show_errors: bool) -> Dict[str, Any]:
+    latencies: List[float] = []
+    totals = {"gold": 0, "predicted": 0, "item": 0, "quantity": 0, "unit": 0}
+    errors: List[Tuple[str, List[Any]]] = []
+
+    started = time.perf_counter()
+    for run in range(repeat):
+        for entry in corpus:
+            meal_type = MealType(entry["meal_type"]) if entry.get("meal_type") else None
+            call_started = time.perf_counter()
+            parsed_entry = await parse(entry["text"], meal_type)
+            latencies.append(time.perf_counter() - call_started)
+
+            # Accuracy doesn't change between runs; score the first only
+            if run == 0:
+                counts = score(entry["foods"], parsed_entry.foods)
+                for key in totals:
+                    totals[key] += counts[key]
+                if counts["unit"] < counts["gold"] or counts["predicted"] > counts["gold"]:
+                    errors.append((entry["text"], parsed_entry.foods))
+    elapsed = time.perf_counter() - started
+
+    if show_errors:
+        for text, foods in errors:
+            print(f"   {text!r} -> {[(food.item, food.quantity, food.unit) for food in foods]}")
+
+    def ratio(hits: int, total: int) -> float:
+        return hits / total if total else 0.0
+
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        **{
+            f"{key}_pr": (ratio(totals[key], totals["predicted"]), ratio(totals[key], totals["gold"]))
+            for key in ("item", "quantity", "unit")
+        },
+    }
+
+
+async def run(args: argparse.Namespace) -> None:
+    corpus = load_corpus(args.corpus)
+    names = [name.strip() for name in args.strategies.split(",") if name.strip()]
+    unknown = set(names) - set(STRATEGIES)
+    if unknown:
+        raise SystemExit(f"Unknown strategies: {', '.join(sorted(unknown))}")
+
+    # Offline: mocked LLM, no caches, no background upgrades
+    nlp_module.openai.ChatCompletion = MockChatCompletion(corpus, args.llm_latency_ms, args.llm_jitter_ms)
+    settings.OPENAI_API_KEY = "benchmark"
+    settings.NLP_LLM_BUDGET_SECONDS = args.budget_ms / 1000
+
+    await nlp_service.ensure_model()
+    if "spacy" in names and not nlp_service.nlp:
+        print("spaCy model not installed; skipping the spacy strategy")
+        names.remove("spacy")
+
+    print(f"{len(corpus)} entries x {args.repeat} runs, mock LLM {args.llm_latency_ms:.0f}"
+          f"±{args.llm_jitter_ms:.0f} ms, budget {args.budget_ms:.0f} ms")
+    print(f"{'strategy':<10}{'entries/s':>12}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'item P/R':>14}{'qty P/R':>14}{'unit P/R':>14}")
+
+    try:
+        for name, parse in build_strategies(names).items():
+            # The LLM strategies sleep on the mock; one run is enough for their latency
+            repeat = 1 if name in ("gpt", "race") else args.repeat
+            if args.show_errors:
+                print(f"{name} errors:")
+            result = await run_strategy(parse, corpus, repeat, args.show_errors)
+            pr = lambda key: f"{result[key][0]:.2f}/{result[key][1]:.2f}"
+            print(f"{name:<10}{result['throughput']:>12,.0f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                  f"{pr('item_pr'):>14}{pr('quantity_pr'):>14}{pr('unit_pr'):>14}")
+    finally:
+        await nlp_service.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark food entry parsing accuracy and latency")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="Labeled JSONL corpus")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES), help="Comma-separated strategies to run")
+    parser.add_argument("--repeat", type=int, default=5, help="Corpus passes for the local strategies")
+    parser.add_argument("--llm-latency-ms", type=float, default=800, help="Mean mocked LLM latency")
+    parser.add_argument("--llm-jitter-ms", type=float, default=300, help="Std deviation of mocked LLM latency")
+    parser.add_argument("--budget-ms", type=float, default=settings.NLP_LLM_BUDGET_SECONDS * 1000,
+                        help="Latency budget for the race strategy")
+    parser.add_argument("--show-errors", action="store_true", help="Print entries each strategy got wrong")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
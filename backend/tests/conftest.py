@@ -0,0 +1,16 @@
+import pytest
+
+from app.core.cache import InMemoryCache, dashboard_cache
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "postgres: needs a scratch Postgres database in TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def cache():
+    """The dashboard cache on a fresh in-memory backend, with no shared store"""
+    original = (dashboard_cache.local, dashboard_cache.shared)
+    dashboard_cache.configure(local=InMemoryCache(max_entries=64), shared=None)
+    yield dashboard_cache
+    dashboard_cache.configure(*original)
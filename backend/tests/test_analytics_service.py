@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from app.api.v1 import api  # noqa: F401 - registers every model with Base
+from app.models.nutrition import NutritionGoal
+from app.services.analytics_service import analytics_service, NUTRIENT_INDEX
+
+GOAL = NutritionGoal(daily_calories=2000, daily_protein_g=100, daily_carbs_g=250, daily_fat_g=70)
+ON_GOAL = [2000.0, 100.0, 250.0, 70.0]
+CALORIES = NUTRIENT_INDEX["calories"]
+
+
+@pytest.fixture(autouse=True)
+def no_numpy_warnings():
+    """Edge cases must not lean on NaN warnings from empty or zero denominators"""
+    with np.errstate(all="raise"):
+        yield
+
+
+def goals():
+    return analytics_service.goal_vector(GOAL)
+
+
+def days(*calories):
+    """A series on goal for every nutrient but calories"""
+    return np.array([[value, *ON_GOAL[1:]] for value in calories])
+
+
+def titles(features, goal=GOAL):
+    return [insight["title"] for insight in analytics_service.build_insights(features, goal)]
+
+
+def test_empty_series():
+    features = analytics_service.compute_features(np.zeros((0, 4)), goals())
+
+    assert features["mean"].tolist() == [0.0] * 4
+    assert features["rolling_mean"].shape == (0, 4)
+    assert np.isnan(features["goal_deviation"]).all()
+    assert features["adherence_streak"].tolist() == [0] * 4
+    assert features["days_logged"] == 0
+    assert titles(features) == []
+    assert analytics_service.score_users(np.zeros((2, 0, 4)), np.tile(goals(), (2, 1))).tolist() == [0.0, 0.0]
+
+
+def test_single_day_series():
+    features = analytics_service.compute_features(np.array([ON_GOAL]), goals())
+
+    assert features["mean"].tolist() == ON_GOAL
+    assert features["variance"].tolist() == [0.0] * 4
+    assert features["rolling_mean"].tolist() == [ON_GOAL]
+    assert features["trend_slope"].tolist() == [0.0] * 4
+    assert features["goal_ratio"].tolist() == [1.0] * 4
+    assert features["adherence_streak"].tolist() == [1] * 4
+    assert titles(features) == []
+
+
+def test_zero_goal_vector_counts_as_no_goal():
+    series = np.array([ON_GOAL] * 3)
+    features = analytics_service.compute_features(series, np.zeros(4))
+
+    assert np.isnan(features["goal_ratio"]).all()
+    assert np.isnan(features["goal_deviation"]).all()
+    assert features["adherence_streak"].tolist() == [0] * 4
+    assert analytics_service.score_users(series[None], np.zeros((1, 4))).tolist() == [0.0]
+    assert analytics_service.score_users(series[None], goals()[None]).tolist() == [100.0]
+
+
+def test_zero_calorie_goal_flags_no_trend():
+    goal = NutritionGoal(daily_calories=0, daily_protein_g=100, daily_carbs_g=250, daily_fat_g=70)
+    features = analytics_service.compute_features(days(1800, 2000, 2200), analytics_service.goal_vector(goal))
+
+    assert titles(features, goal) == []
+
+
+@pytest.mark.parametrize("calories, streak", [
+    ((2000, 2000, 2000), 3),
+    ((1000, 2000, 2000), 2),
+    ((2000, 2000, 1000), 0),
+    ((2000, 1000, 2000), 1),
+    ((1800, 2200, 2000), 3),  # ±10% is still on target
+    ((1799, 2000, 2000), 2),
+])
+def test_adherence_streak_counts_back_from_the_last_day(calories, streak):
+    features = analytics_service.compute_features(days(*calories), goals())
+
+    assert features["adherence_streak"][CALORIES] == streak
+
+
+def test_streak_insight_needs_three_days():
+    assert "On-Target Streak" in titles(analytics_service.compute_features(days(2000, 2000, 2000), goals()))
+    assert "On-Target Streak" not in titles(analytics_service.compute_features(days(2000, 2000), goals()))
+
+
+def test_trend_and_low_intake_insights():
+    features = analytics_service.compute_features(days(1000, 1200, 1400), goals())
+
+    assert features["trend_slope"][CALORIES] == pytest.approx(200)
+    assert titles(features) == ["Low Calorie Intake", "Calories Trending Up"]
+
+
+def test_score_users_batches_users():
+    series = np.stack([np.array([ON_GOAL] * 3), np.array([ON_GOAL] * 3) * 1.5])
+
+    assert analytics_service.score_users(series, np.tile(goals(), (2, 1))).tolist() == [100.0, 50.0]
@@ -0,0 +1,194 @@
+from datetime import datetime
+import asyncio
+from types import SimpleNamespace
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+import pytest
+
+from app.api.v1 import food as food_api
+from app.api.v1.auth import get_current_user
+from app.core.cache import InMemoryCache, ResponseCache
+from app.core.database import get_db
+from app.models.food import Food
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    """Just enough of AsyncSession for POST /food/log"""
+
+    def __init__(self, food):
+        self.food = food
+        self.added = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        return FakeResult(self.food)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        for i, obj in enumerate(self.added, start=1):
+            obj.id = obj.id or i
+
+    async def commit(self):
+        self.commits += 1
+
+    async def refresh(self, obj):
+        obj.created_at = datetime.utcnow()
+
+
+@pytest.fixture
+def computed():
+    """Number of times each user's dashboard was computed"""
+    return {}
+
+
+@pytest.fixture
+def client(cache, computed, monkeypatch):
+    app = FastAPI()
+
+    @app.get("/users/{user_id}/dashboard")
+    async def dashboard(request: Request, user_id: int):
+        async def compute():
+            computed[user_id] = computed.get(user_id, 0) + 1
+            return {"user_id": user_id, "days": request.query_params.get("days")}
+
+        return await cache.respond(request, user_id, compute)
+
+    # Food log writes against a fake session, as user 1
+    async def apply_food_log(food_log, db, sign=1):
+        pass
+
+    monkeypatch.setattr(food_api.summary_service, "apply_food_log", apply_food_log)
+    app.include_router(food_api.router, prefix="/food")
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1)
+    app.dependency_overrides[get_db] = lambda: FakeSession(Food(id=5, name="roti", calories_per_100g=300))
+
+    return TestClient(app)
+
+
+def test_repeat_request_is_served_from_cache(client, computed):
+    first = client.get("/users/1/dashboard")
+    second = client.get("/users/1/dashboard")
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json() == {"user_id": 1, "days": None}
+    assert computed == {1: 1}
+
+
+def test_key_covers_user_and_query(client, computed):
+    client.get("/users/1/dashboard?days=7")
+    client.get("/users/1/dashboard?days=30")
+    client.get("/users/2/dashboard?days=7")
+    client.get("/users/1/dashboard?days=7")
+
+    assert computed == {1: 2, 2: 1}
+
+
+def test_matching_etag_returns_not_modified(client):
+    etag = client.get("/users/1/dashboard").headers["ETag"]
+
+    response = client.get("/users/1/dashboard", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    response = client.get("/users/1/dashboard", headers={"If-None-Match": '"stale", ' + etag})
+    assert response.status_code == 304
+
+    response = client.get("/users/1/dashboard", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == etag
+
+
+def test_etag_changes_with_content(client):
+    assert client.get("/users/1/dashboard").headers["ETag"] != client.get("/users/2/dashboard").headers["ETag"]
+
+
+def test_invalidate_user_only_drops_that_user(client, cache, computed):
+    client.get("/users/1/dashboard")
+    client.get("/users/2/dashboard")
+
+    # The in-memory backend isn't tied to the app's event loop
+    asyncio.run(cache.invalidate_user(1))
+
+    client.get("/users/1/dashboard")
+    client.get("/users/2/dashboard")
+    assert computed == {1: 2, 2: 1}
+
+
+def test_food_log_write_invalidates_dashboard(client, computed):
+    etag = client.get("/users/1/dashboard").headers["ETag"]
+    client.get("/users/2/dashboard")
+
+    response = client.post("/food/log", json={
+        "food_id": 5,
+        "quantity": 2,
+        "unit": "piece",
+        "meal_type": "lunch",
+        "meal_time": "2024-03-01T13:00:00",
+    })
+    assert response.status_code == 201
+
+    # Same content, so the ETag still matches, but it was recomputed
+    response = client.get("/users/1/dashboard", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert computed == {1: 2, 2: 1}
+
+    client.get("/users/2/dashboard")
+    assert computed == {1: 2, 2: 1}
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_least_recently_used():
+    backend = InMemoryCache(max_entries=2)
+    await backend.set("a", b"1")
+    await backend.set("b", b"2")
+    await backend.get("a")
+    await backend.set("c", b"3")
+
+    assert await backend.get("a") == b"1"
+    assert await backend.get("b") is None
+    assert await backend.get("c") == b"3"
+
+
+@pytest.mark.asyncio
+async def test_versions_survive_eviction():
+    backend = InMemoryCache(max_entries=1)
+    await backend.incr("version:1")
+    await backend.set("a", b"1")
+    await backend.set("b", b"2")
+
+    assert await backend.get_counter("version:1") == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    backend = InMemoryCache()
+    await backend.set("a", b"1", ttl=60)
+
+    now[0] += 59
+    assert await backend.get("a") == b"1"
+    now[0] += 1
+    assert await backend.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_shared_store_invalidation_reaches_other_workers():
+    shared = InMemoryCache()
+    worker_a = ResponseCache("dashboard", 60, InMemoryCache(), shared)
+    worker_b = ResponseCache("dashboard", 60, InMemoryCache(), shared)
+
+    assert await worker_b.get_version(1) == 0
+    await worker_a.invalidate_user(1)
+    assert await worker_b.get_version(1) == 1
@@ -0,0 +1,88 @@
+import pytest
+
+from app.schemas.food import MealType
+from app.services.entry_parser import RuleParser, singular_form
+
+
+def infer_unit(item):
+    return "piece" if item in ("roti", "paratha", "egg", "idli") else "serving"
+
+
+@pytest.fixture
+def parser():
+    parser = RuleParser(infer_unit)
+    parser.add_numbers({"one": 1, "two": 2, "three": 3, "half": 0.5})
+    parser.add_units({"bowl": "bowl", "bowls": "bowl", "glass": "glass", "cup": "cup"})
+    parser.add_foods(["roti", "paratha", "dal", "rice", "curry", "chai", "curd"],
+                     units={"dal": "bowl", "rice": "bowl", "curry": "bowl", "chai": "glass"})
+    return parser
+
+
+def items(entry):
+    return [(food.item, food.quantity, food.unit) for food in entry.foods]
+
+
+def test_known_foods_with_quantities_and_units(parser):
+    entry = parser.parse("2 rotis, half a bowl of rice and chai for lunch")
+
+    assert items(entry) == [("roti", 2.0, "piece"), ("rice", 0.5, "bowl"), ("chai", 1.0, "glass")]
+    assert entry.meal_type == MealType.LUNCH
+    assert entry.confidence == RuleParser.KNOWN_CONFIDENCE
+
+
+def test_trailing_quantity_attaches_to_the_food(parser):
+    entry = parser.parse("rotis 2 and dal 1 bowl")
+
+    assert items(entry) == [("roti", 2.0, "piece"), ("dal", 1.0, "bowl")]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("chicken curry", ("chicken curry", 1.0, "bowl")),
+    ("aloo paratha", ("aloo paratha", 1.0, "piece")),
+    ("masala chai", ("masala chai", 1.0, "glass")),
+    ("2 bowls of brown rice", ("brown rice", 2.0, "bowl")),
+])
+def test_unknown_words_before_a_food_name_it_and_lower_confidence(parser, text, expected):
+    entry = parser.parse(text)
+
+    assert items(entry) == [expected]
+    assert entry.confidence == RuleParser.MIXED_CONFIDENCE
+
+
+def test_unknown_words_after_a_food_lower_confidence(parser):
+    entry = parser.parse("dal tadka")
+
+    assert items(entry) == [("dal", 1.0, "bowl")]
+    assert entry.confidence == RuleParser.MIXED_CONFIDENCE
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("3 idlis", ("idli", 3.0, "piece")),
+    ("two eggs", ("egg", 2.0, "piece")),
+    ("a bowl of berries", ("berry", 1.0, "bowl")),
+])
+def test_unknown_foods_are_singularized(parser, text, expected):
+    entry = parser.parse(text)
+
+    assert items(entry) == [expected]
+    assert entry.confidence == RuleParser.UNKNOWN_CONFIDENCE
+
+
+@pytest.mark.parametrize("word, singular", [
+    ("idlis", "idli"), ("eggs", "egg"), ("berries", "berry"), ("tomatoes", "tomato"),
+    ("sandwiches", "sandwich"), ("hummus", "hummus"), ("glass", "glass"), ("dal", "dal"),
+])
+def test_singular_form(word, singular):
+    assert singular_form(word) == singular
+
+
+def test_zero_quantities_are_dropped(parser):
+    entry = parser.parse("0 rotis and dal")
+
+    assert items(entry) == [("dal", 1.0, "bowl")]
+
+
+def test_repeats_are_merged(parser):
+    entry = parser.parse("a roti with dal and another roti")
+
+    assert items(entry) == [("roti", 2.0, "piece"), ("dal", 1.0, "bowl")]
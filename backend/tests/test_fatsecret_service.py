@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.core.cache import InMemoryCache
+from app.core.config import settings
+from app.core.resilience import CircuitBreaker, CircuitOpenError
+from app.services.fatsecret_service import FatSecretService
+from app.services.lookup_cache import LookupCache
+
+
+class StaticTokens:
+    async def get_access_token(self, rejected=None):
+        return "token"
+
+
+class RecordingCache(LookupCache):
+    """In-memory lookup cache that remembers the TTL of every write"""
+
+    def __init__(self):
+        super().__init__("fatsecret-test", InMemoryCache(max_entries=64), persistent=False)
+        self.ttls = {}
+
+    async def _set(self, key, payload, ttl):
+        self.ttls[key.split(":", 1)[1]] = ttl
+        await super()._set(key, payload, ttl)
+
+
+def service(responses):
+    """A FatSecretService answering each API method with the given JSON body"""
+    calls = []
+
+    def handler(request):
+        method = request.url.params["method"]
+        calls.append(method)
+        return httpx.Response(200, content=json.dumps(responses[method]))
+
+    fatsecret = FatSecretService(
+        transport=httpx.MockTransport(handler), cache=RecordingCache(), tokens=StaticTokens()
+    )
+    return fatsecret, calls
+
+
+ROTI = {
+    "food_id": "4881", "food_name": "Roti",
+    "servings": {"serving": {"metric_serving_amount": "40", "metric_serving_unit": "g", "calories": "120"}},
+}
+
+
+@pytest.mark.asyncio
+async def test_error_payload_is_a_miss_not_a_food():
+    fatsecret, _ = service({"food.get.v2": {"error": {"code": 106, "message": "Invalid ID"}}})
+
+    assert await fatsecret.get_food_details("999") is None
+    assert fatsecret.cache.ttls["food:999"] == settings.FATSECRET_MISS_TTL_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_unknown_barcode_is_cached_briefly():
+    fatsecret, calls = service({"food.find_id_for_barcode": {"food_id": {"value": "0"}}})
+
+    assert await fatsecret.get_food_by_barcode("0041570054161") is None
+    assert await fatsecret.get_food_by_barcode("0041570054161") is None
+    assert calls == ["food.find_id_for_barcode"]
+    assert fatsecret.cache.ttls["barcode:0041570054161"] == settings.FATSECRET_MISS_TTL_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_known_barcode_is_cached_for_the_full_ttl():
+    fatsecret, calls = service({
+        "food.find_id_for_barcode": {"food_id": {"value": "4881"}},
+        "food.get.v2": {"food": ROTI},
+    })
+
+    food = await fatsecret.get_food_by_barcode("0041570054161")
+
+    assert (food.id, food.name) == (4881, "Roti")
+    assert calls == ["food.find_id_for_barcode", "food.get.v2"]
+    assert fatsecret.cache.ttls["barcode:0041570054161"] == settings.FATSECRET_BARCODE_TTL_SECONDS
+    assert fatsecret.cache.ttls["food:4881"] == settings.FATSECRET_FOOD_TTL_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_from_before_the_circuit_opened_leaves_the_trial_alone():
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_handler(request):
+        started.set()
+        await release.wait()
+        return httpx.Response(200, content=json.dumps({"food": ROTI}))
+
+    fatsecret = FatSecretService(
+        transport=httpx.MockTransport(slow_handler), cache=RecordingCache(), tokens=StaticTokens()
+    )
+    breaker = fatsecret.circuit_breaker
+
+    # A call goes out while the circuit is closed...
+    early_call = asyncio.create_task(fatsecret.get_food_details("4881"))
+    await started.wait()
+
+    # ...other calls trip it, it half-opens and a trial goes out...
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker.opened_at -= breaker.reset_timeout
+    assert breaker.before_call() is True
+
+    # ...and the early call ending mustn't free the trial's slot
+    early_call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await early_call
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    release.set()
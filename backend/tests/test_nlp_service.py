@@ -0,0 +1,58 @@
+import pytest
+
+from app.core.cache import InMemoryCache
+from app.core.config import settings
+from app.schemas.food import MealType
+from app.services.lookup_cache import LookupCache
+from app.services.nlp_service import nlp_service, parse_cache_key
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """The NLP service with rules only, a fresh in-memory parse cache and rule calls counted"""
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "")
+    monkeypatch.setattr(nlp_service, "cache", LookupCache("nlp-test", InMemoryCache(max_entries=64), persistent=False))
+    monkeypatch.setattr(nlp_service, "nlp", None)
+
+    async def no_model():
+        pass
+
+    async def run_inline(fn, *args):
+        return fn(*args)
+
+    monkeypatch.setattr(nlp_service, "ensure_model", no_model)
+    monkeypatch.setattr(nlp_service.parse_pool, "run", run_inline)
+
+    rule_parse = nlp_service.rule_parser.parse
+    nlp_service.rule_calls = []
+
+    def counting_parse(text, meal_type=None):
+        nlp_service.rule_calls.append(text)
+        return rule_parse(text, meal_type)
+
+    monkeypatch.setattr(nlp_service.rule_parser, "parse", counting_parse)
+    return nlp_service
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_the_rules_once_per_distinct_entry(service):
+    entries = [("2 roti and dal", MealType.LUNCH), ("xyzzy plugh", None), ("2 Roti and dal.", MealType.LUNCH)]
+
+    parsed = await service.parse_food_entries(entries)
+
+    assert service.rule_calls == ["2 roti and dal", "xyzzy plugh"]
+    assert [entry.model_dump() for entry in parsed[::2]] == [parsed[0].model_dump()] * 2
+    assert parsed[0] is not parsed[2]
+
+
+@pytest.mark.asyncio
+async def test_batch_and_single_parses_share_the_cache(service):
+    single = await service.parse_food_entry("2 roti and dal", MealType.LUNCH)
+    batch = await service.parse_food_entries([("2 roti and dal", MealType.LUNCH), ("curd rice", None)])
+    again = await service.parse_food_entry("curd rice")
+
+    assert service.rule_calls == ["2 roti and dal", "curd rice"]
+    assert batch[0].model_dump() == single.model_dump()
+    assert again.model_dump() == batch[1].model_dump()
+    assert service.cache.stats["hits"] == 2
+    assert parse_cache_key("Curd rice.") == parse_cache_key("curd rice")
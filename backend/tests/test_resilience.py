@@ -0,0 +1,197 @@
+import asyncio
+
+import pytest
+
+from app.core import resilience
+from app.core.resilience import CircuitBreaker, CircuitOpenError, RateLimitedError, TokenBucket
+
+
+real_sleep = asyncio.sleep
+
+
+class Clock:
+    """Monotonic clock that only moves when told to, or when slept on"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    async def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+@pytest.mark.asyncio
+async def test_bucket_starts_full_and_refills_at_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+    for _ in range(3):
+        await bucket.acquire()
+    assert bucket.get_state()["tokens"] == 0
+
+    clock.advance(0.5)
+    assert bucket.get_state()["tokens"] == 1
+
+    clock.advance(60)
+    assert bucket.get_state()["tokens"] == 3
+    assert clock.slept == []
+
+
+@pytest.mark.asyncio
+async def test_empty_bucket_waits_for_the_next_token(clock):
+    bucket = TokenBucket(rate=4, capacity=1, clock=clock)
+    await bucket.acquire()
+    await bucket.acquire()
+
+    assert clock.slept == [0.25]
+    assert bucket.get_state()["tokens"] == 0
+
+
+@pytest.mark.asyncio
+async def test_bucket_rejects_waits_past_max_wait(clock):
+    bucket = TokenBucket(rate=1, capacity=1, clock=clock)
+    await bucket.acquire()
+
+    with pytest.raises(RateLimitedError):
+        await bucket.acquire(max_wait=0.5)
+    assert clock.slept == []
+
+    clock.advance(0.5)
+    await bucket.acquire(max_wait=0.5)
+    assert clock.slept == [0.5]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_queue_within_a_shared_max_wait(clock, monkeypatch):
+    # Sleepers share one timeline: each wakes `seconds` after it fell asleep
+    async def sleep(seconds):
+        wake_at = clock.now + seconds
+        clock.slept.append(seconds)
+        await real_sleep(0)
+        clock.now = max(clock.now, wake_at)
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", sleep)
+    bucket = TokenBucket(rate=2, capacity=1, clock=clock)
+
+    results = await asyncio.gather(*(bucket.acquire(max_wait=1) for _ in range(5)), return_exceptions=True)
+
+    assert results[:3] == [None, None, None]
+    assert all(isinstance(result, RateLimitedError) for result in results[3:])
+    assert clock.slept == [0.5, 1.0]
+    assert clock.now == 1001.0
+    # Rejected callers reserved nothing
+    assert bucket.get_state()["tokens"] == 0
+    clock.advance(0.5)
+    assert bucket.get_state()["tokens"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_returns_its_reservation(clock, monkeypatch):
+    async def sleep(seconds):
+        await real_sleep(3600)
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", sleep)
+    bucket = TokenBucket(rate=1, capacity=1, clock=clock)
+    await bucket.acquire()
+
+    waiter = asyncio.create_task(bucket.acquire())
+    await real_sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    clock.advance(1)
+    assert bucket.get_state()["tokens"] == 1
+
+
+def fail(breaker, times=1):
+    for _ in range(times):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+    fail(breaker, 2)
+    breaker.before_call()
+    breaker.record_success()
+    fail(breaker, 2)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    fail(breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.get_state() == {
+        "state": "open", "consecutive_failures": 3, "rejected": 1, "retry_in_seconds": 30.0
+    }
+
+
+def test_breaker_half_opens_for_one_trial_then_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    fail(breaker)
+
+    clock.advance(29.9)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.advance(0.1)
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one trial at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_for_a_full_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    fail(breaker)
+    clock.advance(30)
+
+    fail(breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.advance(29)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.advance(1)
+    breaker.before_call()
+
+
+def test_released_trial_lets_the_next_call_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    fail(breaker)
+    clock.advance(30)
+
+    # e.g. the trial call was cancelled before reaching the upstream
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_only_the_trial_call_owns_the_half_open_slot(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    assert breaker.before_call() is False
+
+    fail(breaker)
+    clock.advance(30)
+    assert breaker.before_call() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
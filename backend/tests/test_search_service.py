@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from app.models.food import Food
+from app.schemas.food import FoodRecord
+from app.services import search_service as search_module
+from app.services.search_service import FoodSearchService
+
+
+def record(food_id, name):
+    return FoodRecord(
+        id=food_id, name=name, brand=None, calories_per_100g=100.0, protein_per_100g=None,
+        carbs_per_100g=None, fat_per_100g=None, fiber_per_100g=None, sugar_per_100g=None,
+        sodium_per_100g=None, serving_size=None, serving_weight_grams=None, category=None,
+        subcategory=None, is_indian_food=False,
+    )
+
+
+class StubUpstream:
+    is_available = True
+
+    def __init__(self, foods):
+        self.foods = foods
+
+    async def search_foods(self, query, limit):
+        return self.foods
+
+
+@pytest.fixture
+def searcher(monkeypatch):
+    """A FoodSearchService whose catalog holds one imported FatSecret food"""
+    service = FoodSearchService()
+    service.imported = []
+
+    async def search(query, limit, db):
+        return [Food(id=1, name="Roti", source="fatsecret", external_id="4881")]
+
+    async def import_foods(foods):
+        service.imported.append([food.id for food in foods])
+        return len(foods)
+
+    monkeypatch.setattr(service, "search", search)
+    monkeypatch.setattr(service, "import_foods", import_foods)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_upstream_foods_already_in_the_catalog_are_not_reimported(searcher, monkeypatch):
+    monkeypatch.setattr(search_module, "fatsecret_service", StubUpstream([record(4881, "Roti"), record(5100, "Rotini")]))
+
+    results = await searcher.search_with_upstream("roti", 10, db=None, deadline=1.0)
+    await asyncio.gather(*searcher._background)
+
+    assert [food.name for food in results] == ["Roti", "Rotini"]
+    assert searcher.imported == [[5100]]
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_imported_when_every_upstream_food_is_local(searcher, monkeypatch):
+    monkeypatch.setattr(search_module, "fatsecret_service", StubUpstream([record(4881, "Roti")]))
+
+    results = await searcher.search_with_upstream("roti", 10, db=None, deadline=1.0)
+
+    assert [food.name for food in results] == ["Roti"]
+    assert not searcher._background
+    assert searcher.imported == []
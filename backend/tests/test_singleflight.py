@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+class Upstream:
+    """Work that blocks until released, counting how often it ran"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self, result=None, error=None):
+        self.calls += 1
+        await self.release.wait()
+        if error:
+            raise error
+        return result
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    upstream = Upstream()
+
+    callers = [asyncio.ensure_future(flight.do("key", lambda: upstream("value"))) for _ in range(3)]
+    await settle()
+    assert flight.in_flight() == 1
+
+    upstream.release.set()
+    assert await asyncio.gather(*callers) == ["value"] * 3
+    assert upstream.calls == 1
+    assert flight.stats == {"calls": 3, "executions": 1, "coalesced": 2}
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_leader_failure_reaches_every_follower():
+    flight = SingleFlight("test")
+    upstream = Upstream()
+    error = ValueError("upstream down")
+
+    callers = [asyncio.ensure_future(flight.do("key", lambda: upstream(error=error))) for _ in range(3)]
+    await settle()
+    upstream.release.set()
+
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert results == [error] * 3
+    assert upstream.calls == 1
+
+    # The failure isn't cached; the next call runs again
+    assert await flight.do("key", lambda: upstream("recovered")) == "recovered"
+    assert upstream.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight("test")
+    upstream = Upstream()
+
+    leader = asyncio.ensure_future(flight.do("key", lambda: upstream("value")))
+    follower = asyncio.ensure_future(flight.do("key", lambda: upstream("value")))
+    await settle()
+
+    leader.cancel()
+    await settle()
+    upstream.release.set()
+
+    assert await follower == "value"
+    assert leader.cancelled()
+    assert upstream.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    flight = SingleFlight("test")
+    upstream = Upstream()
+    upstream.release.set()
+
+    assert await asyncio.gather(
+        flight.do("a", lambda: upstream("a")),
+        flight.do("b", lambda: upstream("b")),
+    ) == ["a", "b"]
+    assert upstream.calls == 2
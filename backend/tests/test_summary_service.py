@@ -0,0 +1,330 @@
+from datetime import date, datetime, time, timedelta, timezone
+import os
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.v1 import api  # noqa: F401 - registers every model with Base
+from app.core.database import Base
+from app.models.food import Food, FoodLog, MealType
+from app.models.nutrition import DailyNutritionSummary, NutritionGoal, NutritionRollup
+from app.models.user import User
+from app.services import summary_service as summary_module
+from app.services.summary_service import chunked, iter_periods, summary_service
+
+# The write path relies on Postgres upserts, so tests marked postgres run
+# against a scratch database; everything a test writes is rolled back
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+DAY = date(2024, 3, 6)  # a Wednesday
+
+
+@pytest_asyncio.fixture
+async def db():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_async_engine(TEST_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"))
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        session = AsyncSession(bind=conn, expire_on_commit=False)
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def user(db):
+    user = User(email="summaries@example.com", username="summaries", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    return user
+
+
+@pytest_asyncio.fixture
+async def rice(db):
+    food = Food(name="rice", calories_per_100g=130, protein_per_100g=2.5, is_indian_food=True)
+    db.add(food)
+    await db.flush()
+    return food
+
+
+async def log(db, user, food, grams, meal_type, meal_time, sign=1):
+    food_log = FoodLog(
+        user_id=user.id, food_id=food.id, food=food, quantity=grams, unit="g",
+        weight_grams=grams, meal_type=meal_type, meal_time=meal_time
+    )
+    food_log.calculate_nutrition()
+    db.add(food_log)
+    await db.flush()
+    await summary_service.apply_food_log(food_log, db, sign)
+    return food_log
+
+
+async def summary(db, user, day):
+    return await db.scalar(
+        select(DailyNutritionSummary)
+        .where(DailyNutritionSummary.user_id == user.id, DailyNutritionSummary.date == day)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def rollups(db, user):
+    result = await db.scalars(
+        select(NutritionRollup)
+        .where(NutritionRollup.user_id == user.id)
+        .execution_options(populate_existing=True)
+    )
+    return {rollup.granularity: rollup for rollup in result}
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_two_logs_on_one_day_add_up(db, user, rice):
+    db.add(NutritionGoal(user_id=user.id, daily_calories=1000, daily_protein_g=50,
+                         daily_carbs_g=100, daily_fat_g=30))
+    await db.flush()
+
+    # The first log builds the day's row, the second increments it
+    await log(db, user, rice, 200, MealType.LUNCH, datetime(2024, 3, 6, 13, 0, tzinfo=timezone.utc))
+    # 01:00 at +05:30 is still the 6th in UTC
+    ist = timezone(timedelta(hours=5, minutes=30))
+    await log(db, user, rice, 100, MealType.SNACK, datetime(2024, 3, 7, 1, 0, tzinfo=ist))
+
+    day = await summary(db, user, DAY)
+    assert day.total_calories == pytest.approx(390)
+    assert day.total_protein_g == pytest.approx(7.5)
+    assert (day.total_meals, day.total_snacks) == (1, 1)
+    assert day.calories_goal == 1000
+    assert day.calories_progress == pytest.approx(39)
+    assert await summary(db, user, DAY + timedelta(days=1)) is None
+
+    periods = await rollups(db, user)
+    assert {granularity: rollup.period_start for granularity, rollup in periods.items()} == {
+        "week": date(2024, 3, 4), "month": date(2024, 3, 1), "year": date(2024, 1, 1)
+    }
+    for rollup in periods.values():
+        assert rollup.total_calories == pytest.approx(390)
+        assert (rollup.total_entries, rollup.total_meals, rollup.total_snacks) == (2, 1, 1)
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_rollups_span_days_and_removals(db, user, rice):
+    await log(db, user, rice, 100, MealType.BREAKFAST, datetime(2024, 3, 4, 8, 0, tzinfo=timezone.utc))
+    removed = await log(db, user, rice, 200, MealType.DINNER, datetime(2024, 3, 6, 19, 0, tzinfo=timezone.utc))
+    # Next week, same month and year
+    await log(db, user, rice, 100, MealType.LUNCH, datetime(2024, 3, 12, 12, 0, tzinfo=timezone.utc))
+
+    await summary_service.apply_food_log(removed, db, sign=-1)
+
+    assert (await summary(db, user, date(2024, 3, 4))).total_calories == pytest.approx(130)
+    emptied = await summary(db, user, DAY)
+    assert emptied.total_calories == pytest.approx(0)
+    assert emptied.total_meals == 0
+
+    periods = await rollups(db, user)
+    assert periods["month"].total_calories == pytest.approx(260)
+    assert periods["month"].total_entries == 2
+    assert periods["year"].total_entries == 2
+
+    weeks = {
+        rollup.period_start: rollup for rollup in await db.scalars(
+            select(NutritionRollup).where(
+                NutritionRollup.user_id == user.id, NutritionRollup.granularity == "week"
+            ).execution_options(populate_existing=True)
+        )
+    }
+    assert weeks[date(2024, 3, 4)].total_calories == pytest.approx(130)
+    assert weeks[date(2024, 3, 4)].total_entries == 1
+    assert weeks[date(2024, 3, 11)].total_entries == 1
+
+
+@pytest.fixture
+def today(monkeypatch):
+    """Pin summary_today() to DAY"""
+    monkeypatch.setattr(summary_module, "summary_today", lambda: DAY)
+    return DAY
+
+
+async def count_rows(db, model, user):
+    return await db.scalar(select(func.count()).select_from(model).where(model.user_id == user.id))
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_get_summaries_fills_missing_days_from_food_logs(db, user, rice, today):
+    db.add(NutritionGoal(user_id=user.id, daily_calories=1000, daily_protein_g=50,
+                         daily_carbs_g=100, daily_fat_g=30))
+    # Logged without going through apply_food_log, so no summary rows exist
+    for day, grams in [(date(2024, 3, 1), 100), (date(2024, 3, 4), 200)]:
+        food_log = FoodLog(
+            user_id=user.id, food_id=rice.id, food=rice, quantity=grams, unit="g", weight_grams=grams,
+            meal_type=MealType.LUNCH, meal_time=datetime.combine(day, time(12), tzinfo=timezone.utc)
+        )
+        food_log.calculate_nutrition()
+        db.add(food_log)
+    await db.flush()
+
+    summaries = await summary_service.get_summaries(user.id, date(2024, 3, 1), DAY, db)
+
+    assert [summary.date for summary in summaries] == [date(2024, 3, 1) + timedelta(days=i) for i in range(6)]
+    by_date = {summary.date: summary for summary in summaries}
+    assert by_date[date(2024, 3, 1)].total_calories == pytest.approx(130)
+    assert by_date[date(2024, 3, 4)].total_calories == pytest.approx(260)
+    assert by_date[date(2024, 3, 4)].calories_progress == pytest.approx(26)
+    assert by_date[date(2024, 3, 2)].total_calories == 0
+    assert by_date[date(2024, 3, 2)].total_meals == 0
+    assert all(summary.calories_goal == 1000 for summary in summaries)
+    assert await count_rows(db, DailyNutritionSummary, user) == 6
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_reads_never_store_future_days_or_rewrite_stored_ones(db, user, rice, today):
+    await log(db, user, rice, 100, MealType.LUNCH, datetime(2024, 3, 6, 12, 0, tzinfo=timezone.utc))
+
+    summaries = await summary_service.get_summaries(user.id, DAY, DAY + timedelta(days=3), db)
+
+    assert len(summaries) == 4
+    assert summaries[0].total_calories == pytest.approx(130)
+    assert all(summary.total_calories == 0 for summary in summaries[1:])
+    assert await count_rows(db, DailyNutritionSummary, user) == 1
+
+    # The stored day is read as it is
+    stored = await summary(db, user, DAY)
+    updated_at = stored.updated_at
+    await summary_service.get_summaries(user.id, DAY, DAY, db)
+    assert (await summary(db, user, DAY)).updated_at == updated_at
+
+    # Next year's rollup isn't stored either
+    buckets = await summary_service.get_range(user.id, date(2024, 1, 1), date(2025, 12, 31), "year", db)
+    assert [bucket["calories"] for bucket in buckets] == [pytest.approx(130), 0]
+    assert await count_rows(db, DailyNutritionSummary, user) == 1
+    assert {rollup.period_start for rollup in (await rollups_by_start(db, user, "year")).values()} == {
+        date(2024, 1, 1)
+    }
+
+
+async def rollups_by_start(db, user, granularity):
+    result = await db.scalars(
+        select(NutritionRollup)
+        .where(NutritionRollup.user_id == user.id, NutritionRollup.granularity == granularity)
+        .execution_options(populate_existing=True)
+    )
+    return {rollup.period_start: rollup for rollup in result}
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_get_range_buckets_clip_to_the_range(db, user, rice, today):
+    await log(db, user, rice, 100, MealType.BREAKFAST, datetime(2024, 2, 28, 8, 0, tzinfo=timezone.utc))
+    await log(db, user, rice, 200, MealType.LUNCH, datetime(2024, 3, 4, 12, 0, tzinfo=timezone.utc))
+    await log(db, user, rice, 100, MealType.SNACK, datetime(2024, 3, 6, 16, 0, tzinfo=timezone.utc))
+
+    weeks = await summary_service.get_range(user.id, date(2024, 2, 28), DAY, "week", db)
+    assert [(bucket["period_start"], bucket["period_end"], bucket["days"]) for bucket in weeks] == [
+        ("2024-02-28", "2024-03-03", 5), ("2024-03-04", "2024-03-06", 3)
+    ]
+    assert [bucket["calories"] for bucket in weeks] == [pytest.approx(130), pytest.approx(390)]
+    assert [(bucket["total_meals"], bucket["total_snacks"]) for bucket in weeks] == [(1, 0), (1, 1)]
+
+    months = await summary_service.get_range(user.id, date(2024, 2, 1), DAY, "month", db)
+    assert [bucket["calories"] for bucket in months] == [pytest.approx(130), pytest.approx(390)]
+    # February is whole, so it comes from its rollup
+    assert date(2024, 2, 1) in await rollups_by_start(db, user, "month")
+
+    days = await summary_service.get_range(user.id, date(2024, 3, 3), date(2024, 3, 4), "day", db)
+    assert [bucket["calories"] for bucket in days] == [0, pytest.approx(260)]
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_aggregate_food_logs_covers_a_half_open_interval(db, user, rice):
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    end = datetime(2024, 4, 1, tzinfo=timezone.utc)
+    await log(db, user, rice, 100, MealType.BREAKFAST, datetime(2024, 3, 1, 7, 0, tzinfo=timezone.utc))
+    await log(db, user, rice, 200, MealType.DINNER, datetime(2024, 3, 31, 20, 0, tzinfo=timezone.utc))
+    await log(db, user, rice, 100, MealType.SNACK, end)
+
+    aggregates = await summary_service.aggregate_food_logs(user.id, start, end, db)
+
+    assert aggregates["totals"]["calories"] == pytest.approx(390)
+    assert aggregates["total_entries"] == 2
+    assert aggregates["meal_distribution"] == {"breakfast": 1, "dinner": 1}
+    assert aggregates["first_meal_time"] == datetime(2024, 3, 1, 7, 0, tzinfo=timezone.utc)
+    assert aggregates["last_meal_time"] == datetime(2024, 3, 31, 20, 0, tzinfo=timezone.utc)
+
+    empty = await summary_service.aggregate_food_logs(user.id, end + timedelta(days=1), end + timedelta(days=2), db)
+    assert empty["total_entries"] == 0
+    assert empty["totals"]["calories"] == 0
+    assert empty["meal_distribution"] == {}
+
+
+@pytest.mark.parametrize("start, end, granularity, pieces", [
+    # Whole weeks only, ragged edges as days
+    (date(2024, 3, 2), date(2024, 3, 12), "week", [
+        ("day", date(2024, 3, 2)), ("day", date(2024, 3, 3)), ("week", date(2024, 3, 4)),
+        ("day", date(2024, 3, 11)), ("day", date(2024, 3, 12)),
+    ]),
+    # Whole months never mix in weeks
+    (date(2024, 1, 1), date(2024, 2, 29), "month", [("month", date(2024, 1, 1)), ("month", date(2024, 2, 1))]),
+    (date(2024, 1, 30), date(2024, 3, 1), "year", [
+        ("day", date(2024, 1, 30)), ("day", date(2024, 1, 31)), ("month", date(2024, 2, 1)),
+        ("day", date(2024, 3, 1)),
+    ]),
+    (date(2023, 1, 1), date(2023, 12, 31), "year", [("year", date(2023, 1, 1))]),
+])
+def test_cover_uses_the_coarsest_whole_periods(start, end, granularity, pieces):
+    assert summary_service._cover(start, end, granularity) == pieces
+
+
+def test_iter_periods_includes_partially_covered_periods():
+    assert iter_periods(date(2024, 2, 28), date(2024, 3, 4), "week") == [date(2024, 2, 26), date(2024, 3, 4)]
+    assert iter_periods(date(2023, 12, 31), date(2024, 1, 1), "month") == [date(2023, 12, 1), date(2024, 1, 1)]
+
+
+def test_inserts_stay_under_the_bind_parameter_limit():
+    assert summary_module.MAX_MATERIALIZE_ROWS * len(summary_module.MATERIALIZED_COLUMNS) <= 32767
+    assert summary_module.MAX_ROLLUP_ROWS * len(summary_module.MATERIALIZED_ROLLUP_COLUMNS) <= 32767
+    assert [len(chunk) for chunk in chunked(list(range(5)), 2)] == [2, 2, 1]
+    assert chunked([], 2) == []
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_goal_changes_apply_to_today_and_later_rows(db, user, rice, today):
+    await log(db, user, rice, 100, MealType.LUNCH, datetime(2024, 3, 5, 12, 0, tzinfo=timezone.utc))
+    await log(db, user, rice, 200, MealType.LUNCH, datetime(2024, 3, 6, 12, 0, tzinfo=timezone.utc))
+    await log(db, user, rice, 100, MealType.LUNCH, datetime(2024, 3, 7, 12, 0, tzinfo=timezone.utc))
+
+    # Rows written before any goal existed pick it up
+    goal = NutritionGoal(user_id=user.id, daily_calories=520, daily_protein_g=50,
+                         daily_carbs_g=100, daily_fat_g=30)
+    db.add(goal)
+    await summary_service.apply_active_goal(user.id, db)
+
+    day = await summary(db, user, DAY)
+    assert (day.calories_goal, day.protein_goal_g) == (520, 50)
+    assert day.calories_progress == pytest.approx(50)
+    assert (await summary(db, user, DAY + timedelta(days=1))).calories_progress == pytest.approx(25)
+    yesterday = await summary(db, user, DAY - timedelta(days=1))
+    assert (yesterday.calories_goal, yesterday.calories_progress) == (None, None)
+
+    goal.daily_calories = 260
+    await summary_service.apply_active_goal(user.id, db)
+    assert (await summary(db, user, DAY)).calories_progress == pytest.approx(100)
+
+    goal.is_active = False
+    await summary_service.apply_active_goal(user.id, db)
+    day = await summary(db, user, DAY)
+    assert (day.calories_goal, day.calories_progress) == (None, None)
+    assert day.total_calories == pytest.approx(260)